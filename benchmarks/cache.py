@@ -0,0 +1,71 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PYLOX = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pylox", "__main__.py")
+
+
+# Compares the run time of a big generated script that does little work, without the program cache, on the run
+# writing the cache file and on the runs loading it.
+
+TEMPLATE = """
+class Point{n} {{
+    init(x, y) {{
+        this.x = x;
+        this.y = y;
+    }}
+
+    norm() {{
+        if (this.x < 0 and this.y < 0) return -this.x - this.y;
+        return this.x * this.x + this.y * this.y - {n};
+    }}
+}}
+
+fun make{n}(a) {{
+    var total = 0;
+    for (var i = 0; i < a; i = i + 1) total = total + Point{n}(i, a - i).norm();
+    return total;
+}}
+"""
+
+
+def generate(path: str, declarations: int):
+    with open(path, "w") as f:
+        for n in range(declarations):
+            f.write(TEMPLATE.format(n=n))
+        f.write("print make0(3);\n")
+
+
+def measure(path: str, options: list[str], repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, PYLOX, *options, path], stdout=subprocess.DEVNULL, check=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(declarations: int, engine: str, repeat: int):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "big.lox")
+        generate(path, declarations)
+        size = os.path.getsize(path) / (1024 * 1024)
+        print(f"script      {size:.2f} MB, {declarations} classes and functions, engine {engine}")
+
+        options = [f"--engine={engine}"]
+        print(f"no cache    {measure(path, [*options, '--no-cache'], repeat):8.3f} s (best of {repeat})")
+        print(f"cold cache  {measure(path, options, 1):8.3f} s")
+        print(f"warm cache  {measure(path, options, repeat):8.3f} s (best of {repeat})")
+
+
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser(description="Run time of a big script with and without the program cache.")
+    arguments.add_argument("--declarations", type=int, default=2000, help="classes and functions in the script")
+    arguments.add_argument("--engine", default="tree", help="execution engine to run the script with")
+    arguments.add_argument("--repeat", type=int, default=3, help="runs of each kind, the best one is reported")
+    options = arguments.parse_args()
+    run(options.declarations, options.engine, options.repeat)
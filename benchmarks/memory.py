@@ -0,0 +1,126 @@
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pylox"))
+
+from environment import Environment
+from expr import Expr
+from lox_class import LoxClass
+from lox_function import LoxFunction
+from lox_instance import LoxInstance
+from parser import Parser
+from pylox import Pylox
+from scanner import Scanner
+from stmt import Stmt
+from token_class import Token
+
+
+# Measures how many bytes the front end and the runtime objects take, with tracemalloc, so the numbers include the
+# objects' own storage (__dict__ or slots) and everything they keep alive.
+
+TEMPLATE = """
+class Point{n} {{
+    init(x, y) {{
+        this.x = x;
+        this.y = y;
+    }}
+
+    add(other) {{
+        return Point{n}(this.x + other.x, this.y + other.y);
+    }}
+}}
+
+fun walk{n}(steps) {{
+    var point = Point{n}(0, 0);
+    for (var i = 0; i < steps; i = i + 1) {{
+        if (i < steps / 2) point = point.add(Point{n}(1, {n}));
+        else point = point.add(Point{n}(-1, 2));
+    }}
+    return point.x * point.y - {n};
+}}
+"""
+
+
+def generate(repeat: int) -> str:
+    return "".join(TEMPLATE.format(n=n) for n in range(repeat))
+
+
+def fields(node) -> list:
+    names = list(getattr(node, "__dict__", {}))
+    for klass in type(node).__mro__:
+        names.extend(getattr(klass, "__slots__", ()))
+    return [getattr(node, name, None) for name in names]
+
+
+def count_nodes(roots: list) -> int:
+    count = 0
+    pending = list(roots)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, list):
+            pending.extend(node)
+        elif isinstance(node, (Expr, Stmt)):
+            count += 1
+            pending.extend(fields(node))
+    return count
+
+
+def measure(build) -> tuple[int, object]:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size, result
+
+
+def run(repeat: int, objects: int):
+    program = Pylox()
+    source = generate(repeat)
+
+    tokens_size, tokens = measure(lambda: Scanner(source, program).scan_tokens())
+    tree_size, statements = measure(lambda: Parser(tokens, program).parse())
+    nodes = count_nodes(statements)
+
+    klass = LoxClass("Point", None, {})
+    token = Token(tokens[0].token_type, "x", None, 0)
+
+    def instances():
+        made = []
+        for i in range(objects):
+            instance = LoxInstance(klass)
+            instance.set(token, 1.0)
+            made.append(instance)
+        return made
+
+    def environments():
+        made = []
+        for i in range(objects):
+            environment = Environment()
+            environment.define("x", 1.0)
+            made.append(environment)
+        return made
+
+    declaration = statements[0].methods[0]
+    instances_size = measure(instances)[0]
+    environments_size = measure(environments)[0]
+    functions_size = measure(lambda: [LoxFunction(declaration, None, False) for _ in range(objects)])[0]
+    classes_size = measure(lambda: [LoxClass("Point", klass, {}) for _ in range(objects)])[0]
+
+    print(f"source        {len(source):>10} bytes")
+    print(f"tokens        {len(tokens):>10}  {tokens_size / len(tokens):8.1f} bytes/token")
+    print(f"AST nodes     {nodes:>10}  {tree_size / nodes:8.1f} bytes/node")
+    print(f"instances     {objects:>10}  {instances_size / objects:8.1f} bytes/instance (one field)")
+    print(f"environments  {objects:>10}  {environments_size / objects:8.1f} bytes/environment (one variable)")
+    print(f"functions     {objects:>10}  {functions_size / objects:8.1f} bytes/function")
+    print(f"classes       {objects:>10}  {classes_size / objects:8.1f} bytes/class")
+
+
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser(description="Memory used per token, AST node and runtime object.")
+    arguments.add_argument("--repeat", type=int, default=2000, help="copies of the generated program fragment")
+    arguments.add_argument("--objects", type=int, default=100000, help="runtime objects created per kind")
+    options = arguments.parse_args()
+    run(options.repeat, options.objects)
@@ -0,0 +1,79 @@
+import argparse
+import cProfile
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pylox"))
+
+from parser import Parser
+from pylox import Pylox
+from scanner import Scanner
+
+
+# Measures the parser alone on the tokens of a generated expression-heavy source of a few megabytes, and how many
+# Python calls it makes per token.
+
+TEMPLATE = """
+class Vector{n} < Base {{
+    init(x, y) {{
+        this.x = x;
+        this.y = y;
+    }}
+
+    length() {{
+        return sqrt(this.x * this.x + this.y * this.y) / (1 + {n} - -2);
+    }}
+}}
+
+fun check{n}(a, b, c) {{
+    var v = Vector{n}(a * 2, b + c * 3 - 1);
+    if (a < b and b <= c or !(a == {n}) and v.length() >= 0) print "ok " + str(v.x);
+    while (a != b) a = a + (b - a) / 2;
+    v.y = v.x = -a * b + c.count(1, 2).total;
+    return a == nil or b > c and true;
+}}
+"""
+
+
+def generate(size: int) -> str:
+    fragments = []
+    length = 0
+    n = 0
+    while length < size:
+        fragment = TEMPLATE.format(n=n)
+        fragments.append(fragment)
+        length += len(fragment)
+        n += 1
+    return "".join(fragments)
+
+
+def run(megabytes: float, repeat: int):
+    program = Pylox()
+    source = generate(int(megabytes * 1024 * 1024))
+    tokens = Scanner(source, program).scan_tokens()
+
+    best = None
+    statements = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        statements = Parser(tokens, program).parse()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    profile = cProfile.Profile()
+    profile.runcall(Parser(tokens, program).parse)
+    calls = sum(entry.callcount for entry in profile.getstats())
+
+    print(f"source      {len(source) / (1024 * 1024):10.2f} MB, {len(tokens)} tokens, {len(statements)} declarations")
+    print(f"time        {best:10.3f} s (best of {repeat})")
+    print(f"speed       {len(tokens) / best:10,.0f} tokens/s")
+    print(f"calls       {calls / len(tokens):10.1f} per token")
+
+
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser(description="Parser throughput on the tokens of a generated source.")
+    arguments.add_argument("--size", type=float, default=2, help="size of the generated source, in megabytes")
+    arguments.add_argument("--repeat", type=int, default=3, help="parses of the tokens, the best one is reported")
+    options = arguments.parse_args()
+    run(options.size, options.repeat)
@@ -0,0 +1,76 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pylox"))
+
+from pylox import Pylox
+from scanner import Scanner
+
+
+# Measures the scanner's throughput on a generated multi-megabyte source mixing every kind of lexeme.
+
+TEMPLATE = """
+// Fragment {n} : a class, a loop and some strings.
+class Shape{n} < Base {{
+    init(width, height) {{
+        this.width = width;
+        this.height = height;
+        this.label = "shape number {n}
+spanning two lines";
+    }}
+
+    area() {{
+        if (this.width >= 0 and this.height != nil) return this.width * this.height / 2.5;
+        return -1;
+    }}
+}}
+
+fun sum{n}(limit) {{
+    var total = 0;
+    for (var i = 0; i <= limit; i = i + 1) {{
+        total = total + i * {n}.75 - (i == 3 or !true);
+    }}
+    print "sum: " + str(total);
+    return total;
+}}
+"""
+
+
+def generate(size: int) -> str:
+    fragments = []
+    length = 0
+    n = 0
+    while length < size:
+        fragment = TEMPLATE.format(n=n)
+        fragments.append(fragment)
+        length += len(fragment)
+        n += 1
+    return "".join(fragments)
+
+
+def run(megabytes: float, repeat: int):
+    program = Pylox()
+    source = generate(int(megabytes * 1024 * 1024))
+
+    best = None
+    tokens = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = Scanner(source, program).scan_tokens()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    print(f"source   {len(source) / (1024 * 1024):10.2f} MB, {tokens[-1].line + 1} lines")
+    print(f"tokens   {len(tokens):10}")
+    print(f"time     {best:10.3f} s (best of {repeat})")
+    print(f"speed    {len(source) / (1024 * 1024) / best:10.2f} MB/s, {len(tokens) / best:,.0f} tokens/s")
+
+
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser(description="Scanner throughput on a generated source.")
+    arguments.add_argument("--size", type=float, default=4, help="size of the generated source, in megabytes")
+    arguments.add_argument("--repeat", type=int, default=3, help="scans of the source, the best one is reported")
+    options = arguments.parse_args()
+    run(options.size, options.repeat)
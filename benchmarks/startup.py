@@ -0,0 +1,82 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PYLOX_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pylox")
+PYLOX = os.path.join(PYLOX_DIRECTORY, "__main__.py")
+
+
+# Start-up cost of a one-line script, without and with the program cache, with the import time of each module as
+# python -X importtime reports it. With --check, fails when a run imports a module it should only import lazily.
+
+SCRIPT = "print 1 + 2;\n"
+
+# Modules no run of a script that uses no native function should import.
+NEVER_IMPORTED = {"typing", "random", "clock_function", "str_function", "int_function", "randint_function",
+                  "stream_parser", "closure_compiler", "closure_interpreter", "compiler", "vm", "transpiler",
+                  "transpiled_interpreter", "stackless_interpreter"}
+# Modules a script loaded from the cache should import neither.
+FRONT_END = {"scanner", "parser", "resolver", "optimizer", "constant_folder", "dead_code_eliminator",
+             "loop_invariant_hoister"}
+
+
+def measure(path: str, options: list[str]) -> tuple[float, dict[str, int]]:
+    """Returns the run time of one run and the time spent importing each module, in microseconds."""
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, "-X", "importtime", PYLOX, *options, path],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    elapsed = time.perf_counter() - start
+
+    imports = {}
+    for line in process.stderr.splitlines():
+        # Lines look like "import time:       538 |        983 |   token_class", after one header line.
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[0].strip().isdigit():
+            imports[fields[2].strip()] = int(fields[0])
+    return elapsed, imports
+
+
+def run(repeat: int, top: int, check: bool) -> bool:
+    own_modules = {name[:-3] for name in os.listdir(PYLOX_DIRECTORY) if name.endswith(".py")}
+    lazy = True
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "one_line.lox")
+        with open(path, "w") as f:
+            f.write(SCRIPT)
+
+        for name, options, unwanted in (("no cache", ["--no-cache"], NEVER_IMPORTED),
+                                        ("warm cache", [], NEVER_IMPORTED | FRONT_END)):
+            if not options:
+                measure(path, options)
+
+            runs = [measure(path, options) for _ in range(repeat)]
+            modules = runs[0][1]
+            times = {module: statistics.median(imports.get(module, 0) for _, imports in runs) for module in modules}
+            own = sum(duration for module, duration in times.items() if module in own_modules)
+
+            print(f"{name:<12}run {statistics.median(elapsed for elapsed, _ in runs) * 1000:8.1f} ms   "
+                  f"imports {sum(times.values()) / 1000:7.1f} ms ({len(modules)} modules), "
+                  f"pylox modules {own / 1000:7.1f} ms (median of {repeat})")
+            for module, duration in sorted(times.items(), key=lambda item: -item[1])[:top]:
+                print(f"    {module:<28}{duration / 1000:7.2f} ms")
+
+            imported = sorted(unwanted & modules.keys())
+            if imported:
+                lazy = False
+                print(f"    should not be imported : {', '.join(imported)}")
+
+    return lazy or not check
+
+
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser(description="Start-up time and per-module import time of a one-line script.")
+    arguments.add_argument("--repeat", type=int, default=5, help="runs of each kind, medians are reported")
+    arguments.add_argument("--top", type=int, default=10, help="slowest imports listed for each kind of run")
+    arguments.add_argument("--check", action="store_true", help="exit with 1 if a run imports a lazy module")
+    options = arguments.parse_args()
+    sys.exit(0 if run(options.repeat, options.top, options.check) else 1)
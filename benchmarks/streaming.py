@@ -0,0 +1,58 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PYLOX = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pylox", "__main__.py")
+
+
+# Compares running a huge generated script at once and with --stream: time until the first line is printed, total
+# time and peak memory of the interpreter process.
+
+TEMPLATE = """
+fun step{n}(x) {{
+    var y = x * 2 + {n};
+    return y - x;
+}}
+print step{n}({n});
+"""
+
+
+def generate(path: str, declarations: int):
+    with open(path, "w") as f:
+        for n in range(declarations):
+            f.write(TEMPLATE.format(n=n))
+
+
+def measure(path: str, options: list[str]) -> tuple[float, float, int]:
+    """Returns the time to the first printed line, the total time and the peak memory in KB of one run."""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, PYLOX, *options, path], stdout=subprocess.PIPE, text=True)
+    process.stdout.readline()
+    first_output = time.perf_counter() - start
+    for _ in process.stdout:
+        pass
+    usage = os.wait4(process.pid, 0)[2]
+    return first_output, time.perf_counter() - start, usage.ru_maxrss
+
+
+def run(declarations: int, engine: str):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "huge.lox")
+        generate(path, declarations)
+        size = os.path.getsize(path) / (1024 * 1024)
+        print(f"script   {size:.2f} MB, {declarations} functions and prints, engine {engine}")
+
+        for name, options in (("at once", []), ("--stream", ["--stream"])):
+            first, total, peak = measure(path, [f"--engine={engine}", *options])
+            print(f"{name:<9}first output {first:8.3f} s   total {total:8.3f} s   peak memory {peak / 1024:8.1f} MB")
+
+
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser(description="Time to first output and peak memory with and without --stream.")
+    arguments.add_argument("--declarations", type=int, default=50000, help="functions in the generated script")
+    arguments.add_argument("--engine", default="tree", help="execution engine to run the script with")
+    options = arguments.parse_args()
+    run(options.declarations, options.engine)
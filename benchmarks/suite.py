@@ -0,0 +1,123 @@
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pylox"))
+
+from optimizer import Optimizer
+from parser import Parser
+from pylox import Pylox, ENGINES
+from resolver import Resolver
+from scanner import Scanner
+
+PROGRAMS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "programs")
+PHASES = ("scan", "parse", "resolve", "optimize", "execute")
+
+
+# Runs the Lox programs of the programs folder with a fresh Pylox each time, timing each phase of the pipeline, and
+# prints the best time of each phase as JSON. Given a baseline, a previous JSON report, exits with 1 when a program
+# got slower than the threshold allows.
+
+def run_once(path: str, engine: str, optimize: bool) -> dict[str, float]:
+    program = Pylox(engine, optimize=optimize)
+    with open(path, "r") as f:
+        source = f.read()
+
+    times = {}
+    start = time.perf_counter()
+    tokens = Scanner(source, program).scan_tokens()
+    times["scan"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    statements = Parser(tokens, program).parse()
+    times["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    Resolver(program).resolve(statements)
+    times["resolve"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if optimize:
+        statements = Optimizer(program, True).optimize(statements)
+    times["optimize"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # The programs print their results, which only matter to tell a failed run.
+    with redirect_stdout(io.StringIO()):
+        program.interpreter.interprete(statements)
+    times["execute"] = time.perf_counter() - start
+
+    if program.had_error or program.had_runtime_error:
+        raise SystemExit(f"{os.path.basename(path)} failed with engine {engine}.")
+    return times
+
+
+def run_suite(names: list[str], engine: str, optimize: bool, repeat: int) -> dict:
+    benchmarks = {}
+    for name in names:
+        path = os.path.join(PROGRAMS, f"{name}.pylox")
+        runs = [run_once(path, engine, optimize) for _ in range(repeat)]
+        timings = {phase: min(times[phase] for times in runs) for phase in PHASES}
+        timings["total"] = min(sum(times.values()) for times in runs)
+        benchmarks[name] = timings
+        print(f"{name:<18}{timings['total']:8.3f} s", file=sys.stderr)
+
+    return {"engine": engine, "optimize": optimize, "repeat": repeat, "python": platform.python_version(),
+            "benchmarks": benchmarks}
+
+
+def regressions(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """Returns the programs whose total time grew by more than threshold (a fraction) since the baseline."""
+    if (report["engine"], report["optimize"]) != (baseline["engine"], baseline["optimize"]):
+        raise SystemExit(f"The baseline was measured with engine {baseline['engine']} and optimize "
+                         f"{baseline['optimize']}, not engine {report['engine']} and optimize {report['optimize']}.")
+
+    slower = []
+    for name, timings in report["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            continue
+        change = timings["total"] / before["total"] - 1
+        print(f"{name:<18}{before['total']:8.3f} s -> {timings['total']:8.3f} s  {change:+7.1%}", file=sys.stderr)
+        if change > threshold:
+            slower.append(name)
+    return slower
+
+
+if __name__ == "__main__":
+    programs = sorted(name[:-len(".pylox")] for name in os.listdir(PROGRAMS) if name.endswith(".pylox"))
+
+    arguments = argparse.ArgumentParser(description="Per-phase timings of the Lox benchmark programs, as JSON.")
+    arguments.add_argument("--engine", choices=ENGINES, default="tree", help="execution engine of the programs")
+    arguments.add_argument("--no-optimize", dest="optimize", action="store_false", help="skip the optimizer")
+    arguments.add_argument("--repeat", type=int, default=3, help="runs of each program, the best one is reported")
+    arguments.add_argument("--only", help="comma separated programs to run, among " + ", ".join(programs))
+    arguments.add_argument("--output", help="file to write the JSON report to instead of the standard output")
+    arguments.add_argument("--baseline", help="JSON report of a previous run to compare the totals with")
+    arguments.add_argument("--threshold", type=float, default=0.15, help="slowdown counted as a regression")
+    options = arguments.parse_args()
+
+    selected = programs if options.only is None else options.only.split(",")
+    unknown = set(selected) - set(programs)
+    if unknown:
+        arguments.error(f"unknown programs: {', '.join(sorted(unknown))}")
+
+    result = run_suite(selected, options.engine, options.optimize, options.repeat)
+    if options.output is None:
+        print(json.dumps(result, indent=4))
+    else:
+        with open(options.output, "w") as f:
+            json.dump(result, f, indent=4)
+
+    if options.baseline is not None:
+        with open(options.baseline, "r") as f:
+            slower = regressions(result, json.load(f), options.threshold)
+        if slower:
+            print(f"Regressions past {options.threshold:.0%} : {', '.join(slower)}", file=sys.stderr)
+            sys.exit(1)
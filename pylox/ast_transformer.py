@@ -0,0 +1,162 @@
+import expr as expre
+import stmt
+
+from token_type import TokenType
+
+
+class AstTransformer(expre.Visitor, stmt.Visitor):
+    """Base of the optimizer passes. It walks the tree in evaluation order and updates it in place: every visit
+    method returns the node to put where the visited one was, or None to remove a statement.
+
+    The default methods only transform the children, so a pass overrides the nodes it rewrites. removed counts the
+    nodes a pass took out of the tree through remove().
+    """
+    removed = 0
+
+    def transform(self, node: stmt.Stmt | expre.Expr | None):
+        if node is None:
+            return None
+        return node.accept(self)
+
+    def transform_statements(self, statements: list[stmt.Stmt]) -> list[stmt.Stmt]:
+        transformed = []
+        for statement in statements:
+            statement = self.transform(statement)
+            if statement is not None:
+                transformed.append(statement)
+        return transformed
+
+    def remove(self, node: stmt.Stmt | expre.Expr | None) -> None:
+        counter = NodeCounter()
+        counter.transform(node)
+        self.removed += counter.count
+        return None
+
+    def transform_branch(self, statement: stmt.Stmt) -> stmt.Stmt:
+        # The branch of an if or the body of a while can't be removed, only emptied.
+        transformed = self.transform(statement)
+        if transformed is None:
+            return stmt.Block([])
+        return transformed
+
+    def is_pure(self, expr: expre.Expr | None) -> bool:
+        """Whether evaluating expr can neither fail nor have an effect."""
+        match expr:
+            case None | expre.Literal() | expre.This():
+                return True
+            case expre.Variable():
+                # A global might not be defined yet.
+                return expr.depth is not None
+            case expre.Grouping():
+                return self.is_pure(expr.expression)
+            case expre.Logical():
+                return self.is_pure(expr.left) and self.is_pure(expr.right)
+            case expre.Unary():
+                return expr.operator.token_type == TokenType.BANG and self.is_pure(expr.right)
+            case expre.Binary():
+                return expr.operator.token_type in (TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL) and \
+                    self.is_pure(expr.left) and self.is_pure(expr.right)
+        return False
+
+    # Statements
+
+    def visit_block_stmt(self, statement: stmt.Block):
+        statement.statements = self.transform_statements(statement.statements)
+        return statement
+
+    def visit_class_stmt(self, statement: stmt.Class):
+        statement.methods = [self.transform(method) for method in statement.methods]
+        return statement
+
+    def visit_expression_stmt(self, statement: stmt.Expression):
+        statement.expression = self.transform(statement.expression)
+        return statement
+
+    def visit_function_stmt(self, statement: stmt.Function):
+        statement.body = self.transform_statements(statement.body)
+        return statement
+
+    def visit_if_stmt(self, statement: stmt.If):
+        statement.condition = self.transform(statement.condition)
+        statement.then_branch = self.transform_branch(statement.then_branch)
+        statement.else_branch = self.transform(statement.else_branch)
+        return statement
+
+    def visit_print_stmt(self, statement: stmt.Print):
+        statement.expression = self.transform(statement.expression)
+        return statement
+
+    def visit_return_stmt(self, statement: stmt.Return):
+        statement.value = self.transform(statement.value)
+        return statement
+
+    def visit_var_stmt(self, statement: stmt.Var):
+        statement.initializer = self.transform(statement.initializer)
+        return statement
+
+    def visit_while_stmt(self, statement: stmt.While):
+        statement.condition = self.transform(statement.condition)
+        statement.body = self.transform_branch(statement.body)
+        return statement
+
+    # Expressions
+
+    def visit_assign_expr(self, expr: expre.Assign):
+        expr.value = self.transform(expr.value)
+        return expr
+
+    def visit_binary_expr(self, expr: expre.Binary):
+        expr.left = self.transform(expr.left)
+        expr.right = self.transform(expr.right)
+        return expr
+
+    def visit_call_expr(self, expr: expre.Call):
+        expr.callee = self.transform(expr.callee)
+        expr.arguments = [self.transform(argument) for argument in expr.arguments]
+        return expr
+
+    def visit_get_expr(self, expr: expre.Get):
+        expr.object = self.transform(expr.object)
+        return expr
+
+    def visit_grouping_expr(self, expr: expre.Grouping):
+        expr.expression = self.transform(expr.expression)
+        return expr
+
+    def visit_literal_expr(self, expr: expre.Literal):
+        return expr
+
+    def visit_logical_expr(self, expr: expre.Logical):
+        expr.left = self.transform(expr.left)
+        expr.right = self.transform(expr.right)
+        return expr
+
+    def visit_set_expr(self, expr: expre.Set):
+        expr.object = self.transform(expr.object)
+        expr.value = self.transform(expr.value)
+        return expr
+
+    def visit_super_expr(self, expr: expre.Super):
+        return expr
+
+    def visit_this_expr(self, expr: expre.This):
+        return expr
+
+    def visit_unary_expr(self, expr: expre.Unary):
+        expr.right = self.transform(expr.right)
+        return expr
+
+    def visit_variable_expr(self, expr: expre.Variable):
+        return expr
+
+
+class NodeCounter(AstTransformer):
+    """Counts the nodes of a subtree, leaving it unchanged."""
+
+    def __init__(self):
+        self.count = 0
+
+    def transform(self, node: stmt.Stmt | expre.Expr | None):
+        if node is not None:
+            self.count += 1
+        return super().transform(node)
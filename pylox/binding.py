@@ -0,0 +1,20 @@
+from stmt import Stmt
+from token_class import Token
+
+
+class Binding:
+    """A variable as the Resolver saw it: where it is declared and how often it is declared, read and assigned.
+
+    The optimizer passes use it to know which reads and assignments refer to the same variable. slot is the index
+    of a local in its frame; globals have no slot.
+    """
+    __slots__ = ("name", "declaration", "is_global", "slot", "declarations", "reads", "assignments")
+
+    def __init__(self, name: str, is_global: bool, slot: int = None, declaration: Stmt | Token = None):
+        self.name = name
+        self.declaration = declaration
+        self.is_global = is_global
+        self.slot = slot
+        self.declarations = 0
+        self.reads = 0
+        self.assignments = 0
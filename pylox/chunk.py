@@ -0,0 +1,62 @@
+import math
+
+from typing import Any
+
+import op_code
+
+
+class Chunk:
+    """A compiled function body: flat instruction list, its constant pool and the source line of each cell."""
+
+    def __init__(self):
+        self.code = []
+        self.lines = []
+        self.constants = []
+        self.constant_indexes = {}
+
+    def write(self, value: int, line: int):
+        self.code.append(value)
+        self.lines.append(line)
+
+    def add_constant(self, value: Any) -> int:
+        # Numbers and strings are interned so a name used many times takes a single pool entry.
+        # The type is part of the key because 1.0 == True in Python, and the sign because 0.0 == -0.0.
+        match value:
+            case float():
+                key = (float, value, math.copysign(1.0, value))
+            case str():
+                key = (str, value)
+            case _:
+                key = None
+        if key is not None and key in self.constant_indexes:
+            return self.constant_indexes[key]
+
+        self.constants.append(value)
+        index = len(self.constants) - 1
+        if key is not None:
+            self.constant_indexes[key] = index
+        return index
+
+    def disassemble(self, name: str) -> str:
+        lines = [f"== {name} =="]
+        offset = 0
+        while offset < len(self.code):
+            instruction = self.code[offset]
+            text = f"{offset:04} {self.lines[offset]:4} {op_code.NAMES[instruction]:<14}"
+            offset += 1
+
+            for i in range(op_code.OPERAND_COUNTS.get(instruction, 0)):
+                operand = self.code[offset]
+                offset += 1
+                text += f" {operand}"
+                if i == 0 and instruction in op_code.CONSTANT_OPERANDS:
+                    text += f" '{self.constants[operand]}'"
+            lines.append(text)
+
+            if instruction == op_code.CLOSURE:
+                for _ in range(self.constants[self.code[offset - 1]].upvalue_count):
+                    kind = "local" if self.code[offset] else "upvalue"
+                    lines.append(f"{offset:04}    | {kind} {self.code[offset + 1]}")
+                    offset += 2
+
+        return "\n".join(lines)
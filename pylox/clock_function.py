@@ -1,12 +1,11 @@
 from time import time
 
-from typing import Any
-
 from lox_callable import LoxCallable
 
 
-from typing import TYPE_CHECKING
+TYPE_CHECKING = False
 if TYPE_CHECKING:
+    from typing import Any
     from interpreter import Interpreter
 
 
@@ -14,7 +13,7 @@ class ClockFunction(LoxCallable):
     def arity(self):
         return 0
 
-    def call(self, interpreter: "Interpreter", arguments: list[Any]):
+    def call(self, interpreter: "Interpreter", arguments: "list[Any]"):
         return time() / 1000
 
     def __str__(self):
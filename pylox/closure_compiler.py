@@ -0,0 +1,468 @@
+from typing import Any, Callable, TYPE_CHECKING
+
+import expr as expre
+import stmt
+
+from compiled_function import CompiledFunction
+from completion import RETURN
+from environment import Environment
+from lox_callable import LoxCallable
+from lox_class import LoxClass
+from lox_function import LoxFunction
+from lox_instance import LoxInstance
+from runtime_exception import RuntimeException
+from tail_call import TailCall
+from token_type import TokenType
+
+
+if TYPE_CHECKING:
+    from closure_interpreter import ClosureInterpreter
+
+
+# A compiled node takes the environment it runs in and returns the node's value. A statement returns None, or
+# RETURN after a return statement (see completion.py).
+Compiled = Callable[[Environment], Any]
+
+
+class ClosureCompiler(expre.Visitor, stmt.Visitor):
+    """Turns a resolved syntax tree into nested Python closures.
+
+    Every node is visited once, at compile time. The operator of a binary or unary expression and the resolved
+    distance of a variable are chosen there, so running the closures does no visitor dispatch and no `match`.
+    """
+
+    def __init__(self, interpreter: 'ClosureInterpreter'):
+        self.interpreter = interpreter
+
+    def compile(self, node: stmt.Stmt | expre.Expr) -> Compiled:
+        return node.accept(self)
+
+    def compile_statements(self, statements: list[stmt.Stmt]) -> list[Compiled]:
+        return [self.compile(statement) for statement in statements]
+
+    def compile_sequence(self, statements: list[stmt.Stmt]) -> Compiled:
+        compiled = self.compile_statements(statements)
+
+        def sequence(environment):
+            for statement in compiled:
+                if statement(environment) is RETURN:
+                    return RETURN
+
+        return sequence
+
+    def compile_function(self, declaration: stmt.Function, is_initializer: bool) -> Compiled:
+        body = self.compile_sequence(declaration.body)
+
+        def function(environment):
+            return CompiledFunction(declaration, body, environment, is_initializer)
+
+        return function
+
+    # Statements
+
+    def visit_expression_stmt(self, statement: stmt.Expression):
+        return self.compile(statement.expression)
+
+    def visit_print_stmt(self, statement: stmt.Print):
+        expression = self.compile(statement.expression)
+        stringify = self.interpreter.stringify
+
+        def print_stmt(environment):
+            print(stringify(expression(environment)))
+
+        return print_stmt
+
+    def visit_var_stmt(self, statement: stmt.Var):
+        name = statement.name.lexeme
+        if statement.initializer is None:
+            def var_stmt(environment):
+                environment.define(name, None)
+
+            return var_stmt
+
+        initializer = self.compile(statement.initializer)
+
+        def var_initializer_stmt(environment):
+            environment.define(name, initializer(environment))
+
+        return var_initializer_stmt
+
+    def visit_block_stmt(self, statement: stmt.Block):
+        statements = self.compile_statements(statement.statements)
+
+        def block_stmt(environment):
+            environment = Environment(environment)
+            for inner in statements:
+                if inner(environment) is RETURN:
+                    return RETURN
+
+        return block_stmt
+
+    def visit_if_stmt(self, statement: stmt.If):
+        condition = self.compile(statement.condition)
+        then_branch = self.compile(statement.then_branch)
+
+        if statement.else_branch is None:
+            def if_stmt(environment):
+                value = condition(environment)
+                if value is not None and value is not False:
+                    return then_branch(environment)
+
+            return if_stmt
+
+        else_branch = self.compile(statement.else_branch)
+
+        def if_else_stmt(environment):
+            value = condition(environment)
+            if value is not None and value is not False:
+                return then_branch(environment)
+            return else_branch(environment)
+
+        return if_else_stmt
+
+    def visit_while_stmt(self, statement: stmt.While):
+        condition = self.compile(statement.condition)
+        body = self.compile(statement.body)
+
+        def while_stmt(environment):
+            while (value := condition(environment)) is not None and value is not False:
+                if body(environment) is RETURN:
+                    return RETURN
+
+        return while_stmt
+
+    def visit_function_stmt(self, statement: stmt.Function):
+        name = statement.name.lexeme
+        function = self.compile_function(statement, False)
+
+        def function_stmt(environment):
+            environment.define(name, function(environment))
+
+        return function_stmt
+
+    def visit_return_stmt(self, statement: stmt.Return):
+        interpreter = self.interpreter
+        if statement.value is None:
+            def return_stmt(environment):
+                interpreter.return_value = None
+                return RETURN
+
+            return return_stmt
+
+        if statement.tail_call:
+            value = self.visit_call_expr(statement.value, True)
+        else:
+            value = self.compile(statement.value)
+
+        def return_value_stmt(environment):
+            interpreter.return_value = value(environment)
+            return RETURN
+
+        return return_value_stmt
+
+    def visit_class_stmt(self, statement: stmt.Class):
+        class_name = statement.name
+        superclass_expression = statement.superclass
+        superclass_value = None if superclass_expression is None else self.compile(superclass_expression)
+        methods = [(method.name.lexeme, self.compile_function(method, method.name.lexeme == "init"))
+                   for method in statement.methods]
+
+        def class_stmt(environment):
+            superclass = None
+            if superclass_value is not None:
+                superclass = superclass_value(environment)
+                if not isinstance(superclass, LoxClass):
+                    raise RuntimeException(superclass_expression.name, "Superclass must be a class.")
+
+            method_environment = environment
+            if superclass is not None:
+                method_environment = Environment(environment)
+                method_environment.define("super", superclass)
+
+            klass = LoxClass(class_name.lexeme, superclass,
+                             {name: method(method_environment) for name, method in methods})
+            environment.define(class_name.lexeme, klass)
+
+        return class_stmt
+
+    # Expressions
+
+    def visit_literal_expr(self, expr: expre.Literal):
+        value = expr.value
+        return lambda environment: value
+
+    def visit_grouping_expr(self, expr: expre.Grouping):
+        return self.compile(expr.expression)
+
+    def visit_variable_expr(self, expr: expre.Variable):
+        return self.variable_lookup(expr.name, expr)
+
+    def visit_this_expr(self, expr: expre.This):
+        return self.variable_lookup(expr.keyword, expr)
+
+    def variable_lookup(self, name, expr: expre.Variable | expre.This) -> Compiled:
+        if expr.depth is None:
+            global_get = self.interpreter.globals.get
+            return lambda environment: global_get(name)
+
+        distance, slot = expr.depth, expr.slot
+        if distance == 0:
+            return lambda environment: environment.values[slot]
+        if distance == 1:
+            return lambda environment: environment.enclosing.values[slot]
+        return lambda environment: environment.get_at(distance, slot)
+
+    def visit_assign_expr(self, expr: expre.Assign):
+        value = self.compile(expr.value)
+        name = expr.name
+        if expr.depth is None:
+            global_assign = self.interpreter.globals.assign
+
+            def assign_global(environment):
+                result = value(environment)
+                global_assign(name, result)
+                return result
+
+            return assign_global
+
+        distance, slot = expr.depth, expr.slot
+
+        def assign_local(environment):
+            result = value(environment)
+            environment.assign_at(distance, slot, result)
+            return result
+
+        return assign_local
+
+    def visit_logical_expr(self, expr: expre.Logical):
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+
+        if expr.operator.token_type == TokenType.OR:
+            def or_expr(environment):
+                value = left(environment)
+                if value is not None and value is not False:
+                    return value
+                return right(environment)
+
+            return or_expr
+
+        def and_expr(environment):
+            value = left(environment)
+            if value is None or value is False:
+                return value
+            return right(environment)
+
+        return and_expr
+
+    def visit_unary_expr(self, expr: expre.Unary):
+        right = self.compile(expr.right)
+        operator = expr.operator
+
+        match operator.token_type:
+            case TokenType.BANG:
+                def not_expr(environment):
+                    value = right(environment)
+                    return value is None or value is False
+
+                return not_expr
+            case TokenType.MINUS:
+                def negate_expr(environment):
+                    value = right(environment)
+                    if isinstance(value, float):
+                        return -value
+                    raise RuntimeException(operator, "Operand must be a number.")
+
+                return negate_expr
+
+        return lambda environment: None
+
+    def visit_binary_expr(self, expr: expre.Binary):
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+        operator = expr.operator
+
+        match operator.token_type:
+            case TokenType.GREATER:
+                def greater_expr(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if isinstance(a, float) and isinstance(b, float):
+                        return a > b
+                    raise RuntimeException(operator, "Operands must be numbers.")
+
+                return greater_expr
+            case TokenType.GREATER_EQUAL:
+                def greater_equal_expr(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if isinstance(a, float) and isinstance(b, float):
+                        return a >= b
+                    raise RuntimeException(operator, "Operands must be numbers.")
+
+                return greater_equal_expr
+            case TokenType.LESS:
+                def less_expr(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if isinstance(a, float) and isinstance(b, float):
+                        return a < b
+                    raise RuntimeException(operator, "Operands must be numbers.")
+
+                return less_expr
+            case TokenType.LESS_EQUAL:
+                def less_equal_expr(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if isinstance(a, float) and isinstance(b, float):
+                        return a <= b
+                    raise RuntimeException(operator, "Operands must be numbers.")
+
+                return less_equal_expr
+            case TokenType.BANG_EQUAL:
+                return lambda environment: not left(environment) == right(environment)
+            case TokenType.EQUAL_EQUAL:
+                return lambda environment: left(environment) == right(environment)
+            case TokenType.MINUS:
+                def subtract_expr(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if isinstance(a, float) and isinstance(b, float):
+                        return a - b
+                    raise RuntimeException(operator, "Operands must be numbers.")
+
+                return subtract_expr
+            case TokenType.PLUS:
+                def add_expr(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if isinstance(a, float) and isinstance(b, float):
+                        return a + b
+                    if isinstance(a, str) and isinstance(b, str):
+                        return a + b
+                    raise RuntimeException(operator, "Operands must be two numbers or two strings.")
+
+                return add_expr
+            case TokenType.SLASH:
+                def divide_expr(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if isinstance(a, float) and isinstance(b, float):
+                        return a / b
+                    raise RuntimeException(operator, "Operands must be numbers.")
+
+                return divide_expr
+            case TokenType.STAR:
+                def multiply_expr(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if isinstance(a, float) and isinstance(b, float):
+                        return a * b
+                    raise RuntimeException(operator, "Operands must be numbers.")
+
+                return multiply_expr
+
+        return lambda environment: None
+
+    def visit_call_expr(self, expr: expre.Call, tail: bool = False):
+        # A tail call to a Lox function evaluates to a TailCall, for the running CompiledFunction to make.
+        if expr.callee.__class__ is expre.Get:
+            return self.compile_invoke(expr, expr.callee, tail)
+
+        callee = self.compile(expr.callee)
+        arguments = [self.compile(argument) for argument in expr.arguments]
+        paren = expr.paren
+        interpreter = self.interpreter
+
+        def call_expr(environment):
+            function = callee(environment)
+            values = [argument(environment) for argument in arguments]
+
+            if not isinstance(function, LoxCallable):
+                raise RuntimeException(paren, "Can only call functions and classes.")
+            if len(values) != function.arity():
+                raise RuntimeException(paren, f"Expected {function.arity()} arguments but got {len(values)}.")
+            if tail and isinstance(function, LoxFunction):
+                return TailCall(function, function.frame(values))
+            return function.call(interpreter, values)
+
+        return call_expr
+
+    def compile_invoke(self, expr: expre.Call, get: expre.Get, tail: bool = False) -> Compiled:
+        obj = self.compile(get.object)
+        arguments = [self.compile(argument) for argument in expr.arguments]
+        name = get.name
+        paren = expr.paren
+        lookup = get.cache.lookup
+        interpreter = self.interpreter
+
+        def invoke_expr(environment):
+            instance = obj(environment)
+            if not isinstance(instance, LoxInstance):
+                raise RuntimeException(name, "Only instances have properties.")
+
+            entry = lookup(instance, name)
+            values = [argument(environment) for argument in arguments]
+            if entry.__class__ is not int:
+                if len(values) != entry.arity():
+                    raise RuntimeException(paren, f"Expected {entry.arity()} arguments but got {len(values)}.")
+                if tail:
+                    return TailCall(entry, entry.frame(values, instance))
+                return entry.invoke(interpreter, instance, values)
+
+            function = instance.values[entry]
+            if not isinstance(function, LoxCallable):
+                raise RuntimeException(paren, "Can only call functions and classes.")
+            if len(values) != function.arity():
+                raise RuntimeException(paren, f"Expected {function.arity()} arguments but got {len(values)}.")
+            if tail and isinstance(function, LoxFunction):
+                return TailCall(function, function.frame(values))
+            return function.call(interpreter, values)
+
+        return invoke_expr
+
+    def visit_get_expr(self, expr: expre.Get):
+        obj = self.compile(expr.object)
+        name = expr.name
+        cache_get = expr.cache.get
+
+        def get_expr(environment):
+            instance = obj(environment)
+            if isinstance(instance, LoxInstance):
+                return cache_get(instance, name)
+            raise RuntimeException(name, "Only instances have properties.")
+
+        return get_expr
+
+    def visit_set_expr(self, expr: expre.Set):
+        obj = self.compile(expr.object)
+        value = self.compile(expr.value)
+        name = expr.name
+        cache_set = expr.cache.set
+
+        def set_expr(environment):
+            instance = obj(environment)
+            if not isinstance(instance, LoxInstance):
+                raise RuntimeException(name, "Only instances have fields.")
+
+            result = value(environment)
+            cache_set(instance, name, result)
+            return result
+
+        return set_expr
+
+    def visit_super_expr(self, expr: expre.Super):
+        distance = expr.depth
+        method = expr.method
+
+        def super_expr(environment):
+            superclass = environment.get_at(distance, 0)
+            instance = environment.get_at(distance - 1, 0)
+
+            function = superclass.find_method(method.lexeme)
+            if function is None:
+                raise RuntimeException(method, f"Undefined property '{method.lexeme}'.")
+
+            return function.bind(instance)
+
+        return super_expr
@@ -0,0 +1,21 @@
+import stmt
+
+from closure_compiler import ClosureCompiler
+from interpreter import Interpreter
+from runtime_exception import RuntimeException
+
+
+class ClosureInterpreter(Interpreter):
+    """Execution engine that compiles the resolved tree into closures once, then runs the closures."""
+
+    def __init__(self, program):
+        super().__init__(program)
+        self.compiler = ClosureCompiler(self)
+
+    def interprete(self, statements: list[stmt.Stmt]):
+        compiled = self.compiler.compile_statements(statements)
+        try:
+            for statement in compiled:
+                statement(self.globals)
+        except RuntimeException as e:
+            self.program.call_runtime_error(e)
@@ -0,0 +1,42 @@
+from typing import Callable, TYPE_CHECKING
+
+from completion import RETURN
+from environment import Environment
+from lox_function import LoxFunction
+from stmt import Function
+from tail_call import TailCall
+
+
+if TYPE_CHECKING:
+    from closure_interpreter import ClosureInterpreter
+    from lox_instance import LoxInstance
+
+
+class CompiledFunction(LoxFunction):
+    __slots__ = ("body",)
+
+    def __init__(self, declaration: Function, body: Callable[[Environment], None], closure: Environment,
+                 is_initializer: bool, receiver: 'LoxInstance' = None):
+        super().__init__(declaration, closure, is_initializer, receiver)
+        self.body = body
+
+    def bind(self, instance: 'LoxInstance') -> 'CompiledFunction':
+        return CompiledFunction(self.declaration, self.body, self.closure, self.is_initializer, instance)
+
+    def run(self, interpreter: 'ClosureInterpreter', environment: Environment):
+        value = None
+        if self.body(environment) is RETURN:
+            value = interpreter.return_value
+
+        if self.is_initializer:
+            return environment.values[0]
+        while value.__class__ is TailCall:
+            value = value.function.execute(interpreter, value.environment)
+        return value
+
+    def execute(self, interpreter: 'ClosureInterpreter', environment: Environment):
+        if self.is_initializer:
+            self.body(environment)
+            return environment.values[0]
+        if self.body(environment) is RETURN:
+            return interpreter.return_value
@@ -0,0 +1,399 @@
+from typing import Any
+
+import expr as expre
+import stmt
+import op_code
+
+from function_type import FunctionType
+from token_class import Token
+from token_type import TokenType
+from vm_objects import VmFunction
+
+
+class Local:
+    def __init__(self, name: str, depth: int):
+        self.name = name
+        self.depth = depth
+        self.is_captured = False
+
+
+class FunctionScope:
+    """Compile-time state of the function being compiled: its locals, upvalues and block depth."""
+
+    def __init__(self, enclosing: 'FunctionScope', function: VmFunction, function_type: FunctionType):
+        self.enclosing = enclosing
+        self.function = function
+        self.function_type = function_type
+        self.upvalues = []
+        self.scope_depth = 0
+
+        # Slot 0 holds the called closure, or the receiver for methods.
+        receiver = "this" if function_type in (FunctionType.METHOD, FunctionType.INITIALIZER) else ""
+        self.locals = [Local(receiver, 0)]
+
+    def resolve_local(self, name: str) -> int | None:
+        for i in range(len(self.locals) - 1, -1, -1):
+            if self.locals[i].name == name:
+                return i
+        return None
+
+    def resolve_upvalue(self, name: str) -> int | None:
+        if self.enclosing is None:
+            return None
+
+        local = self.enclosing.resolve_local(name)
+        if local is not None:
+            self.enclosing.locals[local].is_captured = True
+            return self.add_upvalue(local, True)
+
+        upvalue = self.enclosing.resolve_upvalue(name)
+        if upvalue is not None:
+            return self.add_upvalue(upvalue, False)
+        return None
+
+    def add_upvalue(self, index: int, is_local: bool) -> int:
+        for i, upvalue in enumerate(self.upvalues):
+            if upvalue == (index, is_local):
+                return i
+
+        self.upvalues.append((index, is_local))
+        self.function.upvalue_count = len(self.upvalues)
+        return len(self.upvalues) - 1
+
+
+class Compiler(expre.Visitor, stmt.Visitor):
+    """Compiles the parser's Stmt/Expr tree into bytecode for the VM.
+
+    The Resolver has already reported static errors, so the compiler only lays out local slots and upvalues
+    the way clox does, and emits jumps as offsets relative to the instruction that follows them.
+    """
+
+    def __init__(self):
+        self.current = None
+        self.line = 0
+
+    def compile(self, statements: list[stmt.Stmt]) -> VmFunction:
+        self.current = FunctionScope(None, VmFunction(None), FunctionType.NONE)
+        for statement in statements:
+            self.compile_node(statement)
+
+        self.emit(op_code.NIL)
+        self.emit(op_code.RETURN)
+        return self.current.function
+
+    def compile_node(self, node: stmt.Stmt | expre.Expr):
+        node.accept(self)
+
+    # Emission helpers
+
+    def emit(self, *values: int):
+        chunk = self.current.function.chunk
+        for value in values:
+            chunk.write(value, self.line)
+
+    def emit_constant(self, value: Any):
+        self.emit(op_code.CONSTANT, self.make_constant(value))
+
+    def make_constant(self, value: Any) -> int:
+        return self.current.function.chunk.add_constant(value)
+
+    def emit_jump(self, instruction: int) -> int:
+        self.emit(instruction, 0)
+        return len(self.current.function.chunk.code) - 1
+
+    def patch_jump(self, operand: int):
+        code = self.current.function.chunk.code
+        code[operand] = len(code) - operand - 1
+
+    def emit_loop(self, loop_start: int):
+        self.emit(op_code.LOOP)
+        code = self.current.function.chunk.code
+        self.emit(len(code) - loop_start + 1)
+
+    def emit_return(self):
+        if self.current.function_type == FunctionType.INITIALIZER:
+            self.emit(op_code.GET_LOCAL, 0)
+        else:
+            self.emit(op_code.NIL)
+        self.emit(op_code.RETURN)
+
+    # Scopes and variables
+
+    def begin_scope(self):
+        self.current.scope_depth += 1
+
+    def end_scope(self):
+        scope = self.current
+        scope.scope_depth -= 1
+
+        while scope.locals and scope.locals[-1].depth > scope.scope_depth:
+            if scope.locals.pop().is_captured:
+                self.emit(op_code.CLOSE_UPVALUE)
+            else:
+                self.emit(op_code.POP)
+
+    def add_local(self, name: str):
+        self.current.locals.append(Local(name, self.current.scope_depth))
+
+    def define_variable(self, name: Token):
+        """Binds the value on top of the stack to a new variable named name."""
+        if self.current.scope_depth > 0:
+            self.add_local(name.lexeme)
+        else:
+            self.emit(op_code.DEFINE_GLOBAL, self.make_constant(name.lexeme))
+
+    def named_variable(self, name: Token, value: expre.Expr = None):
+        self.line = name.line
+        slot = self.current.resolve_local(name.lexeme)
+        if slot is not None:
+            get_op, set_op, operand = op_code.GET_LOCAL, op_code.SET_LOCAL, slot
+        else:
+            upvalue = self.current.resolve_upvalue(name.lexeme)
+            if upvalue is not None:
+                get_op, set_op, operand = op_code.GET_UPVALUE, op_code.SET_UPVALUE, upvalue
+            else:
+                get_op, set_op, operand = op_code.GET_GLOBAL, op_code.SET_GLOBAL, self.make_constant(name.lexeme)
+
+        if value is None:
+            self.emit(get_op, operand)
+        else:
+            self.compile_node(value)
+            self.line = name.line
+            self.emit(set_op, operand)
+
+    def function(self, declaration: stmt.Function, function_type: FunctionType):
+        function = VmFunction(declaration.name.lexeme, len(declaration.params))
+        enclosing = self.current
+        self.current = FunctionScope(enclosing, function, function_type)
+        self.begin_scope()
+
+        for param in declaration.params:
+            self.add_local(param.lexeme)
+        for statement in declaration.body:
+            self.compile_node(statement)
+        self.emit_return()
+
+        scope = self.current
+        self.current = enclosing
+        self.line = declaration.name.line
+        self.emit(op_code.CLOSURE, self.make_constant(function))
+        for index, is_local in scope.upvalues:
+            self.emit(1 if is_local else 0, index)
+
+    # Statements
+
+    def visit_expression_stmt(self, statement: stmt.Expression):
+        self.compile_node(statement.expression)
+        self.emit(op_code.POP)
+
+    def visit_print_stmt(self, statement: stmt.Print):
+        self.compile_node(statement.expression)
+        self.emit(op_code.PRINT)
+
+    def visit_var_stmt(self, statement: stmt.Var):
+        if statement.initializer is None:
+            self.emit(op_code.NIL)
+        else:
+            self.compile_node(statement.initializer)
+        self.line = statement.name.line
+        self.define_variable(statement.name)
+
+    def visit_block_stmt(self, statement: stmt.Block):
+        self.begin_scope()
+        for inner in statement.statements:
+            self.compile_node(inner)
+        self.end_scope()
+
+    def visit_if_stmt(self, statement: stmt.If):
+        self.compile_node(statement.condition)
+
+        then_jump = self.emit_jump(op_code.JUMP_IF_FALSE)
+        self.emit(op_code.POP)
+        self.compile_node(statement.then_branch)
+
+        else_jump = self.emit_jump(op_code.JUMP)
+        self.patch_jump(then_jump)
+        self.emit(op_code.POP)
+
+        if statement.else_branch is not None:
+            self.compile_node(statement.else_branch)
+        self.patch_jump(else_jump)
+
+    def visit_while_stmt(self, statement: stmt.While):
+        loop_start = len(self.current.function.chunk.code)
+        self.compile_node(statement.condition)
+
+        exit_jump = self.emit_jump(op_code.JUMP_IF_FALSE)
+        self.emit(op_code.POP)
+        self.compile_node(statement.body)
+        self.emit_loop(loop_start)
+
+        self.patch_jump(exit_jump)
+        self.emit(op_code.POP)
+
+    def visit_function_stmt(self, statement: stmt.Function):
+        if self.current.scope_depth > 0:
+            # Declared before its body is compiled so the function can call itself through its slot.
+            self.add_local(statement.name.lexeme)
+            self.function(statement, FunctionType.FUNCTION)
+        else:
+            self.function(statement, FunctionType.FUNCTION)
+            self.define_variable(statement.name)
+
+    def visit_return_stmt(self, statement: stmt.Return):
+        self.line = statement.keyword.line
+        if statement.value is None:
+            self.emit_return()
+        else:
+            self.compile_node(statement.value)
+            self.emit(op_code.RETURN)
+
+    def visit_class_stmt(self, statement: stmt.Class):
+        name = statement.name
+        self.line = name.line
+        self.emit(op_code.CLASS, self.make_constant(name.lexeme))
+        self.define_variable(name)
+
+        if statement.superclass is not None:
+            self.named_variable(statement.superclass.name)
+            self.begin_scope()
+            self.add_local("super")
+
+            self.named_variable(name)
+            self.line = statement.superclass.name.line
+            self.emit(op_code.INHERIT)
+
+        self.named_variable(name)
+        for method in statement.methods:
+            function_type = FunctionType.INITIALIZER if method.name.lexeme == "init" else FunctionType.METHOD
+            self.function(method, function_type)
+            self.emit(op_code.METHOD, self.make_constant(method.name.lexeme))
+        self.emit(op_code.POP)
+
+        if statement.superclass is not None:
+            self.end_scope()
+
+    # Expressions
+
+    def visit_literal_expr(self, expr: expre.Literal):
+        if expr.value is None:
+            self.emit(op_code.NIL)
+        elif expr.value is True:
+            self.emit(op_code.TRUE)
+        elif expr.value is False:
+            self.emit(op_code.FALSE)
+        else:
+            self.emit_constant(expr.value)
+
+    def visit_grouping_expr(self, expr: expre.Grouping):
+        self.compile_node(expr.expression)
+
+    def visit_variable_expr(self, expr: expre.Variable):
+        self.named_variable(expr.name)
+
+    def visit_assign_expr(self, expr: expre.Assign):
+        self.named_variable(expr.name, expr.value)
+
+    def visit_this_expr(self, expr: expre.This):
+        self.named_variable(expr.keyword)
+
+    def visit_logical_expr(self, expr: expre.Logical):
+        self.compile_node(expr.left)
+
+        if expr.operator.token_type == TokenType.OR:
+            else_jump = self.emit_jump(op_code.JUMP_IF_FALSE)
+            end_jump = self.emit_jump(op_code.JUMP)
+            self.patch_jump(else_jump)
+            self.emit(op_code.POP)
+            self.compile_node(expr.right)
+            self.patch_jump(end_jump)
+        else:
+            end_jump = self.emit_jump(op_code.JUMP_IF_FALSE)
+            self.emit(op_code.POP)
+            self.compile_node(expr.right)
+            self.patch_jump(end_jump)
+
+    def visit_unary_expr(self, expr: expre.Unary):
+        self.compile_node(expr.right)
+        self.line = expr.operator.line
+
+        match expr.operator.token_type:
+            case TokenType.BANG:
+                self.emit(op_code.NOT)
+            case TokenType.MINUS:
+                self.emit(op_code.NEGATE)
+
+    def visit_binary_expr(self, expr: expre.Binary):
+        self.compile_node(expr.left)
+        self.compile_node(expr.right)
+        self.line = expr.operator.line
+
+        match expr.operator.token_type:
+            case TokenType.GREATER:
+                self.emit(op_code.GREATER)
+            case TokenType.GREATER_EQUAL:
+                self.emit(op_code.GREATER_EQUAL)
+            case TokenType.LESS:
+                self.emit(op_code.LESS)
+            case TokenType.LESS_EQUAL:
+                self.emit(op_code.LESS_EQUAL)
+            case TokenType.BANG_EQUAL:
+                self.emit(op_code.NOT_EQUAL)
+            case TokenType.EQUAL_EQUAL:
+                self.emit(op_code.EQUAL)
+            case TokenType.MINUS:
+                self.emit(op_code.SUBTRACT)
+            case TokenType.PLUS:
+                self.emit(op_code.ADD)
+            case TokenType.SLASH:
+                self.emit(op_code.DIVIDE)
+            case TokenType.STAR:
+                self.emit(op_code.MULTIPLY)
+
+    def visit_call_expr(self, expr: expre.Call):
+        callee = expr.callee
+
+        # Like the tree-walker, a method is looked up before its arguments are evaluated.
+        if isinstance(callee, expre.Get):
+            self.compile_node(callee.object)
+            self.line = callee.name.line
+            self.emit(op_code.GET_METHOD, self.make_constant(callee.name.lexeme))
+            for argument in expr.arguments:
+                self.compile_node(argument)
+            self.line = expr.paren.line
+            self.emit(op_code.INVOKE, len(expr.arguments))
+        elif isinstance(callee, expre.Super):
+            self.named_variable(Token(TokenType.THIS, "this", None, callee.keyword.line))
+            self.named_variable(Token(TokenType.SUPER, "super", None, callee.keyword.line))
+            self.line = callee.method.line
+            self.emit(op_code.GET_SUPER_METHOD, self.make_constant(callee.method.lexeme))
+            for argument in expr.arguments:
+                self.compile_node(argument)
+            self.line = expr.paren.line
+            self.emit(op_code.INVOKE, len(expr.arguments))
+        else:
+            self.compile_node(callee)
+            for argument in expr.arguments:
+                self.compile_node(argument)
+            self.line = expr.paren.line
+            self.emit(op_code.CALL, len(expr.arguments))
+
+    def visit_get_expr(self, expr: expre.Get):
+        self.compile_node(expr.object)
+        self.line = expr.name.line
+        self.emit(op_code.GET_PROPERTY, self.make_constant(expr.name.lexeme))
+
+    def visit_set_expr(self, expr: expre.Set):
+        self.compile_node(expr.object)
+        if not isinstance(expr.object, expre.This):
+            self.line = expr.name.line
+            self.emit(op_code.CHECK_FIELDS)
+        self.compile_node(expr.value)
+        self.line = expr.name.line
+        self.emit(op_code.SET_PROPERTY, self.make_constant(expr.name.lexeme))
+
+    def visit_super_expr(self, expr: expre.Super):
+        self.named_variable(Token(TokenType.THIS, "this", None, expr.keyword.line))
+        self.named_variable(Token(TokenType.SUPER, "super", None, expr.keyword.line))
+        self.line = expr.method.line
+        self.emit(op_code.GET_SUPER, self.make_constant(expr.method.lexeme))
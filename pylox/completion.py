@@ -0,0 +1,4 @@
+# Running a statement returns None, or RETURN once a return statement ran, which blocks, ifs and loops pass up
+# without running anything else. The interpreter then holds the returned value in return_value until the function
+# running the statements takes it, so returning costs no exception.
+RETURN = object()
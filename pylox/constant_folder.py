@@ -0,0 +1,119 @@
+import expr as expre
+import stmt
+
+from ast_transformer import AstTransformer
+from binding import Binding
+from interpreter import Interpreter
+from token_type import TokenType
+
+
+class ConstantFolder(AstTransformer):
+    """Evaluates what can be evaluated before running the program.
+
+    Operations whose operands are literals are replaced by their result, reads of a variable declared once with a
+    literal value and never assigned are replaced by that value, and an if on a literal condition keeps only the
+    branch it takes. An operation that would fail at runtime, such as -"a" or 1 / 0, is left as is so the
+    interpreter still reports it.
+    """
+
+    def __init__(self, bindings: dict, whole_program: bool):
+        self.bindings = bindings
+        self.whole_program = whole_program
+        self.constants = {}
+
+    def optimize(self, statements: list[stmt.Stmt]) -> list[stmt.Stmt]:
+        return self.transform_statements(statements)
+
+    def is_constant(self, binding: Binding | None) -> bool:
+        # Outside of a whole program (the REPL), a later line could still assign a global.
+        return binding is not None and binding.declarations == 1 and binding.assignments == 0 and \
+            (self.whole_program or not binding.is_global)
+
+    def visit_var_stmt(self, statement: stmt.Var):
+        super().visit_var_stmt(statement)
+
+        binding = self.bindings.get(statement)
+        if self.is_constant(binding):
+            if statement.initializer is None:
+                self.constants[binding] = None
+            elif isinstance(statement.initializer, expre.Literal):
+                self.constants[binding] = statement.initializer.value
+        return statement
+
+    def visit_if_stmt(self, statement: stmt.If):
+        super().visit_if_stmt(statement)
+
+        if not isinstance(statement.condition, expre.Literal):
+            return statement
+
+        # The if and its condition go away with the branch that is not taken.
+        self.removed += 2
+        if Interpreter.is_truthy(statement.condition.value):
+            self.remove(statement.else_branch)
+            return statement.then_branch
+        self.remove(statement.then_branch)
+        return statement.else_branch
+
+    def visit_variable_expr(self, expr: expre.Variable):
+        binding = self.bindings.get(expr)
+        if binding in self.constants:
+            return expre.Literal(self.constants[binding])
+        return expr
+
+    def visit_grouping_expr(self, expr: expre.Grouping):
+        return self.transform(expr.expression)
+
+    def visit_logical_expr(self, expr: expre.Logical):
+        super().visit_logical_expr(expr)
+
+        if not isinstance(expr.left, expre.Literal):
+            return expr
+        if Interpreter.is_truthy(expr.left.value) == (expr.operator.token_type == TokenType.OR):
+            return expr.left
+        return expr.right
+
+    def visit_unary_expr(self, expr: expre.Unary):
+        super().visit_unary_expr(expr)
+
+        if not isinstance(expr.right, expre.Literal):
+            return expr
+
+        value = expr.right.value
+        match expr.operator.token_type:
+            case TokenType.BANG:
+                return expre.Literal(not Interpreter.is_truthy(value))
+            case TokenType.MINUS if isinstance(value, float):
+                return expre.Literal(-value)
+        return expr
+
+    def visit_binary_expr(self, expr: expre.Binary):
+        super().visit_binary_expr(expr)
+
+        if not isinstance(expr.left, expre.Literal) or not isinstance(expr.right, expre.Literal):
+            return expr
+
+        left = expr.left.value
+        right = expr.right.value
+        numbers = isinstance(left, float) and isinstance(right, float)
+        match expr.operator.token_type:
+            case TokenType.EQUAL_EQUAL:
+                return expre.Literal(Interpreter.is_equal(left, right))
+            case TokenType.BANG_EQUAL:
+                return expre.Literal(not Interpreter.is_equal(left, right))
+            case TokenType.PLUS if numbers or isinstance(left, str) and isinstance(right, str):
+                return expre.Literal(left + right)
+            case TokenType.MINUS if numbers:
+                return expre.Literal(left - right)
+            case TokenType.STAR if numbers:
+                return expre.Literal(left * right)
+            case TokenType.SLASH if numbers and right != 0:
+                return expre.Literal(left / right)
+            case TokenType.GREATER if numbers:
+                return expre.Literal(left > right)
+            case TokenType.GREATER_EQUAL if numbers:
+                return expre.Literal(left >= right)
+            case TokenType.LESS if numbers:
+                return expre.Literal(left < right)
+            case TokenType.LESS_EQUAL if numbers:
+                return expre.Literal(left <= right)
+        return expr
@@ -0,0 +1,27 @@
+from lox_callable import LoxCallable
+from stats import Stats
+
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+    from interpreter import Interpreter
+
+
+class CountedNative(LoxCallable):
+    """Native function counting its calls into the stats of a StatsInterpreter."""
+    __slots__ = ("native", "stats")
+
+    def __init__(self, native: LoxCallable, stats: Stats):
+        self.native = native
+        self.stats = stats
+
+    def arity(self):
+        return self.native.arity()
+
+    def call(self, interpreter: "Interpreter", arguments: "list[Any]"):
+        self.stats.native_calls += 1
+        return self.native.call(interpreter, arguments)
+
+    def __str__(self):
+        return str(self.native)
@@ -0,0 +1,80 @@
+import expr as expre
+import stmt
+
+from ast_transformer import AstTransformer
+from binding import Binding
+from interpreter import Interpreter
+
+
+class DeadCodeEliminator(AstTransformer):
+    """Removes what can't change the output of the program.
+
+    Dropped are the statements following a return in the same block, loops whose condition is a falsy literal,
+    declarations of variables, functions and classes that are never read nor assigned (when their initializer has
+    no side effect), and expression statements with no side effect.
+    """
+
+    def __init__(self, bindings: dict, whole_program: bool):
+        self.bindings = bindings
+        self.whole_program = whole_program
+        self.removed = 0
+
+    def optimize(self, statements: list[stmt.Stmt]) -> list[stmt.Stmt]:
+        return self.transform_statements(statements)
+
+    def transform_statements(self, statements: list[stmt.Stmt]) -> list[stmt.Stmt]:
+        transformed = []
+        for i, statement in enumerate(statements):
+            statement = self.transform(statement)
+            if statement is None:
+                continue
+
+            transformed.append(statement)
+            if self.always_returns(statement):
+                for unreachable in statements[i + 1:]:
+                    self.remove(unreachable)
+                break
+        return transformed
+
+    def always_returns(self, statement: stmt.Stmt) -> bool:
+        match statement:
+            case stmt.Return():
+                return True
+            case stmt.Block():
+                return len(statement.statements) != 0 and self.always_returns(statement.statements[-1])
+            case stmt.If() if statement.else_branch is not None:
+                return self.always_returns(statement.then_branch) and self.always_returns(statement.else_branch)
+        return False
+
+    def is_unused(self, declaration: stmt.Stmt) -> bool:
+        binding: Binding = self.bindings.get(declaration)
+        # Outside of a whole program (the REPL), a later line could still use a global.
+        return binding is not None and binding.reads == 0 and binding.assignments == 0 and \
+            binding.declarations == 1 and (self.whole_program or not binding.is_global)
+
+    def visit_var_stmt(self, statement: stmt.Var):
+        super().visit_var_stmt(statement)
+        if self.is_unused(statement) and self.is_pure(statement.initializer):
+            return self.remove(statement)
+        return statement
+
+    def visit_function_stmt(self, statement: stmt.Function):
+        if self.is_unused(statement):
+            return self.remove(statement)
+        return super().visit_function_stmt(statement)
+
+    def visit_class_stmt(self, statement: stmt.Class):
+        if statement.superclass is None and self.is_unused(statement):
+            return self.remove(statement)
+        return super().visit_class_stmt(statement)
+
+    def visit_expression_stmt(self, statement: stmt.Expression):
+        super().visit_expression_stmt(statement)
+        if self.is_pure(statement.expression):
+            return self.remove(statement)
+        return statement
+
+    def visit_while_stmt(self, statement: stmt.While):
+        if isinstance(statement.condition, expre.Literal) and not Interpreter.is_truthy(statement.condition.value):
+            return self.remove(statement)
+        return super().visit_while_stmt(statement)
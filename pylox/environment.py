@@ -1,16 +1,19 @@
-from typing import Any
-
-from runtime_exception import RuntimeException
-from token_class import Token
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
 
 
 class Environment:
-    def __init__(self, enclosing: 'Environment' = None):
+    """Frame of a local scope. The Resolver numbers the variables of each scope in declaration order, which is
+    also the order they are defined in at runtime, so a variable is reached with its (distance, slot) pair."""
+    __slots__ = ("enclosing", "values")
+
+    def __init__(self, enclosing: 'Environment' = None, values: 'list[Any]' = None):
         self.enclosing = enclosing
-        self.values = {}
+        self.values = [] if values is None else values
 
-    def define(self, name: str, value: Any):
-        self.values[name] = value
+    def define(self, name: str, value: 'Any'):
+        self.values.append(value)
 
     def ancestor(self, distance: int) -> 'Environment':
         environment = self
@@ -19,28 +22,8 @@ class Environment:
 
         return environment
 
-    def get_at(self, distance: int, name: str) -> Any:
-        return self.ancestor(distance).values.get(name)
-
-    def assign_at(self, distance: int, name: Token, value: Any):
-        self.ancestor(distance).values[name.lexeme] = value
-
-    def get(self, name: Token) -> Any:
-        if name.lexeme in self.values.keys():
-            return self.values[name.lexeme]
-
-        if self.enclosing is not None:
-            return self.enclosing.get(name)
-
-        raise RuntimeException(name, f"Undefined variable {name.lexeme}.")
-
-    def assign(self, name: Token, value: Any):
-        if name.lexeme in self.values.keys():
-            self.values[name.lexeme] = value
-            return None
-
-        if self.enclosing is not None:
-            self.enclosing.assign(name, value)
-            return None
+    def get_at(self, distance: int, slot: int) -> 'Any':
+        return self.ancestor(distance).values[slot]
 
-        raise RuntimeException(name, f"Undefined variable {name.lexeme}.")
+    def assign_at(self, distance: int, slot: int, value: 'Any'):
+        self.ancestor(distance).values[slot] = value
@@ -1,8 +1,11 @@
 from abc import ABC, abstractmethod
+from inline_cache import InlineCache
 from token_class import Token
 
 
 class Expr(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def accept(self, visitor):
         pass
@@ -57,18 +60,32 @@ class Visitor(ABC):
     def visit_variable_expr(self, expr):
         pass
 
+    def visit_quickened_binary_expr(self, expr):
+        # Only the Interpreter evaluates quickened nodes differently; to any other visitor they are plain Binary.
+        return self.visit_binary_expr(expr)
+
 
 # Expr subclasses
+# Assign, Super, This and Variable carry what the Resolver found for them: the distance to the frame holding the
+# variable and its slot in that frame, or a depth of None for a global.
+# calls tells the stackless engine whether evaluating the node can call Lox code. Nodes with subexpressions get it in
+# a slot, set the first time the engine asks; the others know it from their class.
 class Assign(Expr):
+    __slots__ = ("name", "value", "depth", "slot", "calls")
+
     def __init__(self, name, value):
         self.name = name
         self.value = value
+        self.depth = None
+        self.slot = 0
 
     def accept(self, visitor):
         return visitor.visit_assign_expr(self)
 
 
 class Binary(Expr):
+    __slots__ = ("left", "operator", "right", "calls")
+
     def __init__(self, left, operator: Token, right):
         self.left = left
         self.operator = operator
@@ -79,6 +96,9 @@ class Binary(Expr):
 
 
 class Call(Expr):
+    __slots__ = ("callee", "paren", "arguments")
+    calls = True
+
     def __init__(self, callee, paren, arguments):
         self.callee = callee
         self.paren = paren
@@ -89,15 +109,20 @@ class Call(Expr):
 
 
 class Get(Expr):
+    __slots__ = ("object", "name", "cache", "calls")
+
     def __init__(self, obj, name):
         self.object = obj
         self.name = name
+        self.cache = InlineCache()
 
     def accept(self, visitor):
         return visitor.visit_get_expr(self)
 
 
 class Grouping(Expr):
+    __slots__ = ("expression", "calls")
+
     def __init__(self, expression):
         self.expression = expression
 
@@ -106,6 +131,9 @@ class Grouping(Expr):
 
 
 class Literal(Expr):
+    __slots__ = ("value",)
+    calls = False
+
     def __init__(self, value):
         self.value = value
 
@@ -114,6 +142,8 @@ class Literal(Expr):
 
 
 class Logical(Expr):
+    __slots__ = ("left", "operator", "right", "calls")
+
     def __init__(self, left, operator, right):
         self.left = left
         self.operator = operator
@@ -124,33 +154,48 @@ class Logical(Expr):
 
 
 class Set(Expr):
+    __slots__ = ("object", "name", "value", "cache", "calls")
+
     def __init__(self, obj, name, value):
         self.object = obj
         self.name = name
         self.value = value
+        self.cache = InlineCache()
 
     def accept(self, visitor):
         return visitor.visit_set_expr(self)
 
 
 class Super(Expr):
+    __slots__ = ("keyword", "method", "depth", "slot")
+    calls = False
+
     def __init__(self, keyword, method):
         self.keyword = keyword
         self.method = method
+        self.depth = None
+        self.slot = 0
 
     def accept(self, visitor):
         return visitor.visit_super_expr(self)
 
 
 class This(Expr):
+    __slots__ = ("keyword", "depth", "slot")
+    calls = False
+
     def __init__(self, keyword):
         self.keyword = keyword
+        self.depth = None
+        self.slot = 0
 
     def accept(self, visitor):
         return visitor.visit_this_expr(self)
 
 
 class Unary(Expr):
+    __slots__ = ("operator", "right", "calls")
+
     def __init__(self, operator, right):
         self.operator = operator
         self.right = right
@@ -160,8 +205,13 @@ class Unary(Expr):
 
 
 class Variable(Expr):
+    __slots__ = ("name", "depth", "slot")
+    calls = False
+
     def __init__(self, name):
         self.name = name
+        self.depth = None
+        self.slot = 0
 
     def accept(self, visitor):
         return visitor.visit_variable_expr(self)
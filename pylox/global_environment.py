@@ -0,0 +1,38 @@
+from natives import NATIVES, load_native
+from runtime_exception import RuntimeException
+from token_class import Token
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
+
+class GlobalEnvironment:
+    """Top-level scope. Globals are not resolved, since they can be used before their declaration, so they stay
+    looked up by name. Native functions are only defined the first time their name is looked up, see natives.py."""
+    __slots__ = ("enclosing", "values")
+
+    def __init__(self):
+        self.enclosing = None
+        self.values = {}
+
+    def define(self, name: str, value: 'Any'):
+        self.values[name] = value
+
+    def get(self, name: Token) -> 'Any':
+        if name.lexeme in self.values.keys():
+            return self.values[name.lexeme]
+
+        native = load_native(name.lexeme)
+        if native is not None:
+            self.values[name.lexeme] = native
+            return native
+
+        raise RuntimeException(name, f"Undefined variable {name.lexeme}.")
+
+    def assign(self, name: Token, value: 'Any'):
+        if name.lexeme in self.values.keys() or name.lexeme in NATIVES:
+            self.values[name.lexeme] = value
+            return None
+
+        raise RuntimeException(name, f"Undefined variable {name.lexeme}.")
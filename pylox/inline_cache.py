@@ -0,0 +1,89 @@
+from runtime_exception import RuntimeException
+from token_class import Token
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+    from lox_function import LoxFunction
+    from lox_instance import LoxInstance
+    from shape import Shape
+
+
+POLYMORPHIC_LIMIT = 4
+
+
+class InlineCache:
+    """Cache of a Get or Set site, keyed on the shape of the instances seen there.
+
+    The first shape is checked with a single identity test (monomorphic). Up to POLYMORPHIC_LIMIT other shapes go in
+    a small dict (polymorphic), only made when a second shape shows up, since most sites never see one; past that the
+    site is megamorphic and misses do the full lookup without caching.
+
+    A Get entry is the field slot, or the method found on the class. A Set entry is the field slot, or the shape the
+    instance moves to when the field is added.
+    """
+    __slots__ = ("shape", "entry", "entries")
+
+    # Stats of the StatsInterpreter running, which lookup() counts the find_method() calls of its misses into, for
+    # --stats. None otherwise, so that only misses pay for the check.
+    stats = None
+
+    def __init__(self):
+        self.shape = None
+        self.entry = None
+        self.entries = None
+
+    def __reduce__(self):
+        # The shapes cached only mean something in the run that saw them, so a pickled cache is an empty one.
+        return InlineCache, ()
+
+    def lookup(self, instance: 'LoxInstance', name: Token) -> 'int | LoxFunction':
+        shape = instance.shape
+        if shape is self.shape:
+            return self.entry
+
+        entries = self.entries
+        entry = None if entries is None else entries.get(shape)
+        if entry is None:
+            entry = shape.lookup(name.lexeme)
+            stats = InlineCache.stats
+            if stats is not None and entry.__class__ is not int:
+                stats.find_methods += 1
+            if entry is None:
+                raise RuntimeException(name, f"Undefined property '{name.lexeme}'.")
+            self.add(shape, entry)
+        return entry
+
+    def get(self, instance: 'LoxInstance', name: Token) -> 'Any':
+        entry = self.entry if instance.shape is self.shape else self.lookup(instance, name)
+        if entry.__class__ is int:
+            return instance.values[entry]
+        return entry.bind(instance)
+
+    def set(self, instance: 'LoxInstance', name: Token, value: 'Any'):
+        shape = instance.shape
+        if shape is self.shape:
+            entry = self.entry
+        else:
+            entries = self.entries
+            entry = None if entries is None else entries.get(shape)
+            if entry is None:
+                entry = shape.slots.get(name.lexeme)
+                if entry is None:
+                    entry = shape.with_field(name.lexeme)
+                self.add(shape, entry)
+
+        if entry.__class__ is int:
+            instance.values[entry] = value
+        else:
+            instance.shape = entry
+            instance.values.append(value)
+
+    def add(self, shape: 'Shape', entry: 'Any'):
+        if self.shape is None:
+            self.shape = shape
+            self.entry = entry
+        elif self.entries is None:
+            self.entries = {shape: entry}
+        elif len(self.entries) < POLYMORPHIC_LIMIT:
+            self.entries[shape] = entry
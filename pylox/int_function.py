@@ -1,12 +1,9 @@
-from typing import Any
-
 from lox_callable import LoxCallable
 
 
-from typing import TYPE_CHECKING
-
-
+TYPE_CHECKING = False
 if TYPE_CHECKING:
+    from typing import Any
     from interpreter import Interpreter
 
 
@@ -14,7 +11,7 @@ class IntFunction(LoxCallable):
     def arity(self):
         return 1
 
-    def call(self, interpreter: "Interpreter", arguments: list[Any]):
+    def call(self, interpreter: "Interpreter", arguments: "list[Any]"):
         try:
             return float(arguments[0])
         except ValueError:
@@ -1,34 +1,35 @@
-from typing import Any
-
 import expr as expre
 import stmt
 
 from environment import Environment
+from global_environment import GlobalEnvironment
 from lox_callable import LoxCallable
-from clock_function import ClockFunction
 from lox_function import LoxFunction
 from lox_class import LoxClass
 from lox_instance import LoxInstance
-from int_function import IntFunction
-from randint_function import RandintFunction
-from str_function import StrFunction
+from quickened_expr import QUICKENED, DeoptimizedBinary
 from runtime_exception import RuntimeException
-from return_exception import Return
+from stats import Stats
+from completion import RETURN
+from tail_call import TailCall
 from token_class import Token
 from token_type import TokenType
 
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any
+
 
 class Interpreter(expre.Visitor, stmt.Visitor):
-    def __init__(self, program):
+    def __init__(self, program, quicken: bool = True):
         self.program = program
-        self.globals = Environment()
+        self.quicken = quicken
+        self.globals = GlobalEnvironment()
         self.environment = self.globals
-        self.locals = {}
-
-        self.globals.define("clock", ClockFunction())
-        self.globals.define("str", StrFunction())
-        self.globals.define("float", IntFunction())
-        self.globals.define("randint", RandintFunction())
+        # Value of the last return statement run, see completion.py.
+        self.return_value = None
+        # Runtime counters printed by --stats, see stats.py.
+        self.stats = Stats()
 
     def interprete(self, statements: list[stmt.Stmt]):
         try:
@@ -38,7 +39,7 @@ class Interpreter(expre.Visitor, stmt.Visitor):
             self.program.call_runtime_error(e)
 
     @staticmethod
-    def stringify(to_string: Any) -> str:
+    def stringify(to_string: 'Any') -> str:
         if to_string is None:
             return "nil"
 
@@ -61,10 +62,13 @@ class Interpreter(expre.Visitor, stmt.Visitor):
 
     def visit_return_stmt(self, statement: stmt.Return):
         value = None
-        if statement.value is not None:
+        if statement.tail_call:
+            value = self.visit_call_expr(statement.value, True)
+        elif statement.value is not None:
             value = self.evaluate(statement.value)
 
-        raise Return(value)
+        self.return_value = value
+        return RETURN
 
     def visit_expression_stmt(self, statement):
         self.evaluate(statement.expression)
@@ -81,10 +85,11 @@ class Interpreter(expre.Visitor, stmt.Visitor):
 
     def visit_while_stmt(self, statement: stmt.While):
         while self.is_truthy(self.evaluate(statement.condition)):
-            self.execute(statement.body)
+            if self.execute(statement.body) is RETURN:
+                return RETURN
 
     def visit_block_stmt(self, statement: stmt.Block):
-        self.execute_block(statement.statements, Environment(self.environment))
+        return self.execute_block(statement.statements, Environment(self.environment))
 
     def visit_class_stmt(self, statement: stmt.Class):
         superclass = None
@@ -93,8 +98,6 @@ class Interpreter(expre.Visitor, stmt.Visitor):
             if not isinstance(superclass, LoxClass):
                 raise RuntimeException(statement.superclass.name, "Superclass must be a class.")
 
-        self.environment.define(statement.name.lexeme, None)
-
         if statement.superclass is not None:
             self.environment = Environment(self.environment)
             self.environment.define("super", superclass)
@@ -109,20 +112,19 @@ class Interpreter(expre.Visitor, stmt.Visitor):
         if statement.superclass is not None:
             self.environment = self.environment.enclosing
 
-        self.environment.assign(statement.name, klass)
+        self.environment.define(statement.name.lexeme, klass)
 
     def visit_if_stmt(self, statement: stmt.If):
         if self.is_truthy(self.evaluate(statement.condition)):
-            self.execute(statement.then_branch)
+            return self.execute(statement.then_branch)
         elif statement.else_branch is not None:
-            self.execute(statement.else_branch)
+            return self.execute(statement.else_branch)
 
     def visit_assign_expr(self, expr: expre.Assign):
         value = self.evaluate(expr.value)
 
-        distance = self.locals[expr]
-        if distance is not None:
-            self.environment.assign_at(distance, expr.name, value)
+        if expr.depth is not None:
+            self.environment.assign_at(expr.depth, expr.slot, value)
         else:
             self.globals.assign(expr.name, value)
 
@@ -132,6 +134,25 @@ class Interpreter(expre.Visitor, stmt.Visitor):
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
 
+        if self.quicken and expr.__class__ is expre.Binary and left.__class__ is right.__class__:
+            quickened = QUICKENED.get((left.__class__, expr.operator.token_type))
+            if quickened is not None:
+                expr.__class__ = quickened
+
+        return self.binary_operation(expr, left, right)
+
+    def visit_quickened_binary_expr(self, expr):
+        left = self.evaluate(expr.left)
+        right = self.evaluate(expr.right)
+
+        operand_type = expr.operand_type
+        if left.__class__ is operand_type and right.__class__ is operand_type:
+            return expr.operation(left, right)
+
+        expr.__class__ = DeoptimizedBinary
+        return self.binary_operation(expr, left, right)
+
+    def binary_operation(self, expr: expre.Binary, left: 'Any', right: 'Any') -> 'Any':
         match expr.operator.token_type:
             case TokenType.GREATER:
                 self.check_number_operands(expr.operator, left, right)
@@ -167,7 +188,11 @@ class Interpreter(expre.Visitor, stmt.Visitor):
 
         return None
 
-    def visit_call_expr(self, expr: expre.Call):
+    def visit_call_expr(self, expr: expre.Call, tail: bool = False):
+        # A tail call to a Lox function is returned as a TailCall, for the running LoxFunction to make.
+        if expr.callee.__class__ is expre.Get:
+            return self.invoke(expr, expr.callee, tail)
+
         callee = self.evaluate(expr.callee)
 
         arguments = []
@@ -181,12 +206,40 @@ class Interpreter(expre.Visitor, stmt.Visitor):
 
         if len(arguments) != function_call.arity():
             raise RuntimeException(expr.paren, f"Expected {function_call.arity()} arguments but got {len(arguments)}.")
+        if tail and isinstance(function_call, LoxFunction):
+            return TailCall(function_call, function_call.frame(arguments))
         return function_call.call(self, arguments)
 
+    def invoke(self, expr: expre.Call, get: expre.Get, tail: bool = False):
+        # instance.method(...) calls the method with the instance in its frame, without binding it first.
+        obj = self.evaluate(get.object)
+        if not isinstance(obj, LoxInstance):
+            raise RuntimeException(get.name, "Only instances have properties.")
+
+        entry = get.cache.lookup(obj, get.name)
+        if entry.__class__ is int:
+            callee = obj.values[entry]
+        else:
+            arguments = [self.evaluate(argument) for argument in expr.arguments]
+            if len(arguments) != entry.arity():
+                raise RuntimeException(expr.paren, f"Expected {entry.arity()} arguments but got {len(arguments)}.")
+            if tail:
+                return TailCall(entry, entry.frame(arguments, obj))
+            return entry.invoke(self, obj, arguments)
+
+        arguments = [self.evaluate(argument) for argument in expr.arguments]
+        if not isinstance(callee, LoxCallable):
+            raise RuntimeException(expr.paren, "Can only call functions and classes.")
+        if len(arguments) != callee.arity():
+            raise RuntimeException(expr.paren, f"Expected {callee.arity()} arguments but got {len(arguments)}.")
+        if tail and isinstance(callee, LoxFunction):
+            return TailCall(callee, callee.frame(arguments))
+        return callee.call(self, arguments)
+
     def visit_get_expr(self, expr: expre.Get):
         obj = self.evaluate(expr.object)
         if isinstance(obj, LoxInstance):
-            return obj.get(expr.name)
+            return expr.cache.get(obj, expr.name)
         raise RuntimeException(expr.name, "Only instances have properties.")
 
     def visit_grouping_expr(self, expr: expre.Grouping):
@@ -214,14 +267,13 @@ class Interpreter(expre.Visitor, stmt.Visitor):
             raise RuntimeException(expr.name, "Only instances have fields.")
 
         value = self.evaluate(expr.value)
-        obj.set(expr.name, value)
+        expr.cache.set(obj, expr.name, value)
         return value
 
     def visit_super_expr(self, expr: expre.Super):
-        distance = self.locals.get(expr)
-        superclass = self.environment.get_at(distance, "super")
+        superclass = self.environment.get_at(expr.depth, 0)
 
-        obj = self.environment.get_at(distance - 1, "this")
+        obj = self.environment.get_at(expr.depth - 1, 0)
 
         method = superclass.find_method(expr.method.lexeme)
 
@@ -234,8 +286,9 @@ class Interpreter(expre.Visitor, stmt.Visitor):
         return self.look_up_variable(expr.keyword, expr)
 
     def visit_unary_expr(self, expr: expre.Unary):
-        right = self.evaluate(expr.right)
+        return self.unary_operation(expr, self.evaluate(expr.right))
 
+    def unary_operation(self, expr: expre.Unary, right: 'Any') -> 'Any':
         match expr.operator.token_type:
             case TokenType.BANG:
                 return not self.is_truthy(right)
@@ -248,20 +301,16 @@ class Interpreter(expre.Visitor, stmt.Visitor):
     def visit_variable_expr(self, expr: expre.Variable):
         return self.look_up_variable(expr.name, expr)
 
-    def look_up_variable(self, name: Token, expr: expre.Expr):
-        distance = self.locals.get(expr)
-        if distance is not None:
-            return self.environment.get_at(distance, name.lexeme)
+    def look_up_variable(self, name: Token, expr: expre.Variable | expre.This):
+        if expr.depth is not None:
+            return self.environment.get_at(expr.depth, expr.slot)
         return self.globals.get(name)
 
-    def evaluate(self, expr: expre.Expr) -> Any:
+    def evaluate(self, expr: expre.Expr) -> 'Any':
         return expr.accept(self)
 
     def execute(self, statement: stmt.Stmt):
-        statement.accept(self)
-
-    def resolve(self, expr: expre.Expr, depth: int):
-        self.locals[expr] = depth
+        return statement.accept(self)
 
     def execute_block(self, statements: list[stmt.Stmt], environment: Environment):
         previous = self.environment
@@ -269,7 +318,8 @@ class Interpreter(expre.Visitor, stmt.Visitor):
             self.environment = environment
 
             for statement in statements:
-                self.execute(statement)
+                if self.execute(statement) is RETURN:
+                    return RETURN
         finally:
             self.environment = previous
 
@@ -282,20 +332,20 @@ class Interpreter(expre.Visitor, stmt.Visitor):
         return True
 
     @staticmethod
-    def is_equal(left: Any, right: Any) -> bool:
+    def is_equal(left: 'Any', right: 'Any') -> bool:
         if left is None and right is None:
             return True
 
         return left == right
 
     @staticmethod
-    def check_number_operand(operator: Token, operand: Any) -> None:
+    def check_number_operand(operator: Token, operand: 'Any') -> None:
         if isinstance(operand, float):
             return None
         raise RuntimeException(operator, "Operand must be a number.")
 
     @staticmethod
-    def check_number_operands(operator: Token, left: Any, right: Any) -> None:
+    def check_number_operands(operator: Token, left: 'Any', right: 'Any') -> None:
         if isinstance(left, float) and isinstance(right, float):
             return None
 
@@ -0,0 +1,7 @@
+class LabelledBody(list):
+    """Statement list of a function or method body, carrying the label the profilers report the function under."""
+    __slots__ = ("label",)
+
+    def __init__(self, statements: list, label: str):
+        super().__init__(statements)
+        self.label = label
@@ -0,0 +1,26 @@
+import stmt
+
+from interpreter import Interpreter
+from labelled_body import LabelledBody
+
+
+class LabellingInterpreter(Interpreter):
+    """Tree-walk interpreter naming the body of each function and method it declares, for the profilers.
+
+    Functions are labelled "name:line" and methods "Class.name:line". The label is kept on the function's body, the
+    statement list every call of the function runs, so it lives exactly as long as the tree.
+    """
+
+    def visit_function_stmt(self, statement: stmt.Function):
+        self.label(statement, f"{statement.name.lexeme}:{statement.name.line}")
+        return super().visit_function_stmt(statement)
+
+    def visit_class_stmt(self, statement: stmt.Class):
+        for method in statement.methods:
+            self.label(method, f"{statement.name.lexeme}.{method.name.lexeme}:{method.name.line}")
+        return super().visit_class_stmt(statement)
+
+    @staticmethod
+    def label(function: stmt.Function, label: str):
+        if function.body.__class__ is not LabelledBody:
+            function.body = LabelledBody(function.body, label)
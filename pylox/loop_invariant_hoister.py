@@ -0,0 +1,201 @@
+from itertools import count
+
+import expr as expre
+import stmt
+
+from ast_transformer import AstTransformer
+from token_class import Token
+from token_type import TokenType
+
+
+class LoopScanner(AstTransformer):
+    """Collects what a loop may change: the bindings it declares, the fields it sets and whether it calls anything."""
+
+    def __init__(self, bindings: dict):
+        self.bindings = bindings
+        self.declared = set()
+        self.set_names = set()
+        self.has_calls = False
+
+    def visit_var_stmt(self, statement: stmt.Var):
+        self.declared.add(self.bindings.get(statement))
+        return super().visit_var_stmt(statement)
+
+    def visit_function_stmt(self, statement: stmt.Function):
+        self.declared.add(self.bindings.get(statement))
+        return super().visit_function_stmt(statement)
+
+    def visit_class_stmt(self, statement: stmt.Class):
+        self.declared.add(self.bindings.get(statement))
+        return super().visit_class_stmt(statement)
+
+    def visit_set_expr(self, expr: expre.Set):
+        self.set_names.add(expr.name.lexeme)
+        return super().visit_set_expr(expr)
+
+    def visit_call_expr(self, expr: expre.Call):
+        self.has_calls = True
+        return super().visit_call_expr(expr)
+
+
+class LoopInvariantHoister(AstTransformer):
+    """Computes the loop-invariant parts of a while loop (so of a desugared for loop too) once per loop run.
+
+    An expression is invariant when it only combines literals, 'this', variables declared outside the loop and
+    never assigned, and fields of invariant objects that the loop neither sets nor could set through a call.
+
+    Invariant parts of the condition that are evaluated before anything with an effect are computed into a
+    variable declared right before the loop. Elsewhere in the loop, an invariant part might not run at all or fail,
+    so it is computed the first time it runs, as before, and cached in such a variable: 'h or (h = part)'.
+    The variables are named with a leading digit, so they can't clash with a Lox identifier.
+    """
+
+    def __init__(self, bindings: dict, whole_program: bool):
+        self.bindings = bindings
+        self.whole_program = whole_program
+        self.names = count()
+        self.hoisted_reads = set()
+        # Blocks holding a loop and the declarations hoisted before it, to be merged into the enclosing block.
+        self.hoisting_blocks = set()
+
+    def optimize(self, statements: list[stmt.Stmt]) -> list[stmt.Stmt]:
+        return self.transform_statements(statements)
+
+    def transform_statements(self, statements: list[stmt.Stmt]) -> list[stmt.Stmt]:
+        transformed = []
+        for statement in super().transform_statements(statements):
+            if statement in self.hoisting_blocks:
+                transformed.extend(statement.statements)
+            else:
+                transformed.append(statement)
+        return transformed
+
+    def visit_while_stmt(self, statement: stmt.While):
+        super().visit_while_stmt(statement)
+
+        scanner = LoopScanner(self.bindings)
+        scanner.transform(statement)
+        declarations = []
+        statement.condition = self.hoist_condition(statement.condition, scanner, declarations)
+        statement.body = self.cache_invariants(statement.body, scanner, declarations)
+
+        if not declarations:
+            return statement
+        block = stmt.Block(declarations + [statement])
+        self.hoisting_blocks.add(block)
+        return block
+
+    def is_pure(self, expr: expre.Expr | None) -> bool:
+        return expr in self.hoisted_reads or super().is_pure(expr)
+
+    def is_invariant(self, expr: expre.Expr, loop: LoopScanner) -> bool:
+        match expr:
+            case expre.Literal() | expre.This():
+                return True
+            case expre.Variable():
+                binding = self.bindings.get(expr)
+                return binding is not None and binding.assignments == 0 and binding not in loop.declared and \
+                    (self.whole_program or not binding.is_global)
+            case expre.Grouping():
+                return self.is_invariant(expr.expression, loop)
+            case expre.Unary():
+                return self.is_invariant(expr.right, loop)
+            case expre.Binary() | expre.Logical():
+                return self.is_invariant(expr.left, loop) and self.is_invariant(expr.right, loop)
+            case expre.Get():
+                return not loop.has_calls and expr.name.lexeme not in loop.set_names and \
+                    self.is_invariant(expr.object, loop)
+        return False
+
+    def is_worth_hoisting(self, expr: expre.Expr, loop: LoopScanner) -> bool:
+        return not isinstance(expr, (expre.Literal, expre.Variable, expre.This)) and self.is_invariant(expr, loop)
+
+    def hoisted_variable(self, line: int) -> Token:
+        return Token(TokenType.IDENTIFIER, f"{next(self.names)}_hoisted", None, line)
+
+    def hoist_condition(self, expr: expre.Expr, loop: LoopScanner, declarations: list[stmt.Stmt]) -> expre.Expr:
+        """Hoists the invariant parts of expr reached before anything that could fail or have an effect."""
+        if self.is_worth_hoisting(expr, loop):
+            name = self.hoisted_variable(self.line(expr))
+            declarations.append(stmt.Var(name, expr))
+            read = expre.Variable(name)
+            self.hoisted_reads.add(read)
+            return read
+
+        match expr:
+            case expre.Binary():
+                expr.left = self.hoist_condition(expr.left, loop, declarations)
+                if self.is_pure(expr.left):
+                    expr.right = self.hoist_condition(expr.right, loop, declarations)
+            case expre.Logical():
+                # The right operand only runs depending on the left one.
+                expr.left = self.hoist_condition(expr.left, loop, declarations)
+            case expre.Grouping():
+                expr.expression = self.hoist_condition(expr.expression, loop, declarations)
+            case expre.Unary():
+                expr.right = self.hoist_condition(expr.right, loop, declarations)
+            case expre.Get():
+                expr.object = self.hoist_condition(expr.object, loop, declarations)
+            case expre.Call():
+                expr.callee = self.hoist_condition(expr.callee, loop, declarations)
+                for i in range(len(expr.arguments)):
+                    if not self.is_pure(expr.callee) or not all(map(self.is_pure, expr.arguments[:i])):
+                        break
+                    expr.arguments[i] = self.hoist_condition(expr.arguments[i], loop, declarations)
+        return expr
+
+    def cache_invariants(self, node: stmt.Stmt | expre.Expr | None, loop: LoopScanner,
+                         declarations: list[stmt.Stmt]) -> stmt.Stmt | expre.Expr | None:
+        """Replaces the invariant parts of node by reads of variables caching their first value."""
+        if isinstance(node, expre.Expr) and self.is_worth_hoisting(node, loop):
+            name = self.hoisted_variable(self.line(node))
+            declarations.append(stmt.Var(name, None))
+            return expre.Logical(expre.Variable(name), Token(TokenType.OR, "or", None, name.line),
+                                 expre.Assign(name, node))
+
+        match node:
+            case stmt.Function() | stmt.Class() | None:
+                # Function bodies run whenever they are called, not as part of the loop.
+                return node
+            case stmt.Block():
+                node.statements = [self.cache_invariants(inner, loop, declarations) for inner in node.statements]
+            case stmt.Expression() | stmt.Print():
+                node.expression = self.cache_invariants(node.expression, loop, declarations)
+            case stmt.Var():
+                node.initializer = self.cache_invariants(node.initializer, loop, declarations)
+            case stmt.Return():
+                node.value = self.cache_invariants(node.value, loop, declarations)
+            case stmt.If():
+                node.condition = self.cache_invariants(node.condition, loop, declarations)
+                node.then_branch = self.cache_invariants(node.then_branch, loop, declarations)
+                node.else_branch = self.cache_invariants(node.else_branch, loop, declarations)
+            case stmt.While():
+                node.condition = self.cache_invariants(node.condition, loop, declarations)
+                node.body = self.cache_invariants(node.body, loop, declarations)
+            case expre.Assign():
+                node.value = self.cache_invariants(node.value, loop, declarations)
+            case expre.Binary() | expre.Logical():
+                node.left = self.cache_invariants(node.left, loop, declarations)
+                node.right = self.cache_invariants(node.right, loop, declarations)
+            case expre.Unary():
+                node.right = self.cache_invariants(node.right, loop, declarations)
+            case expre.Grouping():
+                node.expression = self.cache_invariants(node.expression, loop, declarations)
+            case expre.Call():
+                node.callee = self.cache_invariants(node.callee, loop, declarations)
+                node.arguments = [self.cache_invariants(argument, loop, declarations) for argument in node.arguments]
+            case expre.Get():
+                node.object = self.cache_invariants(node.object, loop, declarations)
+            case expre.Set():
+                node.object = self.cache_invariants(node.object, loop, declarations)
+                node.value = self.cache_invariants(node.value, loop, declarations)
+        return node
+
+    @staticmethod
+    def line(expr: expre.Expr) -> int:
+        match expr:
+            case expre.Binary() | expre.Logical() | expre.Unary():
+                return expr.operator.line
+            case expre.Get():
+                return expr.name.line
+        return 0
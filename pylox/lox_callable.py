@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 
 
 class LoxCallable(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def arity(self):
         pass
@@ -1,32 +1,34 @@
 from lox_callable import LoxCallable
 from lox_instance import LoxInstance
 from lox_function import LoxFunction
+from shape import Shape
 
 
 class LoxClass(LoxCallable):
+    __slots__ = ("name", "superclass", "methods", "initializer", "initializer_arity", "shape")
+
     def __init__(self, name: str, superclass: 'LoxClass', methods: dict[str: LoxFunction]):
         self.name = name
         self.superclass = superclass
-        self.methods = methods
+        # Built once when the class is declared: the inherited methods overridden by the class's own, so a lookup
+        # never walks the superclass chain.
+        self.methods = methods if superclass is None else {**superclass.methods, **methods}
+        self.initializer = self.methods.get("init")
+        self.initializer_arity = 0 if self.initializer is None else self.initializer.arity()
+        # Shape of the instances with no field yet, root of the class's transition tree.
+        self.shape = Shape(self, {})
 
     def find_method(self, name: str) -> LoxFunction:
-        if name in self.methods:
-            return self.methods[name]
-
-        if self.superclass is not None:
-            return self.superclass.find_method(name)
+        return self.methods.get(name)
 
     def arity(self) -> int:
-        initializer = self.find_method("init")
-        if initializer is None:
-            return 0
-        return initializer.arity()
+        return self.initializer_arity
 
     def call(self, interpreter, arguments):
+        interpreter.stats.instances += 1
         instance = LoxInstance(self)
-        initializer = self.find_method("init")
-        if initializer is not None:
-            initializer.bind(instance).call(interpreter, arguments)
+        if self.initializer is not None:
+            self.initializer.invoke(interpreter, instance, arguments)
         return instance
 
     def __str__(self):
@@ -1,44 +1,69 @@
-from typing import Any, TYPE_CHECKING
-
 from environment import Environment
-from return_exception import Return
+from completion import RETURN
 from stmt import Function
 from lox_callable import LoxCallable
+from tail_call import TailCall
 
 
+TYPE_CHECKING = False
 if TYPE_CHECKING:
+    from typing import Any
     from interpreter import Interpreter
     from lox_instance import LoxInstance
 
 
 class LoxFunction(LoxCallable):
-    def __init__(self, declaration: Function, closure: Environment, is_initializer: bool):
+    # A method finds its instance in slot 0 of its frame. Calling instance.method(...) passes the instance straight
+    # to invoke(); a bound method, with a receiver, only exists when instance.method is used as a value.
+    __slots__ = ("declaration", "closure", "is_initializer", "receiver")
+
+    def __init__(self, declaration: Function, closure: Environment, is_initializer: bool,
+                 receiver: 'LoxInstance' = None):
         self.declaration = declaration
         self.closure = closure
         self.is_initializer = is_initializer
+        self.receiver = receiver
 
     def bind(self, instance: 'LoxInstance') -> 'LoxFunction':
-        environment = Environment(self.closure)
-        environment.define("this", instance)
-        return LoxFunction(self.declaration, environment, self.is_initializer)
+        return LoxFunction(self.declaration, self.closure, self.is_initializer, instance)
 
     def arity(self) -> int:
         return len(self.declaration.params)
 
-    def call(self, interpreter: 'Interpreter', arguments: list[Any]):
-        environment = Environment(self.closure)
-        for i in range(len(self.declaration.params)):
-            environment.define(self.declaration.params[i].lexeme, arguments[i])
+    def call(self, interpreter: 'Interpreter', arguments: 'list[Any]'):
+        if self.receiver is not None:
+            return self.invoke(interpreter, self.receiver, arguments)
+        return self.run(interpreter, Environment(self.closure, arguments))
 
-        try:
-            interpreter.execute_block(self.declaration.body, environment)
-        except Return as e:
-            if self.is_initializer:
-                return self.closure.get_at(0, "this")
-            return e.value
+    def invoke(self, interpreter: 'Interpreter', instance: 'LoxInstance', arguments: 'list[Any]'):
+        return self.run(interpreter, Environment(self.closure, [instance, *arguments]))
+
+    def frame(self, arguments: 'list[Any]', instance: 'LoxInstance' = None) -> Environment:
+        if instance is None:
+            instance = self.receiver
+        if instance is None:
+            return Environment(self.closure, arguments)
+        return Environment(self.closure, [instance, *arguments])
 
+    def run(self, interpreter: 'Interpreter', environment: Environment):
+        value = None
+        if interpreter.execute_block(self.declaration.body, environment) is RETURN:
+            value = interpreter.return_value
+
+        if self.is_initializer:
+            return environment.values[0]
+        # A call in tail position comes back as a TailCall and runs here, instead of on top of the returning frame.
+        while value.__class__ is TailCall:
+            value = value.function.execute(interpreter, value.environment)
+        return value
+
+    def execute(self, interpreter: 'Interpreter', environment: Environment):
+        """Runs the body once, returning a tail call to the caller's run() loop instead of making it."""
         if self.is_initializer:
-            return self.closure.get_at(0, "this")
+            interpreter.execute_block(self.declaration.body, environment)
+            return environment.values[0]
+        if interpreter.execute_block(self.declaration.body, environment) is RETURN:
+            return interpreter.return_value
 
     def __str__(self):
         return f"<fn {self.declaration.name.lexeme}>"
@@ -1,29 +1,38 @@
-from typing import Any, TYPE_CHECKING
-
 from runtime_exception import RuntimeException
 from token_class import Token
 
+TYPE_CHECKING = False
 if TYPE_CHECKING:
+    from typing import Any
     from lox_class import LoxClass
 
 
 class LoxInstance:
+    # Field values are stored in the order the fields were added; the shape maps their names to those slots.
+    __slots__ = ("klass", "shape", "values")
+
     def __init__(self, klass: 'LoxClass'):
         self.klass = klass
-        self.fields = {}
+        self.shape = klass.shape
+        self.values = []
 
     def get(self, name: Token):
-        if name.lexeme in self.fields.keys():
-            return self.fields[name.lexeme]
+        entry = self.shape.lookup(name.lexeme)
+        if entry.__class__ is int:
+            return self.values[entry]
 
-        method = self.klass.find_method(name.lexeme)
-        if method is not None:
-            return method.bind(self)
+        if entry is not None:
+            return entry.bind(self)
 
         raise RuntimeException(name, f"Undefined property '{name.lexeme}'.")
 
-    def set(self, name: Token, value: Any):
-        self.fields[name.lexeme] = value
+    def set(self, name: Token, value: 'Any'):
+        slot = self.shape.slots.get(name.lexeme)
+        if slot is not None:
+            self.values[slot] = value
+        else:
+            self.shape = self.shape.with_field(name.lexeme)
+            self.values.append(value)
 
     def __str__(self):
         return f"{self.klass.name} instance"
@@ -0,0 +1,20 @@
+from lox_callable import LoxCallable
+
+
+# Native functions by Lox name, as the module and class implementing them. They are only imported the first time a
+# program looks their name up, so a script that calls no native never pays for them (randint imports random).
+NATIVES = {"clock": ("clock_function", "ClockFunction"),
+           "str": ("str_function", "StrFunction"),
+           "float": ("int_function", "IntFunction"),
+           "randint": ("randint_function", "RandintFunction")}
+
+
+def load_native(name: str) -> LoxCallable | None:
+    """Returns a new instance of the native function called name, None if there is none."""
+    native = NATIVES.get(name)
+    if native is None:
+        return None
+
+    from importlib import import_module
+    module, class_name = native
+    return getattr(import_module(module), class_name)()
@@ -0,0 +1,64 @@
+# Bytecode instructions of the VM backend. An opcode is followed in Chunk.code by its operands,
+# written here after the opcode name. Opcodes are plain ints so the VM dispatch loop compares ints.
+
+CONSTANT = 0          # constant index: push constants[index]
+NIL = 1
+TRUE = 2
+FALSE = 3
+POP = 4
+
+GET_LOCAL = 5         # slot
+SET_LOCAL = 6         # slot
+GET_GLOBAL = 7        # name constant
+DEFINE_GLOBAL = 8     # name constant
+SET_GLOBAL = 9        # name constant
+GET_UPVALUE = 10      # upvalue index
+SET_UPVALUE = 11      # upvalue index
+GET_PROPERTY = 12     # name constant
+SET_PROPERTY = 13     # name constant
+GET_SUPER = 14        # name constant
+
+EQUAL = 15
+NOT_EQUAL = 16
+GREATER = 17
+GREATER_EQUAL = 18
+LESS = 19
+LESS_EQUAL = 20
+ADD = 21
+SUBTRACT = 22
+MULTIPLY = 23
+DIVIDE = 24
+NOT = 25
+NEGATE = 26
+
+PRINT = 27
+JUMP = 28             # forward offset
+JUMP_IF_FALSE = 29    # forward offset, the condition stays on the stack
+LOOP = 30             # backward offset
+CALL = 31             # argument count
+# A method call looks its method up before evaluating the arguments, then calls it with INVOKE. GET_METHOD pushes the
+# method of the receiver, or replaces the receiver by its field and pushes None.
+GET_METHOD = 32       # name constant
+GET_SUPER_METHOD = 33  # name constant: replace the superclass by its method
+INVOKE = 34           # argument count
+CLOSURE = 35          # function constant, then (is_local, index) for each upvalue
+CLOSE_UPVALUE = 36
+RETURN = 37
+
+CLASS = 38            # name constant
+INHERIT = 39
+METHOD = 40           # name constant
+
+# A set checks its object before evaluating the value, unless the object is 'this'.
+CHECK_FIELDS = 41
+
+OPERAND_COUNTS = {CONSTANT: 1, GET_LOCAL: 1, SET_LOCAL: 1, GET_GLOBAL: 1, DEFINE_GLOBAL: 1, SET_GLOBAL: 1,
+                  GET_UPVALUE: 1, SET_UPVALUE: 1, GET_PROPERTY: 1, SET_PROPERTY: 1, GET_SUPER: 1,
+                  JUMP: 1, JUMP_IF_FALSE: 1, LOOP: 1, CALL: 1, GET_METHOD: 1, GET_SUPER_METHOD: 1,
+                  INVOKE: 1, CLOSURE: 1, CLASS: 1, METHOD: 1}
+
+# Opcodes whose first operand is an index in the constant pool.
+CONSTANT_OPERANDS = {CONSTANT, GET_GLOBAL, DEFINE_GLOBAL, SET_GLOBAL, GET_PROPERTY, SET_PROPERTY, GET_SUPER,
+                     GET_METHOD, GET_SUPER_METHOD, CLOSURE, CLASS, METHOD}
+
+NAMES = {value: name for name, value in globals().items() if isinstance(value, int) and name.isupper()}
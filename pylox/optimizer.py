@@ -0,0 +1,39 @@
+import stmt
+
+from constant_folder import ConstantFolder
+from dead_code_eliminator import DeadCodeEliminator
+from loop_invariant_hoister import LoopInvariantHoister
+from resolver import Resolver
+
+
+# Passes run in this order. A pass is built with the bindings of a fresh resolution of the tree and whether the
+# tree is a whole program, then its optimize() returns the rewritten statements.
+PASSES = [ConstantFolder, DeadCodeEliminator, LoopInvariantHoister]
+
+
+class Optimizer:
+    """Runs the optimization passes over a resolved program, between the Resolver and the interpreter.
+
+    The tree is resolved again before each pass, so each one sees the bindings left by the previous passes, and once
+    at the end so that variable depths and slots match the optimized tree.
+    """
+
+    def __init__(self, program, whole_program: bool, passes: list[type] = None):
+        self.program = program
+        self.whole_program = whole_program
+        self.passes = PASSES if passes is None else passes
+        # Number of nodes each pass removed, by pass name.
+        self.removed = {}
+
+    def optimize(self, statements: list[stmt.Stmt]) -> list[stmt.Stmt]:
+        for optimization in self.passes:
+            optimizer = optimization(self.resolve(statements), self.whole_program)
+            statements = optimizer.optimize(statements)
+            self.removed[optimization.__name__] = optimizer.removed
+        self.resolve(statements)
+        return statements
+
+    def resolve(self, statements: list[stmt.Stmt]) -> dict:
+        resolver = Resolver(self.program)
+        resolver.resolve(statements)
+        return resolver.bindings
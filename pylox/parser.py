@@ -3,6 +3,7 @@ from stmt import Stmt, Print, Expression, Var, Block, If, While, Function, Retur
 from token_class import Token
 from token_type import TokenType
 from parse_error import ParseError
+from precedence import Precedence
 
 
 class Parser:
@@ -175,57 +176,85 @@ class Parser:
         self.consume(TokenType.RIGHT_BRACE, "Expect '}' after block.")
         return statements
 
-    def assignment(self) -> Expr:
-        expr = self.or_operator()
+    def expression(self) -> Expr:
+        return self.parse_precedence(Precedence.ASSIGNMENT)
 
-        if self.match(TokenType.EQUAL):
-            equals = self.previous()
-            value = self.assignment()
+    def parse_precedence(self, precedence: Precedence) -> Expr:
+        """Parses an expression made of operators binding at least as tightly as precedence.
 
-            if isinstance(expr, Variable):
-                name = expr.name
+        The rule of the first token builds the leftmost operand. Then, while the next token is an infix operator
+        binding tightly enough, its rule consumes it with its right operand, taking the expression so far as its left
+        operand. Each operand costs a couple of calls instead of one per precedence level.
+        """
+        prefix = PREFIX_RULES.get(self.peek().token_type)
+        if prefix is None:
+            self.error(self.peek(), "Expect expression.")
+        expr = prefix(self, self.advance())
 
-                return Assign(name, value)
-            elif isinstance(expr, Get):
-                get = expr
-                return Set(get.object, get.name, value)
+        while True:
+            rule = INFIX_RULES.get(self.peek().token_type)
+            if rule is None or rule[0] < precedence:
+                return expr
+            expr = rule[1](self, expr, self.advance())
 
-            self.program.show_error(equals, "Invalid assignment target.")
+    # Prefix rules, given the token starting the expression.
 
-        return expr
+    def literal(self, token: Token) -> Expr:
+        match token.token_type:
+            case TokenType.FALSE:
+                return Literal(False)
+            case TokenType.TRUE:
+                return Literal(True)
+            case TokenType.NIL:
+                return Literal(None)
+        return Literal(token.literal)
 
-    def or_operator(self):
-        expr = self.and_operator()
+    def variable(self, token: Token) -> Expr:
+        return Variable(token)
 
-        while self.match(TokenType.OR):
-            current_operator = self.previous()
-            right = self.and_operator()
-            expr = Logical(expr, current_operator, right)
+    def this(self, token: Token) -> Expr:
+        return This(token)
 
-        return expr
+    def super_expression(self, token: Token) -> Expr:
+        self.consume(TokenType.DOT, "Expect '.' after 'super'.")
+        method = self.consume(TokenType.IDENTIFIER, "Expect superclass method name.")
+        return Super(token, method)
 
-    def and_operator(self):
-        expr = self.equality()
+    def grouping(self, token: Token) -> Expr:
+        expression = self.expression()
+        self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+        return Grouping(expression)
 
-        while self.match(TokenType.OR):
-            current_operator = self.previous()
-            right = self.equality()
-            expr = Logical(expr, current_operator, right)
+    def unary(self, operator: Token) -> Expr:
+        return Unary(operator, self.parse_precedence(Precedence.UNARY))
 
-        return expr
+    # Infix rules, given the expression on the left of the operator and the operator.
 
-    def expression(self) -> Expr:
-        return self.assignment()
+    def binary(self, left: Expr, operator: Token) -> Expr:
+        # Left associative: the right operand only takes the operators binding more tightly.
+        return Binary(left, operator, self.parse_precedence(INFIX_RULES[operator.token_type][0] + 1))
+
+    def logical(self, left: Expr, operator: Token) -> Expr:
+        return Logical(left, operator, self.parse_precedence(INFIX_RULES[operator.token_type][0] + 1))
 
-    def equality(self) -> Expr:
-        expression = self.comparison()
+    def call(self, callee: Expr, paren: Token) -> Expr:
+        return self.finish_call(callee)
 
-        while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.previous()
-            right = self.comparison()
-            expression = Binary(expression, operator, right)
+    def get(self, obj: Expr, dot: Token) -> Expr:
+        name = self.consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
+        return Get(obj, name)
 
-        return expression
+    def assignment(self, target: Expr, equals: Token) -> Expr:
+        # Right associative: the value takes another assignment.
+        value = self.parse_precedence(Precedence.ASSIGNMENT)
+
+        if isinstance(target, Variable):
+            return Assign(target.name, value)
+        elif isinstance(target, Get):
+            return Set(target.object, target.name, value)
+
+        self.program.show_error(equals, "Invalid assignment target.")
+        return target
 
     def match(self, *args: TokenType) -> bool:
         for token_type in args:
@@ -291,44 +320,6 @@ class Parser:
 
             self.advance()
 
-    def comparison(self) -> Expr:
-        expression = self.term()
-
-        while self.match(TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL):
-            operator = self.previous()
-            right = self.term()
-            expression = Binary(expression, operator, right)
-
-        return expression
-
-    def term(self) -> Expr:
-        expression = self.factor()
-
-        while self.match(TokenType.MINUS, TokenType.PLUS):
-            operator = self.previous()
-            right = self.factor()
-            expression = Binary(expression, operator, right)
-
-        return expression
-
-    def factor(self) -> Expr:
-        expression = self.unary()
-
-        while self.match(TokenType.SLASH, TokenType.STAR):
-            operator = self.previous()
-            right = self.unary()
-            expression = Binary(expression, operator, right)
-
-        return expression
-
-    def unary(self) -> Expr:
-        if self.match(TokenType.BANG, TokenType.MINUS):
-            operator = self.previous()
-            right = self.unary()
-            return Unary(operator, right)
-
-        return self.call()
-
     def finish_call(self, callee):
         arguments = []
         if not self.check(TokenType.RIGHT_PAREN):
@@ -343,46 +334,32 @@ class Parser:
 
         return Call(callee, paren, arguments)
 
-    def call(self) -> Expr:
-        expr = self.primary()
 
-        while True:
-            if self.match(TokenType.LEFT_PAREN):
-                expr = self.finish_call(expr)
-            elif self.match(TokenType.DOT):
-                name = self.consume(TokenType.IDENTIFIER, "Expect property name after '.'.")
-                expr = Get(expr, name)
-            else:
-                break
-
-        return expr
-
-    def primary(self) -> Expr:
-        if self.match(TokenType.FALSE):
-            return Literal(False)
-        if self.match(TokenType.TRUE):
-            return Literal(True)
-        if self.match(TokenType.NIL):
-            return Literal(None)
-
-        if self.match(TokenType.NUMBER, TokenType.STRING):
-            return Literal(self.previous().literal)
-
-        if self.match(TokenType.SUPER):
-            keyword = self.previous()
-            self.consume(TokenType.DOT, "Expect '.' after 'super'.")
-            method = self.consume(TokenType.IDENTIFIER, "Expect superclass method name.")
-            return Super(keyword, method)
-
-        if self.match(TokenType.THIS):
-            return This(self.previous())
-
-        if self.match(TokenType.IDENTIFIER):
-            return Variable(self.previous())
-
-        if self.match(TokenType.LEFT_PAREN):
-            expression = self.expression()
-            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
-            return Grouping(expression)
-
-        self.error(self.peek(), "Expect expression.")
+PREFIX_RULES = {TokenType.FALSE: Parser.literal,
+                TokenType.TRUE: Parser.literal,
+                TokenType.NIL: Parser.literal,
+                TokenType.NUMBER: Parser.literal,
+                TokenType.STRING: Parser.literal,
+                TokenType.IDENTIFIER: Parser.variable,
+                TokenType.THIS: Parser.this,
+                TokenType.SUPER: Parser.super_expression,
+                TokenType.LEFT_PAREN: Parser.grouping,
+                TokenType.BANG: Parser.unary,
+                TokenType.MINUS: Parser.unary}
+
+# Precedence and rule of each infix operator.
+INFIX_RULES = {TokenType.EQUAL: (Precedence.ASSIGNMENT, Parser.assignment),
+               TokenType.OR: (Precedence.OR, Parser.logical),
+               TokenType.AND: (Precedence.AND, Parser.logical),
+               TokenType.BANG_EQUAL: (Precedence.EQUALITY, Parser.binary),
+               TokenType.EQUAL_EQUAL: (Precedence.EQUALITY, Parser.binary),
+               TokenType.GREATER: (Precedence.COMPARISON, Parser.binary),
+               TokenType.GREATER_EQUAL: (Precedence.COMPARISON, Parser.binary),
+               TokenType.LESS: (Precedence.COMPARISON, Parser.binary),
+               TokenType.LESS_EQUAL: (Precedence.COMPARISON, Parser.binary),
+               TokenType.MINUS: (Precedence.TERM, Parser.binary),
+               TokenType.PLUS: (Precedence.TERM, Parser.binary),
+               TokenType.SLASH: (Precedence.FACTOR, Parser.binary),
+               TokenType.STAR: (Precedence.FACTOR, Parser.binary),
+               TokenType.LEFT_PAREN: (Precedence.CALL, Parser.call),
+               TokenType.DOT: (Precedence.CALL, Parser.get)}
@@ -0,0 +1,14 @@
+from enum import IntEnum
+
+
+class Precedence(IntEnum):
+    # From the loosest binding to the tightest.
+    ASSIGNMENT = 1
+    OR = 2
+    AND = 3
+    EQUALITY = 4
+    COMPARISON = 5
+    TERM = 6
+    FACTOR = 7
+    UNARY = 8
+    CALL = 9
@@ -0,0 +1,129 @@
+import sys
+import time
+
+import expr as expre
+import stmt
+
+
+# Label of the code outside any function.
+SCRIPT = "<script>"
+
+
+class Profiler:
+    """Measurements of --profile: call count, self time and cumulative time of each Lox function, the self time of
+    each call stack, and how many times each statement ran.
+
+    The cumulative time of a recursive function only counts its outermost running call, so it never exceeds the
+    total time.
+    """
+
+    def __init__(self):
+        self.clock = time.perf_counter
+        # Running calls, as [label, call tree node, time spent in the calls it made, start time]. The first one only
+        # holds the call tree's roots. A call tree node is [self time, children nodes by label].
+        self.frames = [[None, [0.0, {}], 0.0, 0.0]]
+        # [calls, self time, cumulative time] by label.
+        self.functions = {}
+        # Number of running calls by label.
+        self.running = {}
+        # Number of runs by statement node.
+        self.hits = {}
+
+    def enter(self, label: str):
+        children = self.frames[-1][1][1]
+        node = children.get(label)
+        if node is None:
+            node = children[label] = [0.0, {}]
+        self.running[label] = self.running.get(label, 0) + 1
+        self.frames.append([label, node, 0.0, self.clock()])
+
+    def leave(self):
+        label, node, children_time, start = self.frames.pop()
+        elapsed = self.clock() - start
+        node[0] += elapsed - children_time
+        self.frames[-1][2] += elapsed
+
+        function = self.functions.get(label)
+        if function is None:
+            function = self.functions[label] = [0, 0.0, 0.0]
+        function[0] += 1
+        function[1] += elapsed - children_time
+        running = self.running[label] - 1
+        self.running[label] = running
+        if running == 0:
+            function[2] += elapsed
+
+    def report(self, folded_path: str, lines: int = 20):
+        """Prints the functions and the most run lines on the standard error, and writes the collapsed stacks to
+        folded_path for flame graph tools."""
+        total = sum(node[0] for node in self.nodes())
+        print(f"{'calls':>10} {'self s':>10} {'self %':>7} {'cumulative s':>13}  function", file=sys.stderr)
+        for label, (calls, own, cumulative) in sorted(self.functions.items(), key=lambda item: -item[1][1]):
+            share = own / total if total else 0
+            print(f"{calls:>10} {own:>10.4f} {share:>7.1%} {cumulative:>13.4f}  {label}", file=sys.stderr)
+
+        hits = {}
+        for statement, count in self.hits.items():
+            line = self.line(statement)
+            hits[line] = hits.get(line, 0) + count
+        print(f"\n{'hits':>10}  line", file=sys.stderr)
+        for line, count in sorted(hits.items(), key=lambda item: -item[1])[:lines]:
+            print(f"{count:>10}  {'?' if line is None else line}", file=sys.stderr)
+
+        with open(folded_path, "w") as f:
+            for stack, own in self.stacks(self.frames[0][1], ()):
+                microseconds = round(own * 1000000)
+                if microseconds > 0:
+                    f.write(f"{';'.join(stack)} {microseconds}\n")
+
+    def nodes(self, node: list = None):
+        node = self.frames[0][1] if node is None else node
+        for child in node[1].values():
+            yield child
+            yield from self.nodes(child)
+
+    def stacks(self, node: list, stack: tuple[str, ...]):
+        """Yields the call stacks below node, from the outermost label, with their self time."""
+        for label, child in node[1].items():
+            yield (*stack, label), child[0]
+            yield from self.stacks(child, (*stack, label))
+
+    @staticmethod
+    def line(node: stmt.Stmt | expre.Expr | None) -> int | None:
+        """Line of the first token of a statement or expression. Literals have no token, so a node starting with one
+        takes the line of its next token, and a loop or an if whose condition is a literal the line of its body.
+        None when the node has no token at all."""
+        match node:
+            case stmt.Var() | stmt.Function() | stmt.Class() | expre.Variable() | expre.Assign():
+                return node.name.line
+            case stmt.Return() | expre.This() | expre.Super():
+                return node.keyword.line
+            case stmt.Expression() | stmt.Print() | expre.Grouping():
+                return Profiler.line(node.expression)
+            case stmt.If():
+                return Profiler.first_line(node.condition, node.then_branch, node.else_branch)
+            case stmt.While():
+                return Profiler.first_line(node.condition, node.body)
+            case stmt.Block():
+                return Profiler.first_line(*node.statements)
+            case expre.Binary() | expre.Logical():
+                line = Profiler.line(node.left)
+                return node.operator.line if line is None else line
+            case expre.Call():
+                line = Profiler.line(node.callee)
+                return node.paren.line if line is None else line
+            case expre.Get() | expre.Set():
+                line = Profiler.line(node.object)
+                return node.name.line if line is None else line
+            case expre.Unary():
+                return node.operator.line
+        return None
+
+    @staticmethod
+    def first_line(*nodes: stmt.Stmt | expre.Expr | None) -> int | None:
+        """Line of the first of the nodes that has one."""
+        for node in nodes:
+            line = Profiler.line(node)
+            if line is not None:
+                return line
+        return None
@@ -0,0 +1,41 @@
+import stmt
+
+from environment import Environment
+from labelled_body import LabelledBody
+from labelling_interpreter import LabellingInterpreter
+from profiler import Profiler, SCRIPT
+
+
+class ProfilingInterpreter(LabellingInterpreter):
+    """Tree-walk interpreter feeding a Profiler, for --profile.
+
+    A Lox call is timed around the execute_block() of its body, which every call of a LoxFunction goes through, tail
+    calls included, so the call paths of the interpreter itself are left alone.
+    """
+
+    def __init__(self, program, quicken: bool = True):
+        super().__init__(program, quicken)
+        self.profiler = Profiler()
+        self.hits = self.profiler.hits
+
+    def interprete(self, statements: list[stmt.Stmt]):
+        self.profiler.enter(SCRIPT)
+        try:
+            super().interprete(statements)
+        finally:
+            self.profiler.leave()
+
+    def execute(self, statement: stmt.Stmt):
+        hits = self.hits
+        hits[statement] = hits.get(statement, 0) + 1
+        return statement.accept(self)
+
+    def execute_block(self, statements: list[stmt.Stmt], environment: Environment):
+        if statements.__class__ is not LabelledBody:
+            return super().execute_block(statements, environment)
+
+        self.profiler.enter(statements.label)
+        try:
+            return super().execute_block(statements, environment)
+        finally:
+            self.profiler.leave()
@@ -0,0 +1,108 @@
+import gc
+import hashlib
+import os
+import pickle
+import stat
+import sys
+
+from stmt import Stmt
+
+
+# Bumped whenever the front end changes what it produces for the same source, on top of the interpreter sources
+# fingerprint below, which catches the changes nobody bumped it for.
+VERSION = 1
+DIRECTORY = "__loxcache__"
+INTERPRETER_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+class ProgramCache:
+    """Cache file of a script's scanned, parsed, resolved and optimized statements, in a __loxcache__ folder next to
+    it, like Python's __pycache__.
+
+    The file starts with a key hashing the source, the options changing the front end's output, VERSION, the Python
+    version and the size and modification time of every interpreter source file; the pickled statements and
+    optimizer report follow. A file whose key doesn't match, or that can't be read, is ignored and written again.
+    Nothing is cached for sources with errors, so they are reported on every run.
+
+    Unpickling runs whatever code the file asks for, so a cache file is trusted like the script next to it: it is only
+    loaded when the current user owns it and nobody else can write it, and written that way. Where file owners don't
+    exist (Windows), the folder's permissions are all that protect it.
+    """
+
+    # Hash of the interpreter source files' names, sizes and modification times, computed once per process.
+    fingerprint: bytes = None
+
+    def __init__(self, script_path: str, source: str, optimize: bool):
+        directory, name = os.path.split(script_path)
+        self.path = os.path.join(directory, DIRECTORY, name + ".pickle")
+        self.key = self.compute_key(source, optimize)
+
+    @classmethod
+    def compute_key(cls, source: str, optimize: bool) -> bytes:
+        if cls.fingerprint is None:
+            sources = hashlib.sha256()
+            for name in sorted(os.listdir(INTERPRETER_DIRECTORY)):
+                if name.endswith(".py"):
+                    status = os.stat(os.path.join(INTERPRETER_DIRECTORY, name))
+                    sources.update(f"{name} {status.st_size} {status.st_mtime_ns}".encode())
+            cls.fingerprint = sources.digest()
+
+        digest = hashlib.sha256(f"{VERSION} {sys.implementation.cache_tag} {optimize}".encode())
+        digest.update(cls.fingerprint)
+        digest.update(source.encode())
+        return digest.digest()
+
+    @staticmethod
+    def trusted(status: os.stat_result) -> bool:
+        """Whether a cache file is owned by the current user and not writable by anyone else."""
+        if status.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            return False
+        return not hasattr(os, "getuid") or status.st_uid == os.getuid()
+
+    def load(self) -> tuple[list[Stmt], dict[str, int]] | None:
+        """Returns the cached statements and the nodes each optimizer pass removed, None on a miss."""
+        try:
+            with open(self.path, "rb") as f:
+                if not self.trusted(os.fstat(f.fileno())) or f.read(len(self.key)) != self.key:
+                    return None
+                data = f.read()
+        except OSError:
+            return None
+
+        # Like in the scanner, the nodes can't form cycles worth collecting, here or in save().
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            return pickle.loads(data)
+        except Exception:
+            # A truncated or otherwise broken file is only a miss.
+            return None
+        finally:
+            if collecting:
+                gc.enable()
+
+    def save(self, statements: list[Stmt], removed: dict[str, int]):
+        """Writes the cache file through a temporary file, so a concurrent run never reads half of it. Failing to
+        write it, in a read-only folder or on a tree too deep to pickle, only leaves the script uncached."""
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            data = pickle.dumps((statements, removed), pickle.HIGHEST_PROTOCOL)
+        except RecursionError:
+            return None
+        finally:
+            if collecting:
+                gc.enable()
+
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Created only writable by its owner whatever the umask, so that load() trusts it.
+            flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+            with os.fdopen(os.open(temporary, flags, 0o644), "wb") as f:
+                f.write(self.key)
+                f.write(data)
+            os.replace(temporary, self.path)
+        except OSError:
+            if os.path.exists(temporary):
+                os.remove(temporary)
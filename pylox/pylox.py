@@ -1,22 +1,120 @@
 import os
+import sys
 
-from parser import Parser
 from interpreter import Interpreter
-from resolver import Resolver
 from runtime_exception import RuntimeException
-from scanner import Scanner
+from stmt import Stmt
+
+# The front end, the optimizer and the cache are imported by the methods using them, so that a run only imports what
+# it needs: a script loaded from the cache is never scanned, parsed, resolved or optimized.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import TextIO
+    from program_cache import ProgramCache
+
+
+ENGINES = ("tree", "closure", "vm", "python", "stackless")
+# Collapsed stacks file written by --profile without a file name.
+PROFILE = "profile.folded"
+# Milliseconds between two samples of --sample without a value, and the collapsed stacks file it writes without
+# --sample-output.
+SAMPLE_INTERVAL = 5
+SAMPLES = "samples.folded"
 
 
 class Pylox:
     had_error: bool = False
     had_runtime_error: bool = False
 
-    def __init__(self):
-        self.interpreter = Interpreter(self)
+    def __init__(self, engine: str = "tree", quicken: bool = True, optimize: bool = True):
+        self.engine = engine
+        self.quicken = quicken
+        self.optimize = optimize
+        self.optimizer_report = False
+        self.stream = False
+        self.cache = True
+        # Path of the collapsed stacks file written by --profile, None when not profiling.
+        self.profile = None
+        # Seconds between two samples of --sample, None when not sampling, and the collapsed stacks file it writes.
+        self.sample = None
+        self.sample_output = None
+        # Whether --stats prints the runtime counters when the script ends.
+        self.stats = False
+        # Lox call depth reported as a stack overflow by the vm and stackless engines, None for their default.
+        self.max_depth = None
+        self.interpreter = self.create_interpreter(engine)
+
+    def create_interpreter(self, engine: str) -> Interpreter:
+        match engine:
+            case "tree" if self.sample is not None:
+                from sampling_interpreter import SamplingInterpreter
+                return SamplingInterpreter(self, self.quicken, self.sample)
+            case "tree" if self.profile is not None:
+                from profiling_interpreter import ProfilingInterpreter
+                return ProfilingInterpreter(self, self.quicken)
+            case "tree" if self.stats:
+                from stats_interpreter import StatsInterpreter
+                return StatsInterpreter(self, self.quicken)
+            case "tree":
+                return Interpreter(self, self.quicken)
+            case "closure":
+                from closure_interpreter import ClosureInterpreter
+                return ClosureInterpreter(self)
+            case "vm":
+                from vm import VM
+                return VM(self, self.max_depth)
+            case "python":
+                from transpiled_interpreter import TranspiledInterpreter
+                return TranspiledInterpreter(self)
+            case "stackless":
+                from stackless_interpreter import StacklessInterpreter
+                return StacklessInterpreter(self, self.quicken, self.max_depth)
+
+        raise ValueError(f"Unknown engine '{engine}'.")
 
     def run_command(self, args_list: [str]):
-        if len(args_list) > 2:
-            print("Usage : fla [script]")
+        options = [arg for arg in args_list[1:] if arg.startswith("--")]
+        args_list = [arg for arg in args_list if not arg.startswith("--")]
+
+        for option in options:
+            name, _, value = option.partition("=")
+            match name:
+                case "--engine" if value in ENGINES:
+                    self.engine = value
+                case "--no-quicken" if not value:
+                    self.quicken = False
+                case "--no-optimize" if not value:
+                    self.optimize = False
+                case "--optimizer-report" if not value:
+                    self.optimizer_report = True
+                case "--max-depth" if value.isdigit() and int(value) > 0:
+                    self.max_depth = int(value)
+                case "--stream" if not value:
+                    self.stream = True
+                case "--no-cache" if not value:
+                    self.cache = False
+                case "--profile":
+                    self.profile = value or PROFILE
+                case "--sample" if not value or value.isdigit() and int(value) > 0:
+                    self.sample = int(value or SAMPLE_INTERVAL) / 1000
+                case "--sample-output" if value:
+                    self.sample_output = value
+                case "--stats" if not value:
+                    self.stats = True
+                case _:
+                    args_list = []
+        # The profilers and the stats only run on the tree-walk interpreter, one at a time.
+        instrumented = (self.profile is not None) + (self.sample is not None) + self.stats
+        if instrumented and self.engine != "tree" or instrumented > 1:
+            args_list = []
+        if self.sample_output is not None and self.sample is None:
+            args_list = []
+        self.interpreter = self.create_interpreter(self.engine)
+
+        if len(args_list) > 2 or len(args_list) == 0:
+            print(f"Usage : fla [--engine={'|'.join(ENGINES)}] [--no-quicken] [--no-optimize] [--optimizer-report] "
+                  f"[--max-depth=N] [--stream] [--no-cache] [--profile[=file]] "
+                  f"[--sample[=ms]] [--sample-output=file] [--stats] [script]")
             # ToDo: replace print for a nicer error
         elif len(args_list) == 1:
             self.run_prompt()
@@ -24,24 +122,63 @@ class Pylox:
             self.run_file(os.path.join(os.getcwd(), "pylox", args_list[1]))
 
     def run_prompt(self):
-        while True:
-            line = input("> ")
-            if line == "":
-                break
-            self.run(line)
-            self.had_error = False
+        try:
+            while True:
+                line = input("> ")
+                if line == "":
+                    break
+                self.run(line)
+                self.had_error = False
+        finally:
+            # Stops the sampler thread, which would otherwise keep sampling the prompt.
+            self.report_instrumentation()
 
     def run_file(self, file_path: str):
         with open(file_path, "r") as f:
-            lines = f.readlines()
-        self.run("".join(lines))
+            if self.stream:
+                self.run_stream(f)
+            elif self.cache:
+                from program_cache import ProgramCache
+                source = f.read()
+                self.run(source, True, ProgramCache(file_path, source, self.optimize))
+            else:
+                self.run(f.read(), True)
+
+        self.report_instrumentation()
 
         if self.had_error:
             exit(65)
         if self.had_runtime_error:
             exit(70)
 
-    def run(self, source: str):
+    def report_instrumentation(self):
+        """Prints the report of --profile, --sample or --stats once the script or the prompt ends."""
+        if self.profile is not None:
+            self.interpreter.profiler.report(self.profile)
+        if self.sample is not None:
+            self.interpreter.sampler.report(self.sample_output or SAMPLES)
+        if self.stats:
+            self.interpreter.stats.report()
+
+    def run(self, source: str, whole_program: bool = False, cache: 'ProgramCache' = None):
+        """Runs the source, taking its statements from the cache instead of the front end when it has them."""
+        program = cache.load() if cache is not None else None
+        if program is None:
+            program = self.compile(source, whole_program)
+            if program is None:
+                return None
+            if cache is not None:
+                cache.save(*program)
+
+        statements, removed = program
+        self.interpreter.interprete(statements)
+        if self.optimizer_report:
+            self.report_optimizations(removed)
+
+    def compile(self, source: str, whole_program: bool) -> tuple[list[Stmt], dict[str, int]] | None:
+        from parser import Parser
+        from scanner import Scanner
+
         scanner = Scanner(source, self)
         tokens = scanner.scan_tokens()
 
@@ -51,13 +188,59 @@ class Pylox:
         if self.had_error:
             return None
 
-        resolver = Resolver(self.interpreter, self)
+        return self.analyze(statements, whole_program)
+
+    def run_stream(self, file: 'TextIO'):
+        """Runs each top-level declaration of the file as soon as it is parsed, scanning the file as the parser needs
+        tokens. Later declarations aren't known yet, so the optimizer treats the program as unfinished."""
+        from collections import Counter
+
+        from scanner import Scanner
+        from stream_parser import StreamParser
+
+        parser = StreamParser(Scanner("", self).scan_file(file), self)
+        removed = Counter()
+
+        for statement in parser.declarations():
+            # After a syntax error, the rest of the file is only parsed to report the other ones.
+            if statement is None or self.had_error:
+                continue
+            program = self.analyze([statement], False)
+            if program is None:
+                continue
+            statements, counts = program
+            self.interpreter.interprete(statements)
+            removed.update(counts)
+            if self.had_runtime_error:
+                break
+
+        if self.optimizer_report:
+            self.report_optimizations(removed)
+
+    def analyze(self, statements: list[Stmt], whole_program: bool) -> tuple[list[Stmt], dict[str, int]] | None:
+        """Resolves and optimizes parsed statements, returning them with how many nodes each optimizer pass removed,
+        or None on a resolution error."""
+        from resolver import Resolver
+
+        resolver = Resolver(self)
         resolver.resolve(statements)
 
         if self.had_error:
             return None
 
-        self.interpreter.interprete(statements)
+        removed = {}
+        if self.optimize:
+            from optimizer import Optimizer
+            optimizer = Optimizer(self, whole_program)
+            statements = optimizer.optimize(statements)
+            removed = optimizer.removed
+
+        return statements, removed
+
+    @staticmethod
+    def report_optimizations(removed: dict[str, int]):
+        for name, count in removed.items():
+            print(f"{name} removed {count} nodes.", file=sys.stderr)
 
     def show_error(self, line_number: int, message: str):
         self.report(line_number, "", message)
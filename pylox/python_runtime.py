@@ -0,0 +1,214 @@
+import sys
+
+from types import MethodType
+from typing import Any
+
+from clock_function import ClockFunction
+from int_function import IntFunction
+from randint_function import RandintFunction
+from runtime_exception import RuntimeException
+from str_function import StrFunction
+from token_class import Token
+from token_type import TokenType
+
+
+# Support code for programs produced by the Transpiler. Generated code reaches these names through the
+# namespace built by runtime_namespace(), always with the rt_ prefix so they never clash with Lox names.
+
+class FunctionInfo:
+    def __init__(self, name: str, arity: int, is_method: bool, is_native: bool = False):
+        self.name = name
+        self.arity = arity
+        self.is_method = is_method
+        self.is_native = is_native
+
+
+# Generated functions by code name (co_name), which the Transpiler keeps unique.
+functions = {}
+
+# Line maps of the generated modules by file name: line_maps[file][python_line - 1] is the Lox line.
+line_maps = {}
+
+
+class ClassArity:
+    """lox_arity of the generated classes, the arity of their initializer. Their instances, which can't be called,
+    have none. Generated functions carry their Lox arity in a plain lox_arity attribute."""
+
+    def __get__(self, instance: Any, owner: type) -> int:
+        if instance is not None:
+            raise AttributeError("lox_arity")
+        return owner.initializer_arity
+
+
+class LoxObject:
+    """Base class of the Python classes generated for Lox classes. Fields and methods are p_ attributes."""
+    lox_name = "LoxObject"
+    initializer_arity = 0
+    lox_arity = ClassArity()
+
+    def __init__(self):
+        pass
+
+    def __str__(self):
+        return f"{self.lox_name} instance"
+
+
+functions["__init__"] = FunctionInfo("init", 0, True)
+
+
+def error(line: int, message: str):
+    raise RuntimeException(Token(TokenType.EOF, "", None, line), message)
+
+
+def undefined(value: Any, line: int, name: str):
+    # Assignment to a global that no top-level declaration defines.
+    error(line, f"Undefined variable {name}.")
+
+
+def superclass(value: Any, line: int) -> type:
+    if isinstance(value, type) and issubclass(value, LoxObject):
+        return value
+    error(line, "Superclass must be a class.")
+
+
+def initializer(function):
+    # Calling init() on an instance runs the initializer again and returns the instance.
+    def init(this, *arguments):
+        function(this, *arguments)
+        return this
+
+    init.__wrapped__ = function
+    init.lox_arity = function.lox_arity
+    return init
+
+
+def call_error(callee: Any, count: int, line: int):
+    """Returns the function a generated call makes instead of a callee without the lox_arity it was given, once the
+    arguments are evaluated as in the other engines."""
+    arity = getattr(callee, "lox_arity", None)
+
+    def fail(*arguments):
+        if arity is None:
+            error(line, "Can only call functions and classes.")
+        error(line, f"Expected {arity} arguments but got {count}.")
+
+    return fail
+
+
+def bind(method, instance: LoxObject):
+    return MethodType(method, instance)
+
+
+def equal(a: Any, b: Any) -> bool:
+    # Bound methods compare equal when they bind the same method to the same instance, but each get of a Lox method
+    # makes a new one, which the other engines only find equal to itself.
+    return a is b if type(a) is MethodType else a == b
+
+
+def store(box: list, value: Any) -> Any:
+    box[0] = value
+    return value
+
+
+def set_property(instance: Any, name: str, value: Any, line: int) -> Any:
+    if not isinstance(instance, LoxObject):
+        error(line, "Only instances have fields.")
+    setattr(instance, name, value)
+    return value
+
+
+def function_info(value: Any) -> FunctionInfo | None:
+    if isinstance(value, MethodType):
+        value = value.__func__
+    value = getattr(value, "__wrapped__", value)
+    return functions.get(getattr(getattr(value, "__code__", None), "co_name", None))
+
+
+def stringify(value: Any) -> str:
+    if value is None:
+        return "nil"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, float):
+        text = str(value)
+        if text.endswith(".0"):
+            text = text[0:-2]
+        return text
+    return to_str(value)
+
+
+def to_str(value: Any) -> str:
+    if isinstance(value, type) and issubclass(value, LoxObject):
+        return value.lox_name
+    info = function_info(value)
+    if info is not None:
+        return "<native fn>" if info.is_native else f"<fn {info.name}>"
+    return str(value)
+
+
+# Natives are plain Python functions of the right arity, so calling them is a direct call as well.
+_clock = ClockFunction()
+_float = IntFunction()
+_randint = RandintFunction()
+_str = StrFunction()
+
+
+def native_clock():
+    return _clock.call(None, [])
+
+
+def native_str(value):
+    return _str.call(None, [to_str(value)])
+
+
+def native_float(value):
+    return _float.call(None, [value])
+
+
+def native_randint(a, b):
+    return _randint.call(None, [a, b])
+
+
+for _name, _arity in (("clock", 0), ("str", 1), ("float", 1), ("randint", 2)):
+    globals()[f"native_{_name}"].lox_arity = _arity
+    functions[f"native_{_name}"] = FunctionInfo(_name, _arity, False, True)
+
+
+def runtime_namespace() -> dict:
+    namespace = {"__name__": "lox"}
+    namespace.update({f"rt_{name}": value for name, value in globals().items() if not name.startswith("_")})
+    namespace.update({"v_clock": native_clock, "v_str": native_str, "v_float": native_float,
+                      "v_randint": native_randint})
+    return namespace
+
+
+def translate(exception: Exception, traceback) -> RuntimeException | None:
+    """Turns a Python exception raised by generated code into the RuntimeException the tree-walker would raise."""
+    line = 0
+    lox_frames = 0
+    while traceback is not None:
+        line_map = line_maps.get(traceback.tb_frame.f_code.co_filename)
+        if line_map is not None:
+            line = line_map[traceback.tb_lineno - 1]
+            lox_frames += 1
+        traceback = traceback.tb_next
+    token = Token(TokenType.EOF, "", None, line)
+
+    if isinstance(exception, NameError):
+        return RuntimeException(token, f"Undefined variable {(exception.name or 'v_')[2:]}.")
+
+    if isinstance(exception, AttributeError):
+        # Gets check for an instance before reading a p_ attribute, super for a class, so only a missing property is
+        # left.
+        obj = exception.obj
+        if exception.name is not None and exception.name.startswith("p_") and \
+                (isinstance(obj, LoxObject) or isinstance(obj, type) and issubclass(obj, LoxObject)):
+            return RuntimeException(token, f"Undefined property '{exception.name[2:]}'.")
+
+    # Each Lox call is a Python call, so only a stack mostly made of generated frames is a Lox stack overflow.
+    if isinstance(exception, RecursionError) and lox_frames * 2 > sys.getrecursionlimit():
+        return RuntimeException(token, "Stack overflow.")
+
+    return None
@@ -0,0 +1,83 @@
+import operator
+
+from expr import Binary
+from token_type import TokenType
+
+
+# Binary nodes the tree-walker rewrites in place, by switching their class, once it has seen the types of their
+# operands. They add no slot to Binary so the switch is allowed, and every other visitor still sees a Binary.
+
+class QuickenedBinary(Binary):
+    """Binary node specialized for two operands of operand_type. Its guard only checks those types before applying
+    operation; when it fails, the Interpreter turns the node into a DeoptimizedBinary."""
+    __slots__ = ()
+
+    operand_type = float
+    operation = None
+
+    def accept(self, visitor):
+        return visitor.visit_quickened_binary_expr(self)
+
+
+class DeoptimizedBinary(Binary):
+    """Binary node whose guard failed once: it stays generic and is never quickened again."""
+    __slots__ = ()
+
+
+class NumberAdd(QuickenedBinary):
+    __slots__ = ()
+    operation = operator.add
+
+
+class NumberSubtract(QuickenedBinary):
+    __slots__ = ()
+    operation = operator.sub
+
+
+class NumberMultiply(QuickenedBinary):
+    __slots__ = ()
+    operation = operator.mul
+
+
+class NumberDivide(QuickenedBinary):
+    __slots__ = ()
+    operation = operator.truediv
+
+
+class NumberGreater(QuickenedBinary):
+    __slots__ = ()
+    operation = operator.gt
+
+
+class NumberGreaterEqual(QuickenedBinary):
+    __slots__ = ()
+    operation = operator.ge
+
+
+class NumberLess(QuickenedBinary):
+    __slots__ = ()
+    operation = operator.lt
+
+
+class NumberLessEqual(QuickenedBinary):
+    __slots__ = ()
+    operation = operator.le
+
+
+class StringAdd(QuickenedBinary):
+    __slots__ = ()
+    operand_type = str
+    operation = operator.add
+
+
+QUICKENED = {
+    (float, TokenType.PLUS): NumberAdd,
+    (float, TokenType.MINUS): NumberSubtract,
+    (float, TokenType.STAR): NumberMultiply,
+    (float, TokenType.SLASH): NumberDivide,
+    (float, TokenType.GREATER): NumberGreater,
+    (float, TokenType.GREATER_EQUAL): NumberGreaterEqual,
+    (float, TokenType.LESS): NumberLess,
+    (float, TokenType.LESS_EQUAL): NumberLessEqual,
+    (str, TokenType.PLUS): StringAdd,
+}
@@ -1,11 +1,11 @@
 from random import randint
-from typing import Any
 
 from lox_callable import LoxCallable
 
 
-from typing import TYPE_CHECKING
+TYPE_CHECKING = False
 if TYPE_CHECKING:
+    from typing import Any
     from interpreter import Interpreter
 
 
@@ -13,7 +13,7 @@ class RandintFunction(LoxCallable):
     def arity(self):
         return 2
 
-    def call(self, interpreter: "Interpreter", arguments: list[Any]):
+    def call(self, interpreter: "Interpreter", arguments: "list[Any]"):
         return float(randint(int(arguments[0]), int(arguments[1])))
 
     def __str__(self):
@@ -1,4 +1,4 @@
-from interpreter import Interpreter
+from binding import Binding
 from expr import (Visitor as eVisitor, Expr, Variable, Assign, Binary,
                   Call, Grouping, Literal, Logical,
                   Unary, Get, Set, This, Super)
@@ -8,10 +8,14 @@ from stmt import Visitor as sVisitor, Block, Stmt, Var, Function, Expression, If
 
 
 class Resolver(eVisitor, sVisitor):
-    def __init__(self, interpreter: Interpreter, program):
-        self.interpreter = interpreter
+    def __init__(self, program):
         self.program = program
         self.scopes = []
+        self.declarations = []
+        # Binding of every declaration statement and of every Variable or Assign node, for the optimizer. A global
+        # used before its declaration stays out of it, since it can't be known to refer to that declaration.
+        self.bindings = {}
+        self.global_bindings = {}
         self.current_function = FunctionType.NONE
         self.current_class = ClassType.NONE
 
@@ -24,7 +28,7 @@ class Resolver(eVisitor, sVisitor):
         enclosing_class = self.current_class
         self.current_class = ClassType.CLASS
 
-        self.declare(statement.name)
+        self.declare(statement.name, statement)
         self.define(statement.name)
 
         if statement.superclass is not None and statement.name.lexeme == statement.superclass.name.lexeme:
@@ -37,10 +41,7 @@ class Resolver(eVisitor, sVisitor):
 
         if statement.superclass is not None:
             self.begin_scope()
-            self.scopes[-1]["super"] = True
-
-        self.begin_scope()
-        self.scopes[-1]["this"] = True
+            self.define_keyword("super")
 
         for method in statement.methods:
             declaration = FunctionType.METHOD
@@ -48,7 +49,6 @@ class Resolver(eVisitor, sVisitor):
                 declaration = FunctionType.INITIALIZER
             self.resolve_function(method, declaration)
 
-        self.end_scope()
         if statement.superclass is not None:
             self.end_scope()
         self.current_class = enclosing_class
@@ -57,7 +57,7 @@ class Resolver(eVisitor, sVisitor):
         self.resolve(statement.expression)
 
     def visit_function_stmt(self, statement: Function):
-        self.declare(statement.name)
+        self.declare(statement.name, statement)
         self.define(statement.name)
 
         self.resolve_function(statement, FunctionType.FUNCTION)
@@ -79,9 +79,10 @@ class Resolver(eVisitor, sVisitor):
             if self.current_function == FunctionType.INITIALIZER:
                 self.program.show_error(statement.keyword, "Can't return a value from an initializer.")
             self.resolve(statement.value)
+        statement.tail_call = isinstance(statement.value, Call)
 
     def visit_var_stmt(self, statement: Var):
-        self.declare(statement.name)
+        self.declare(statement.name, statement)
         if statement.initializer is not None:
             self.resolve(statement.initializer)
         self.define(statement.name)
@@ -92,7 +93,7 @@ class Resolver(eVisitor, sVisitor):
 
     def visit_assign_expr(self, expr: Assign):
         self.resolve(expr.value)
-        self.resolve_local(expr, expr.name)
+        self.resolve_local(expr, expr.name).assignments += 1
 
     def visit_binary_expr(self, expr: Binary):
         self.resolve(expr.left)
@@ -140,7 +141,7 @@ class Resolver(eVisitor, sVisitor):
         if len(self.scopes) != 0 and self.scopes[-1].get(expr.name.lexeme) is False:
             self.program.show_error(expr.name, "Can't read local variable in its own initializer.")
 
-        self.resolve_local(expr, expr.name)
+        self.resolve_local(expr, expr.name).reads += 1
 
     def resolve(self, statements: list[Stmt] | Stmt | Expr):
         if isinstance(statements, list):
@@ -154,8 +155,11 @@ class Resolver(eVisitor, sVisitor):
         self.current_function = function_type
 
         self.begin_scope()
+        if function_type != FunctionType.FUNCTION:
+            # A method receives its instance in the first slot of its own frame, before the parameters.
+            self.define_keyword("this")
         for param in function.params:
-            self.declare(param)
+            self.declare(param, param)
             self.define(param)
         self.resolve(function.body)
         self.end_scope()
@@ -164,26 +168,57 @@ class Resolver(eVisitor, sVisitor):
 
     def begin_scope(self):
         self.scopes.append({})
+        self.declarations.append({})
 
     def end_scope(self):
         self.scopes.pop()
+        self.declarations.pop()
 
-    def declare(self, name: Token):
+    def declare(self, name: Token, declaration: Stmt | Token):
         if len(self.scopes) == 0:
+            binding = self.global_binding(name.lexeme)
+            binding.declaration = declaration
+            binding.declarations += 1
+            self.bindings[declaration] = binding
             return None
 
         scope = self.scopes[-1]
         if name.lexeme in scope.keys():
             self.program.show_error(name, "Already a variable with this name in this scope.")
         scope[name.lexeme] = False
+        declarations = self.declarations[-1]
+        if name.lexeme not in declarations:
+            declarations[name.lexeme] = Binding(name.lexeme, False, len(declarations), declaration)
+        binding = declarations[name.lexeme]
+        binding.declarations += 1
+        self.bindings[declaration] = binding
 
     def define(self, name: Token):
         if len(self.scopes) == 0:
             return None
         self.scopes[-1][name.lexeme] = True
 
-    def resolve_local(self, expr, name):
+    def define_keyword(self, keyword: str):
+        self.scopes[-1][keyword] = True
+        self.declarations[-1][keyword] = Binding(keyword, False, 0)
+
+    def global_binding(self, name: str) -> Binding:
+        binding = self.global_bindings.get(name)
+        if binding is None:
+            binding = self.global_bindings[name] = Binding(name, True)
+        return binding
+
+    def resolve_local(self, expr: Variable | Assign | This | Super, name: Token) -> Binding:
+        expr.depth = None
         for i in range(len(self.scopes) - 1, -1, -1):
             if name.lexeme in self.scopes[i]:
-                self.interpreter.resolve(expr, len(self.scopes) - 1 - i)
-                return
+                binding = self.declarations[i][name.lexeme]
+                expr.depth = len(self.scopes) - 1 - i
+                expr.slot = binding.slot
+                self.bindings[expr] = binding
+                return binding
+
+        binding = self.global_binding(name.lexeme)
+        if binding.declarations != 0:
+            self.bindings[expr] = binding
+        return binding
@@ -0,0 +1,103 @@
+import sys
+import threading
+import time
+
+from interpreter import Interpreter
+from labelled_body import LabelledBody
+from lox_function import LoxFunction
+from profiler import Profiler, SCRIPT
+
+
+# Python code objects the tree-walk interpreter runs for each Lox call and for each running statement.
+CALL_CODES = {LoxFunction.run.__code__, LoxFunction.execute.__code__}
+TAIL_CALL_CODE = LoxFunction.execute.__code__
+RUN_CODE = LoxFunction.run.__code__
+STATEMENT_CODE = Interpreter.execute.__code__
+
+
+class Sampler:
+    """Timer thread sampling the Lox call stack of the thread running a tree-walk interpreter, for --sample.
+
+    Nothing is recorded by the interpreter itself: its Python stack already holds a LoxFunction.run() or execute()
+    frame for each Lox call and an Interpreter.execute() frame for each running statement, so each sample reads the
+    function of the first ones and the statement line of the second ones from sys._current_frames(). The running
+    thread only pays for the time the sampler holds the interpreter lock.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        # Number of samples by stack, a tuple of "label (line n)" from the outermost call.
+        self.samples = {}
+        self.thread_id = threading.get_ident()
+        # Time spent sampling, from start() to stop().
+        self.started = None
+        self.elapsed = 0.0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="lox-sampler", daemon=True)
+
+    def start(self):
+        if not self.thread.is_alive() and not self.stopped.is_set():
+            self.started = time.perf_counter()
+            self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread.is_alive():
+            self.thread.join()
+            self.elapsed = time.perf_counter() - self.started
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                stack = self.stack(frame)
+                self.samples[stack] = self.samples.get(stack, 0) + 1
+
+    def stack(self, frame) -> tuple[str, ...]:
+        stack = []
+        line = None
+        callee = None
+        while frame is not None:
+            code = frame.f_code
+            if code is STATEMENT_CODE:
+                if line is None:
+                    line = Profiler.line(frame.f_locals["statement"])
+            elif code in CALL_CODES:
+                # A run() making the tail call of its function's body has already left that function.
+                if code is not RUN_CODE or callee is not TAIL_CALL_CODE:
+                    declaration = frame.f_locals["self"].declaration
+                    body = declaration.body
+                    label = body.label if body.__class__ is LabelledBody else declaration.name.lexeme
+                    stack.append(f"{label} (line {'?' if line is None else line})")
+                    line = None
+            callee = code
+            frame = frame.f_back
+
+        stack.append(f"{SCRIPT} (line {'?' if line is None else line})")
+        return tuple(reversed(stack))
+
+    def report(self, folded_path: str, count: int = 10):
+        """Stops sampling, prints the hottest stacks and lines on the standard error and writes the collapsed stacks
+        to folded_path for flame graph tools."""
+        self.stop()
+        total = sum(self.samples.values())
+        # A sample waits for the interpreter lock, which the running thread only gives up every
+        # sys.getswitchinterval(), so samples can be further apart than the interval asked for.
+        print(f"{total} samples in {self.elapsed:.3f} s, at least {self.interval * 1000:g} ms apart", file=sys.stderr)
+        if total == 0:
+            return None
+
+        print(f"\n{'samples':>10} {'%':>7}  stack", file=sys.stderr)
+        for stack, samples in sorted(self.samples.items(), key=lambda item: -item[1])[:count]:
+            print(f"{samples:>10} {samples / total:>7.1%}  {' > '.join(stack)}", file=sys.stderr)
+
+        lines = {}
+        for stack, samples in self.samples.items():
+            lines[stack[-1]] = lines.get(stack[-1], 0) + samples
+        print(f"\n{'samples':>10} {'%':>7}  running", file=sys.stderr)
+        for line, samples in sorted(lines.items(), key=lambda item: -item[1])[:count]:
+            print(f"{samples:>10} {samples / total:>7.1%}  {line}", file=sys.stderr)
+
+        with open(folded_path, "w") as f:
+            for stack, samples in self.samples.items():
+                f.write(f"{';'.join(stack)} {samples}\n")
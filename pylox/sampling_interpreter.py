@@ -0,0 +1,16 @@
+import stmt
+
+from labelling_interpreter import LabellingInterpreter
+from sampler import Sampler
+
+
+class SamplingInterpreter(LabellingInterpreter):
+    """Tree-walk interpreter whose Lox call stack is sampled every interval seconds while it runs, for --sample."""
+
+    def __init__(self, program, quicken: bool = True, interval: float = 0.005):
+        super().__init__(program, quicken)
+        self.sampler = Sampler(interval)
+
+    def interprete(self, statements: list[stmt.Stmt]):
+        self.sampler.start()
+        super().interprete(statements)
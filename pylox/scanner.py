@@ -1,8 +1,13 @@
-from typing import Any
+import gc
+import re
 
 from token_class import Token
 from token_type import TokenType
 
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterator, TextIO
+
 keywords = {"and": TokenType.AND,
             "class": TokenType.CLASS,
             "else": TokenType.ELSE,
@@ -20,140 +25,106 @@ keywords = {"and": TokenType.AND,
             "var": TokenType.VAR,
             "while": TokenType.WHILE}
 
+operators = {"(": TokenType.LEFT_PAREN,
+             ")": TokenType.RIGHT_PAREN,
+             "{": TokenType.LEFT_BRACE,
+             "}": TokenType.RIGHT_BRACE,
+             ",": TokenType.COMMA,
+             ".": TokenType.DOT,
+             "-": TokenType.MINUS,
+             "+": TokenType.PLUS,
+             ";": TokenType.SEMICOLON,
+             "/": TokenType.SLASH,
+             "*": TokenType.STAR,
+             "!": TokenType.BANG,
+             "!=": TokenType.BANG_EQUAL,
+             "=": TokenType.EQUAL,
+             "==": TokenType.EQUAL_EQUAL,
+             ">": TokenType.GREATER,
+             ">=": TokenType.GREATER_EQUAL,
+             "<": TokenType.LESS,
+             "<=": TokenType.LESS_EQUAL}
+
+# One alternative per kind of lexeme, after the blanks preceding it, so that every character of the source belongs to
+# exactly one match. The group number of a match tells its kind.
+IDENTIFIER, OPERATOR, NUMBER, NEWLINES, COMMENT, STRING, UNTERMINATED_STRING, UNEXPECTED, END = range(1, 10)
+LEXEME = re.compile(r"""
+    [ \t\r]*+
+    (?:
+        ([^\W\d]\w*+)                               # identifier or keyword
+      | (!=|==|<=|>=|[(){},.\-+;*!=<>]|/(?!/))
+      | (\d++(?:\.\d++)?)                           # number
+      | (\n++)
+      | (//[^\n]*+)                                 # comment
+      | ("[^"]*+")                                  # string
+      | ("[^"]*+)                                   # string running to the end of the source
+      | (.)                                         # anything else
+      | (\Z)                                        # blanks ending the source
+    )
+""", re.VERBOSE)
+
 
 class Scanner:
+    """Splits the source in tokens with the LEXEME regular expression, so each token costs one regex match instead of
+    a few Python calls per character. Lines start at 0."""
+
     def __init__(self, source: str, program):
         self.source = source
         self.program = program
         self.tokens = []
-
-        self.start = 0
-        self.current = 0
         self.line = 0
+        # Start of a string still open at the end of the text scanned so far, see scan_file().
+        self.rest = ""
 
     def scan_tokens(self) -> list[Token]:
-        while not self.is_at_end():
-            self.start = self.current
-            self.scan_token()
+        # Tokens can't form reference cycles, so the collections the new tokens would trigger are useless.
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            self.tokens.extend(self.scan_lexemes(self.source))
+        finally:
+            if collecting:
+                gc.enable()
 
         self.tokens.append(Token(TokenType.EOF, "", None, self.line))
         return self.tokens
 
-    def is_at_end(self) -> bool:
-        return self.current >= len(self.source)
-
-    def scan_token(self):
-        c = self.advance()
-
-        match c:
-            case "(": self.add_token(TokenType.LEFT_PAREN)
-            case ")": self.add_token(TokenType.RIGHT_PAREN)
-            case "{": self.add_token(TokenType.LEFT_BRACE)
-            case "}": self.add_token(TokenType.RIGHT_BRACE)
-            case ",": self.add_token(TokenType.COMMA)
-            case ".": self.add_token(TokenType.DOT)
-            case "-": self.add_token(TokenType.MINUS)
-            case "+": self.add_token(TokenType.PLUS)
-            case ";": self.add_token(TokenType.SEMICOLON)
-            case "*": self.add_token(TokenType.STAR)
-            case "!": self.add_token(TokenType.BANG_EQUAL if self.match("=") else TokenType.BANG)
-            case "=": self.add_token(TokenType.EQUAL_EQUAL if self.match("=") else TokenType.EQUAL)
-            case "<": self.add_token(TokenType.LESS_EQUAL if self.match("=") else TokenType.LESS)
-            case ">": self.add_token(TokenType.GREATER_EQUAL if self.match("=") else TokenType.GREATER)
-            case "/":
-                if self.match("/"):
-                    while self.peek() != "\n" and not self.is_at_end():
-                        self.advance()
-                else:
-                    self.add_token(TokenType.SLASH)
-            case " " | "\r" | "\t": return
-            case "\n":
-                self.line += 1
-            case '"':
-                self.process_string()
-            case _:
-                if c.isdigit():
-                    self.process_number()
-                    return
-                if self.is_alpha(c):
-                    self.process_identifier()
-                    return
-                self.program.show_error(self.line, "Unexptected character.")
-
-    def advance(self) -> str:
-        self.current += 1
-        return self.source[self.current - 1]
-
-    def add_token(self, token_type):
-        self.add_token_literal(token_type, None)
-
-    def add_token_literal(self, token_type: TokenType, literal: Any):
-        text = self.source[self.start:self.current]
-        self.tokens.append(Token(token_type, text, literal, self.line))
-
-    def match(self, expected: str) -> bool:
-        if self.is_at_end():
-            return False
-        if self.source[self.current] != expected:
-            return False
-
-        self.current += 1
-        return True
-
-    def peek(self) -> str:
-        if self.is_at_end():
-            return "\0"
-        return self.source[self.current]
-
-    def process_string(self):
-        while self.peek() != '"' and not self.is_at_end():
-            if self.peek() == "\n":
-                self.line += 1
-            self.advance()
-
-        if self.is_at_end():
-            self.program.show_error(self.line, "Unterminated string.")
-            return
-
-        # The closing ".
-        self.advance()
-
-        # Trim de surrounding quotes.
-        value = self.source[self.start + 1:self.current - 1]
-        self.add_token_literal(TokenType.STRING, value)
-
-    def process_number(self):
-        while self.peek().isdigit():
-            self.advance()
-
-        # Look for a fractional part.
-        if self.peek() == "." and self.peek_next().isdigit():
-            self.advance()
-
-        while self.peek().isdigit():
-            self.advance()
-
-        self.add_token_literal(TokenType.NUMBER, float(self.source[self.start:self.current]))
-
-    def peek_next(self) -> str:
-        if self.current + 1 >= len(self.source):
-            return "\0"
-        return self.source[self.current + 1]
-
-    def process_identifier(self):
-        while self.is_alpha_numeric(self.peek()):
-            self.advance()
-
-        text = self.source[self.start:self.current]
-        token_type = keywords.get(text, None)
-        if token_type is None:
-            token_type = TokenType.IDENTIFIER
-
-        self.add_token(token_type)
-
-    @staticmethod
-    def is_alpha(c: str) -> bool:
-        return c.isalnum() or c == "_"
-
-    def is_alpha_numeric(self, c: str):
-        return self.is_alpha(c) or c.isdigit()
+    def scan_file(self, file: 'TextIO') -> 'Iterator[Token]':
+        """Yields the tokens of a file read line by line, as they are needed, instead of those of self.source."""
+        for text in file:
+            text = self.rest + text
+            self.rest = ""
+            yield from self.scan_lexemes(text, False)
+
+        yield from self.scan_lexemes(self.rest)
+        yield Token(TokenType.EOF, "", None, self.line)
+
+    def scan_lexemes(self, text: str, at_end: bool = True) -> 'Iterator[Token]':
+        # Unless at_end, a string still open at the end of text is kept in self.rest instead, to be scanned again with
+        # the text following it.
+        line = self.line
+
+        for match in LEXEME.finditer(text):
+            kind = match.lastindex
+            lexeme = match[kind]
+            if kind == IDENTIFIER:
+                yield Token(keywords.get(lexeme, TokenType.IDENTIFIER), lexeme, None, line)
+            elif kind == OPERATOR:
+                yield Token(operators[lexeme], lexeme, None, line)
+            elif kind == NEWLINES:
+                line += len(lexeme)
+            elif kind == NUMBER:
+                yield Token(TokenType.NUMBER, lexeme, float(lexeme), line)
+            elif kind == STRING:
+                line += lexeme.count("\n")
+                yield Token(TokenType.STRING, lexeme, lexeme[1:-1], line)
+            elif kind == UNTERMINATED_STRING:
+                if not at_end:
+                    self.rest = lexeme
+                    break
+                line += lexeme.count("\n")
+                self.program.show_error(line, "Unterminated string.")
+            elif kind == UNEXPECTED:
+                self.program.show_error(line, "Unexptected character.")
+
+        self.line = line
@@ -0,0 +1,31 @@
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from lox_class import LoxClass
+    from lox_function import LoxFunction
+
+
+class Shape:
+    """Hidden class shared by the instances of a class that got the same fields in the same order.
+
+    slots maps each field name to its index in the instance values. Adding a field moves the instance to the next
+    shape of the transition tree, so two instances built the same way end up with the very same Shape object.
+    """
+    __slots__ = ("klass", "slots", "transitions")
+
+    def __init__(self, klass: 'LoxClass', slots: dict[str, int]):
+        self.klass = klass
+        self.slots = slots
+        self.transitions = {}
+
+    def with_field(self, name: str) -> 'Shape':
+        shape = self.transitions.get(name)
+        if shape is None:
+            shape = Shape(self.klass, {**self.slots, name: len(self.slots)})
+            self.transitions[name] = shape
+        return shape
+
+    def lookup(self, name: str) -> 'int | LoxFunction | None':
+        slot = self.slots.get(name)
+        if slot is not None:
+            return slot
+        return self.klass.find_method(name)
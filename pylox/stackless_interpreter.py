@@ -0,0 +1,255 @@
+from typing import Any, Generator
+
+import expr as expre
+import stmt
+
+from ast_transformer import AstTransformer
+from completion import RETURN
+from environment import Environment
+from interpreter import Interpreter
+from lox_callable import LoxCallable
+from lox_class import LoxClass
+from lox_function import LoxFunction
+from lox_instance import LoxInstance
+from runtime_exception import RuntimeException
+from tail_call import TailCall
+from token_class import Token
+from token_type import TokenType
+
+
+# Default number of Lox calls that can be running at once.
+MAX_DEPTH = 100000
+
+# Runs a statement or an expression of one Lox call. It yields the Frame of each Lox call it makes and is sent back
+# the call's result, then returns the statement's completion or the expression's value.
+Frame = Generator['Frame', Any, Any]
+
+
+class CallFinder(AstTransformer):
+    """Tells whether running a node can call Lox code, leaving the node unchanged."""
+
+    def __init__(self):
+        self.found = False
+
+    def visit_call_expr(self, expr: expre.Call):
+        self.found = True
+        return expr
+
+    def visit_function_stmt(self, statement: stmt.Function):
+        # Declaring a function doesn't run its body.
+        return statement
+
+    def visit_class_stmt(self, statement: stmt.Class):
+        return statement
+
+
+class StacklessInterpreter(Interpreter):
+    """Tree-walk interpreter keeping its Lox call stack in a list instead of the Python stack.
+
+    Each running Lox call is a Frame generator, nested only as deep as the statements and expressions of one function.
+    A call yields the callee's Frame to the loop in run(), which pushes it on frames and sends its result back to the
+    caller, so the call depth is bounded by max_depth and memory instead of Python's recursion limit.
+
+    Nodes that can't call Lox code are run by the tree-walk interpreter directly.
+    """
+
+    def __init__(self, program, quicken: bool = True, max_depth: int = None):
+        super().__init__(program, quicken)
+        self.max_depth = MAX_DEPTH if max_depth is None else max_depth
+        self.frames = []
+
+    def interprete(self, statements: list[stmt.Stmt]):
+        try:
+            for statement in statements:
+                if self.can_call(statement):
+                    self.run(self.execute_frame(statement))
+                else:
+                    self.execute(statement)
+        except RuntimeException as e:
+            self.program.call_runtime_error(e)
+
+    def run(self, frame: Frame) -> Any:
+        frames = self.frames
+        frames.append(frame)
+        value = None
+        try:
+            while frames:
+                try:
+                    callee = frames[-1].send(value)
+                except StopIteration as result:
+                    frames.pop()
+                    value = result.value
+                else:
+                    frames.append(callee)
+                    value = None
+        except BaseException:
+            # Closing the interrupted calls runs their finally blocks, which restore the environment.
+            while frames:
+                frames.pop().close()
+            raise
+        return value
+
+    @staticmethod
+    def can_call(node: stmt.Stmt | expre.Expr) -> bool:
+        """Whether running the node can call Lox code, found the first time and kept on the node, so it lives as long
+        as the tree."""
+        try:
+            return node.calls
+        except AttributeError:
+            finder = CallFinder()
+            finder.transform(node)
+            node.calls = finder.found
+            return finder.found
+
+    # Statements
+
+    def execute_frame(self, statement: stmt.Stmt) -> Frame:
+        if not self.can_call(statement):
+            return self.execute(statement)
+
+        match statement:
+            case stmt.Expression():
+                yield from self.evaluate_frame(statement.expression)
+            case stmt.Print():
+                value = yield from self.evaluate_frame(statement.expression)
+                print(self.stringify(value))
+            case stmt.Var():
+                value = yield from self.evaluate_frame(statement.initializer)
+                self.environment.define(statement.name.lexeme, value)
+            case stmt.Return():
+                if statement.tail_call:
+                    self.return_value = yield from self.call_frame(statement.value, True)
+                else:
+                    self.return_value = yield from self.evaluate_frame(statement.value)
+                return RETURN
+            case stmt.Block():
+                return (yield from self.execute_block_frame(statement.statements, Environment(self.environment)))
+            case stmt.If():
+                if self.is_truthy((yield from self.evaluate_frame(statement.condition))):
+                    return (yield from self.execute_frame(statement.then_branch))
+                elif statement.else_branch is not None:
+                    return (yield from self.execute_frame(statement.else_branch))
+            case stmt.While():
+                while self.is_truthy((yield from self.evaluate_frame(statement.condition))):
+                    if (yield from self.execute_frame(statement.body)) is RETURN:
+                        return RETURN
+
+    def execute_block_frame(self, statements: list[stmt.Stmt], environment: Environment) -> Frame:
+        previous = self.environment
+        try:
+            self.environment = environment
+
+            for statement in statements:
+                if (yield from self.execute_frame(statement)) is RETURN:
+                    return RETURN
+        finally:
+            self.environment = previous
+
+    def function_frame(self, function: LoxFunction, environment: Environment) -> Frame:
+        while True:
+            completion = yield from self.execute_block_frame(function.declaration.body, environment)
+
+            if function.is_initializer:
+                return environment.values[0]
+            if completion is not RETURN:
+                return None
+            value = self.return_value
+            if value.__class__ is not TailCall:
+                return value
+            function = value.function
+            environment = value.environment
+
+    # Expressions
+
+    def evaluate_frame(self, expr: expre.Expr) -> Frame:
+        if not self.can_call(expr):
+            return self.evaluate(expr)
+
+        match expr:
+            case expre.Call():
+                return (yield from self.call_frame(expr, False))
+            case expre.Binary():
+                left = yield from self.evaluate_frame(expr.left)
+                right = yield from self.evaluate_frame(expr.right)
+                return self.binary_operation(expr, left, right)
+            case expre.Logical():
+                left = yield from self.evaluate_frame(expr.left)
+                if self.is_truthy(left) == (expr.operator.token_type == TokenType.OR):
+                    return left
+                return (yield from self.evaluate_frame(expr.right))
+            case expre.Unary():
+                return self.unary_operation(expr, (yield from self.evaluate_frame(expr.right)))
+            case expre.Grouping():
+                return (yield from self.evaluate_frame(expr.expression))
+            case expre.Assign():
+                value = yield from self.evaluate_frame(expr.value)
+                if expr.depth is not None:
+                    self.environment.assign_at(expr.depth, expr.slot, value)
+                else:
+                    self.globals.assign(expr.name, value)
+                return value
+            case expre.Get():
+                obj = yield from self.evaluate_frame(expr.object)
+                if isinstance(obj, LoxInstance):
+                    return expr.cache.get(obj, expr.name)
+                raise RuntimeException(expr.name, "Only instances have properties.")
+            case expre.Set():
+                obj = yield from self.evaluate_frame(expr.object)
+                if not isinstance(obj, LoxInstance):
+                    raise RuntimeException(expr.name, "Only instances have fields.")
+                value = yield from self.evaluate_frame(expr.value)
+                expr.cache.set(obj, expr.name, value)
+                return value
+
+    def call_frame(self, expr: expre.Call, tail: bool) -> Frame:
+        if expr.callee.__class__ is expre.Get:
+            get = expr.callee
+            obj = yield from self.evaluate_frame(get.object)
+            if not isinstance(obj, LoxInstance):
+                raise RuntimeException(get.name, "Only instances have properties.")
+
+            entry = get.cache.lookup(obj, get.name)
+            arguments = yield from self.arguments_frame(expr)
+            if entry.__class__ is not int:
+                self.check_arity(expr.paren, entry, arguments)
+                environment = entry.frame(arguments, obj)
+                if tail:
+                    return TailCall(entry, environment)
+                return (yield self.enter(expr.paren, entry, environment))
+            callee = obj.values[entry]
+        else:
+            callee = yield from self.evaluate_frame(expr.callee)
+            arguments = yield from self.arguments_frame(expr)
+
+        if not isinstance(callee, LoxCallable):
+            raise RuntimeException(expr.paren, "Can only call functions and classes.")
+        self.check_arity(expr.paren, callee, arguments)
+
+        if isinstance(callee, LoxFunction):
+            environment = callee.frame(arguments)
+            if tail:
+                return TailCall(callee, environment)
+            return (yield self.enter(expr.paren, callee, environment))
+        if isinstance(callee, LoxClass):
+            self.stats.instances += 1
+            instance = LoxInstance(callee)
+            if callee.initializer is not None:
+                yield self.enter(expr.paren, callee.initializer, callee.initializer.frame(arguments, instance))
+            return instance
+        return callee.call(self, arguments)
+
+    def arguments_frame(self, expr: expre.Call) -> Frame:
+        arguments = []
+        for argument in expr.arguments:
+            arguments.append((yield from self.evaluate_frame(argument)))
+        return arguments
+
+    @staticmethod
+    def check_arity(paren: Token, callee: LoxCallable, arguments: list[Any]):
+        if len(arguments) != callee.arity():
+            raise RuntimeException(paren, f"Expected {callee.arity()} arguments but got {len(arguments)}.")
+
+    def enter(self, paren: Token, function: LoxFunction, environment: Environment) -> Frame:
+        if len(self.frames) >= self.max_depth:
+            raise RuntimeException(paren, "Stack overflow.")
+        return self.function_frame(function, environment)
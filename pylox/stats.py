@@ -0,0 +1,39 @@
+import sys
+
+
+class Stats:
+    """Runtime counters of an interpreter, printed by --stats.
+
+    Instances are always counted, by LoxClass.call() through the interpreter it is given, since creating one already
+    costs an allocation. The other counters sit on the hot paths of the tree-walker, so only StatsInterpreter counts
+    them.
+    """
+    __slots__ = ("environments", "peak_depth", "lookups", "returns", "binds", "find_methods", "native_calls",
+                 "instances")
+
+    def __init__(self):
+        self.environments = 0
+        # Longest chain of local environments, from the innermost one to the globals.
+        self.peak_depth = 0
+        # Variable lookups by resolved depth, None for globals.
+        self.lookups = {}
+        self.returns = 0
+        self.binds = 0
+        self.find_methods = 0
+        self.native_calls = 0
+        self.instances = 0
+
+    def report(self):
+        rows = [("environments created", self.environments),
+                ("peak environment depth", self.peak_depth),
+                ("variable lookups", sum(self.lookups.values()))]
+        for depth in sorted(self.lookups, key=lambda key: -1 if key is None else key):
+            rows.append(("    global" if depth is None else f"    depth {depth}", self.lookups[depth]))
+        rows += [("returns", self.returns),
+                 ("bind calls", self.binds),
+                 ("find_method calls", self.find_methods),
+                 ("native calls", self.native_calls),
+                 ("instances created", self.instances)]
+        for name, count in rows:
+            print(f"{name:<24}{count:>12}", file=sys.stderr)
+
@@ -0,0 +1,79 @@
+import expr as expre
+import stmt
+
+from counted_native import CountedNative
+from environment import Environment
+from inline_cache import InlineCache
+from interpreter import Interpreter
+from lox_instance import LoxInstance
+from natives import NATIVES, load_native
+from runtime_exception import RuntimeException
+from token_class import Token
+
+
+class StatsInterpreter(Interpreter):
+    """Tree-walk interpreter counting environments, variable lookups, returns, the environment depth, method lookups
+    and binds, and native calls into its stats, for --stats.
+
+    Every execute_block() runs in an environment made for it, by a block or a call, so environments are counted there
+    and in the super environment of a subclass. Gets and invocations only call find_method() on a miss of their inline
+    cache, which counts it while this interpreter runs.
+    """
+
+    def __init__(self, program, quicken: bool = True):
+        super().__init__(program, quicken)
+        # Natives are defined up front, wrapped to count their calls, instead of on their first lookup.
+        for name in NATIVES:
+            self.globals.define(name, CountedNative(load_native(name), self.stats))
+
+    def interprete(self, statements: list[stmt.Stmt]):
+        previous = InlineCache.stats
+        InlineCache.stats = self.stats
+        try:
+            super().interprete(statements)
+        finally:
+            InlineCache.stats = previous
+
+    def execute_block(self, statements: list[stmt.Stmt], environment: Environment):
+        stats = self.stats
+        stats.environments += 1
+        depth = 0
+        enclosing = environment
+        while enclosing is not self.globals:
+            depth += 1
+            enclosing = enclosing.enclosing
+        if depth > stats.peak_depth:
+            stats.peak_depth = depth
+        return super().execute_block(statements, environment)
+
+    def visit_class_stmt(self, statement: stmt.Class):
+        if statement.superclass is not None:
+            self.stats.environments += 1
+        return super().visit_class_stmt(statement)
+
+    def visit_return_stmt(self, statement: stmt.Return):
+        self.stats.returns += 1
+        return super().visit_return_stmt(statement)
+
+    def look_up_variable(self, name: Token, expr: expre.Variable | expre.This):
+        lookups = self.stats.lookups
+        lookups[expr.depth] = lookups.get(expr.depth, 0) + 1
+        return super().look_up_variable(name, expr)
+
+    def visit_super_expr(self, expr: expre.Super):
+        stats = self.stats
+        stats.find_methods += 1
+        method = super().visit_super_expr(expr)
+        stats.binds += 1
+        return method
+
+    def visit_get_expr(self, expr: expre.Get):
+        obj = self.evaluate(expr.object)
+        if not isinstance(obj, LoxInstance):
+            raise RuntimeException(expr.name, "Only instances have properties.")
+
+        entry = expr.cache.lookup(obj, expr.name)
+        if entry.__class__ is int:
+            return obj.values[entry]
+        self.stats.binds += 1
+        return entry.bind(obj)
@@ -5,6 +5,9 @@ from token_class import Token
 
 
 class Stmt(ABC):
+    # Whether running the statement can call Lox code, set by the stackless engine the first time it runs it.
+    __slots__ = ("calls",)
+
     @abstractmethod
     def accept(self, visitor):
         pass
@@ -49,6 +52,8 @@ class Visitor(ABC):
 
 
 class Expression(Stmt):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: Expr) -> None:
         self.expression = expression
 
@@ -57,6 +62,8 @@ class Expression(Stmt):
 
 
 class Print(Stmt):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: Expr) -> None:
         self.expression = expression
 
@@ -65,6 +72,8 @@ class Print(Stmt):
 
 
 class Var(Stmt):
+    __slots__ = ("name", "initializer")
+
     def __init__(self, name: Token, initializer: Expr):
         self.name = name
         self.initializer = initializer
@@ -74,6 +83,8 @@ class Var(Stmt):
 
 
 class Block(Stmt):
+    __slots__ = ("statements",)
+
     def __init__(self, statements: list[Stmt]):
         self.statements = statements
 
@@ -82,25 +93,31 @@ class Block(Stmt):
 
 
 class If(Stmt):
+    __slots__ = ("condition", "then_branch", "else_branch")
+
     def __init__(self, condition: Expr, then_branch: Stmt, else_branche: Stmt):
         self.condition = condition
         self.then_branch = then_branch
         self.else_branch = else_branche
 
     def accept(self, visitor: Visitor):
-        visitor.visit_if_stmt(self)
+        return visitor.visit_if_stmt(self)
 
 
 class While(Stmt):
+    __slots__ = ("condition", "body")
+
     def __init__(self, condition: Expr, body: Stmt):
         self.condition = condition
         self.body = body
 
     def accept(self, visitor: Visitor):
-        visitor.visit_while_stmt(self)
+        return visitor.visit_while_stmt(self)
 
 
 class Function(Stmt):
+    __slots__ = ("name", "params", "body")
+
     def __init__(self, name: Token, params: list[Token], body: list[Stmt]):
         self.name = name
         self.params = params
@@ -111,15 +128,21 @@ class Function(Stmt):
 
 
 class Return(Stmt):
+    __slots__ = ("keyword", "value", "tail_call")
+
     def __init__(self, keyword: Token, value: Expr):
         self.keyword = keyword
         self.value = value
+        # Set by the Resolver when the returned value is a call: the returning function then runs it in its own loop.
+        self.tail_call = False
 
     def accept(self, visitor: Visitor):
         return visitor.visit_return_stmt(self)
 
 
 class Class(Stmt):
+    __slots__ = ("name", "superclass", "methods")
+
     def __init__(self, name: Token, superclass: Variable, methods: list[Function]):
         self.name = name
         self.superclass = superclass
@@ -1,10 +1,9 @@
-from typing import Any
-
 from lox_callable import LoxCallable
 
 
-from typing import TYPE_CHECKING
+TYPE_CHECKING = False
 if TYPE_CHECKING:
+    from typing import Any
     from pylox.interpreter import Interpreter
 
 
@@ -12,7 +11,7 @@ class StrFunction(LoxCallable):
     def arity(self):
         return 1
 
-    def call(self, interpreter: "Interpreter", arguments: list[Any]):
+    def call(self, interpreter: "Interpreter", arguments: "list[Any]"):
         return str(arguments[0])
 
     def __str__(self):
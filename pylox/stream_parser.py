@@ -0,0 +1,33 @@
+from typing import Iterator
+
+from parser import Parser
+from stmt import Stmt
+from token_class import Token
+
+
+class StreamParser(Parser):
+    """Parser pulling its tokens from an iterator, such as Scanner.scan_file(), and keeping only the previous and the
+    current ones, so that a huge script never has all of its tokens or statements in memory at once."""
+
+    def __init__(self, tokens: Iterator[Token], program):
+        super().__init__([], program)
+        self.stream = tokens
+        self.previous_token = None
+        self.current_token = next(tokens)
+
+    def declarations(self) -> Iterator[Stmt | None]:
+        """Yields each top-level declaration once parsed, or None for one with a syntax error."""
+        while not self.is_at_end():
+            yield self.declaration()
+
+    def advance(self) -> Token:
+        if not self.is_at_end():
+            self.previous_token = self.current_token
+            self.current_token = next(self.stream)
+        return self.previous_token
+
+    def peek(self) -> Token:
+        return self.current_token
+
+    def previous(self) -> Token:
+        return self.previous_token
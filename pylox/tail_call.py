@@ -0,0 +1,16 @@
+from environment import Environment
+
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from lox_function import LoxFunction
+
+
+class TailCall:
+    """A Lox function call in tail position, returned to the LoxFunction.run() loop of the caller instead of being
+    made on top of its frame, so tail-recursive code runs in constant Python stack."""
+    __slots__ = ("function", "environment")
+
+    def __init__(self, function: 'LoxFunction', environment: Environment):
+        self.function = function
+        self.environment = environment
@@ -0,0 +1,34 @@
+import stmt
+
+import python_runtime
+
+from itertools import count
+from runtime_exception import RuntimeException
+from transpiler import Transpiler
+
+
+class TranspiledInterpreter:
+    """Execution engine that transpiles the program to Python source, compiles it with compile() and runs it."""
+
+    programs = count()
+
+    def __init__(self, program):
+        self.program = program
+        self.namespace = python_runtime.runtime_namespace()
+
+    def interprete(self, statements: list[stmt.Stmt]):
+        known_globals = {name for name in self.namespace if name.startswith("v_")}
+        source, line_map = Transpiler(known_globals).transpile(statements)
+        file_name = f"<lox-{next(self.programs)}>"
+        python_runtime.line_maps[file_name] = line_map
+        exec(compile(source, file_name, "exec"), self.namespace)
+
+        try:
+            self.namespace["rt_main"]()
+        except RuntimeException as e:
+            self.program.call_runtime_error(e)
+        except (NameError, AttributeError, RecursionError) as e:
+            error = python_runtime.translate(e, e.__traceback__)
+            if error is None:
+                raise
+            self.program.call_runtime_error(error)
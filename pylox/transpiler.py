@@ -0,0 +1,606 @@
+import expr as expre
+import stmt
+
+from itertools import count
+
+from python_runtime import FunctionInfo, functions
+from token_type import TokenType
+
+
+class PythonBinding:
+    """A Lox variable and the Python name it becomes.
+
+    A local that is declared inside a loop and captured by a closure needs a fresh variable on every iteration,
+    which Python closures do not give. Such a binding is boxed: it lives in a one-cell list.
+    """
+
+    def __init__(self, python_name: str, function: 'FunctionContext', in_loop: bool):
+        self.python_name = python_name
+        self.function = function
+        self.in_loop = in_loop
+        self.captured = False
+
+    @property
+    def boxed(self) -> bool:
+        return self.in_loop and self.captured
+
+
+class FunctionContext:
+    """A Python function of the generated code: the main function, a Lox function or method, or a class factory."""
+
+    def __init__(self, enclosing: 'FunctionContext'):
+        self.enclosing = enclosing
+        self.loop_depth = 0
+        self.assigned_globals = set()
+        self.assigned_free = set()
+        self.free = set()
+
+
+class BindingAnalyzer(expre.Visitor, stmt.Visitor):
+    """Resolves every variable to a PythonBinding the way Resolver does, and records which ones closures capture."""
+
+    def __init__(self, names: count, known_globals: set[str]):
+        self.names = names
+        self.known_globals = known_globals
+        self.scopes = []
+        self.function = None
+        self.references = {}
+        self.declarations = {}
+        self.contexts = {}
+        self.super_bindings = {}
+
+    def analyze(self, statements: list[stmt.Stmt]) -> FunctionContext:
+        self.function = FunctionContext(None)
+        for statement in statements:
+            statement.accept(self)
+        return self.function
+
+    def declare(self, node, name: str) -> PythonBinding | None:
+        if not self.scopes:
+            binding = None
+            self.function.assigned_globals.add(f"v_{name}")
+            self.known_globals.add(f"v_{name}")
+        else:
+            binding = PythonBinding(f"v_{name}_{next(self.names)}", self.function, self.function.loop_depth > 0)
+            self.scopes[-1][name] = binding
+        self.declarations[node] = binding
+        return binding
+
+    def reference(self, node, name: str, assigned: bool = False):
+        for scope in reversed(self.scopes):
+            binding = scope.get(name)
+            if binding is not None:
+                break
+        else:
+            self.references[node] = None
+            if assigned:
+                self.function.assigned_globals.add(f"v_{name}")
+            return None
+
+        self.references[node] = binding
+        function = self.function
+        if binding.function is not function:
+            binding.captured = True
+            if assigned:
+                function.assigned_free.add(binding)
+            while function is not binding.function:
+                function.free.add(binding)
+                function = function.enclosing
+        return binding
+
+    def function_body(self, declaration: stmt.Function, context: FunctionContext, receiver: bool):
+        enclosing = self.function
+        self.function = context
+        self.contexts[declaration] = context
+        self.scopes.append({})
+
+        if receiver:
+            self.scopes[-1]["this"] = PythonBinding("v_this", context, False)
+        for param in declaration.params:
+            self.declare(param, param.lexeme)
+        for statement in declaration.body:
+            statement.accept(self)
+
+        self.scopes.pop()
+        self.function = enclosing
+
+    def visit_expression_stmt(self, statement: stmt.Expression):
+        statement.expression.accept(self)
+
+    def visit_print_stmt(self, statement: stmt.Print):
+        statement.expression.accept(self)
+
+    def visit_var_stmt(self, statement: stmt.Var):
+        if statement.initializer is not None:
+            statement.initializer.accept(self)
+        self.declare(statement, statement.name.lexeme)
+
+    def visit_block_stmt(self, statement: stmt.Block):
+        self.scopes.append({})
+        for inner in statement.statements:
+            inner.accept(self)
+        self.scopes.pop()
+
+    def visit_if_stmt(self, statement: stmt.If):
+        statement.condition.accept(self)
+        statement.then_branch.accept(self)
+        if statement.else_branch is not None:
+            statement.else_branch.accept(self)
+
+    def visit_while_stmt(self, statement: stmt.While):
+        self.function.loop_depth += 1
+        statement.condition.accept(self)
+        statement.body.accept(self)
+        self.function.loop_depth -= 1
+
+    def visit_function_stmt(self, statement: stmt.Function):
+        self.declare(statement, statement.name.lexeme)
+        self.function_body(statement, FunctionContext(self.function), False)
+
+    def visit_return_stmt(self, statement: stmt.Return):
+        if statement.value is not None:
+            statement.value.accept(self)
+
+    def visit_class_stmt(self, statement: stmt.Class):
+        self.declare(statement, statement.name.lexeme)
+
+        # Classes are built by a factory function, which also holds the superclass used by super.
+        factory = FunctionContext(self.function)
+        self.contexts[statement] = factory
+        enclosing = self.function
+        self.function = factory
+        if statement.superclass is not None:
+            statement.superclass.accept(self)
+            self.super_bindings[statement] = PythonBinding(f"s_{next(self.names)}", factory, False)
+            self.scopes.append({"super": self.super_bindings[statement]})
+
+        for method in statement.methods:
+            self.function_body(method, FunctionContext(factory), True)
+
+        if statement.superclass is not None:
+            self.scopes.pop()
+        self.function = enclosing
+
+    def visit_assign_expr(self, expr: expre.Assign):
+        expr.value.accept(self)
+        self.reference(expr, expr.name.lexeme, True)
+
+    def visit_binary_expr(self, expr: expre.Binary):
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    def visit_call_expr(self, expr: expre.Call):
+        expr.callee.accept(self)
+        for argument in expr.arguments:
+            argument.accept(self)
+
+    def visit_get_expr(self, expr: expre.Get):
+        expr.object.accept(self)
+
+    def visit_set_expr(self, expr: expre.Set):
+        expr.object.accept(self)
+        expr.value.accept(self)
+
+    def visit_this_expr(self, expr: expre.This):
+        self.reference(expr, "this")
+
+    def visit_super_expr(self, expr: expre.Super):
+        self.references[expr] = (self.reference(expr.keyword, "super"), self.reference(expr.method, "this"))
+
+    def visit_grouping_expr(self, expr: expre.Grouping):
+        expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr: expre.Literal):
+        return None
+
+    def visit_logical_expr(self, expr: expre.Logical):
+        expr.left.accept(self)
+        expr.right.accept(self)
+
+    def visit_unary_expr(self, expr: expre.Unary):
+        expr.right.accept(self)
+
+    def visit_variable_expr(self, expr: expre.Variable):
+        self.reference(expr, expr.name.lexeme)
+
+
+NUMBER, STRING, BOOLEAN = "number", "string", "boolean"
+
+
+class Transpiler(expre.Visitor, stmt.Visitor):
+    """Turns a resolved Lox program into the source of a Python module with a single rt_main function.
+
+    Lox locals become Python locals, closures Python closures and classes Python classes deriving from
+    rt_LoxObject. Arithmetic is guarded by inline type checks so ill-typed operands still raise Lox errors.
+    Every generated function gets a unique code name, recorded in python_runtime.functions for error reports.
+    """
+
+    # Shared by all transpilers so code names stay unique within the process.
+    names = count()
+
+    def __init__(self, known_globals: set[str]):
+        self.known_globals = known_globals
+        self.analyzer = None
+        self.function = None
+        self.initializer = False
+        self.lines = []
+        self.line_map = []
+        self.indent = 0
+        self.line = 0
+
+    def transpile(self, statements: list[stmt.Stmt]) -> tuple[str, list[int]]:
+        self.analyzer = BindingAnalyzer(self.names, self.known_globals)
+        self.function = self.analyzer.analyze(statements)
+
+        self.emit("def rt_main():")
+        self.indent += 1
+        self.emit_scope_declarations(self.function)
+        for statement in statements:
+            statement.accept(self)
+        self.emit("pass")
+        self.indent -= 1
+
+        return "\n".join(self.lines) + "\n", self.line_map
+
+    # Emission helpers
+
+    def emit(self, code: str):
+        self.lines.append("    " * self.indent + code)
+        self.line_map.append(self.line)
+
+    def temporary(self) -> str:
+        return f"t{next(self.names)}"
+
+    def emit_scope_declarations(self, function: FunctionContext):
+        if function.assigned_globals:
+            self.emit(f"global {', '.join(sorted(function.assigned_globals))}")
+        nonlocals = [binding.python_name for binding in function.assigned_free if not binding.boxed]
+        if nonlocals:
+            self.emit(f"nonlocal {', '.join(sorted(nonlocals))}")
+
+    def expression(self, expr: expre.Expr) -> str:
+        return expr.accept(self)
+
+    def read(self, binding: PythonBinding | None, name: str) -> str:
+        if binding is None:
+            return f"v_{name}"
+        if binding.boxed:
+            return f"{binding.python_name}[0]"
+        return binding.python_name
+
+    def emit_store(self, binding: PythonBinding | None, name: str, value: str, declaration: bool = False):
+        if binding is None and f"v_{name}" not in self.known_globals:
+            self.emit(f"rt_undefined({value}, {self.line}, {name!r})")
+        elif binding is None:
+            self.emit(f"v_{name} = {value}")
+        elif binding.boxed:
+            self.emit(f"{binding.python_name} = [{value}]" if declaration else f"{binding.python_name}[0] = {value}")
+        else:
+            self.emit(f"{binding.python_name} = {value}")
+
+    def boxed_free(self, node) -> list[str]:
+        """Boxed bindings of the current function captured by the function or class declared by node."""
+        context = self.analyzer.contexts[node]
+        return sorted(binding.python_name for binding in context.free
+                      if binding.boxed and binding.function is self.function)
+
+    def truthy(self, expr: expre.Expr) -> str:
+        code = self.expression(expr)
+        if self.kind(expr) == BOOLEAN:
+            return code
+        value = self.temporary()
+        return f"(({value} := {code}) is not None and {value} is not False)"
+
+    def kind(self, expr: expre.Expr) -> str | None:
+        if isinstance(expr, expre.Literal):
+            if isinstance(expr.value, bool):
+                return BOOLEAN
+            if isinstance(expr.value, float):
+                return NUMBER
+            if isinstance(expr.value, str):
+                return STRING
+            return None
+        if isinstance(expr, expre.Grouping):
+            return self.kind(expr.expression)
+        if isinstance(expr, expre.Unary):
+            return BOOLEAN if expr.operator.token_type == TokenType.BANG else NUMBER
+        if isinstance(expr, expre.Binary):
+            match expr.operator.token_type:
+                case TokenType.MINUS | TokenType.STAR | TokenType.SLASH:
+                    return NUMBER
+                case TokenType.PLUS:
+                    return None
+            return BOOLEAN
+        return None
+
+    # Functions and classes
+
+    def function_definition(self, declaration: stmt.Function, python_name: str, is_method: bool,
+                            is_initializer: bool = False):
+        context = self.analyzer.contexts[declaration]
+        enclosing, enclosing_initializer = self.function, self.initializer
+        self.function, self.initializer = context, is_initializer
+        self.line = declaration.name.line
+
+        params = ["v_this"] if is_method else []
+        params += [self.analyzer.declarations[param].python_name for param in declaration.params]
+        functions[python_name] = FunctionInfo(declaration.name.lexeme, len(declaration.params), is_method)
+
+        self.emit(f"def {python_name}({', '.join(params)}):")
+        self.indent += 1
+        self.emit_scope_declarations(context)
+        for statement in declaration.body:
+            statement.accept(self)
+        self.emit("pass")
+        self.indent -= 1
+        self.emit(f"{python_name}.lox_arity = {len(declaration.params)}")
+        self.function, self.initializer = enclosing, enclosing_initializer
+
+    def emit_factory(self, node, binding: PythonBinding | None, name: str, build):
+        """Emits the declaration of a function or class, built by a factory when it captures boxed bindings."""
+        boxed = self.boxed_free(node)
+        if binding is not None and binding.boxed:
+            self.emit(f"{binding.python_name} = [None]")
+
+        if not boxed and not isinstance(node, stmt.Class):
+            python_name = build()
+            if binding is None or binding.boxed or binding.python_name != python_name:
+                self.emit_store(binding, name, python_name)
+            return None
+
+        factory = f"rt_factory_{next(self.names)}"
+        self.emit(f"def {factory}({', '.join(boxed)}):")
+        self.indent += 1
+        python_name = build()
+        self.emit(f"return {python_name}")
+        self.indent -= 1
+        self.emit_store(binding, name, f"{factory}({', '.join(boxed)})")
+
+    # Statements
+
+    def visit_expression_stmt(self, statement: stmt.Expression):
+        expression = statement.expression
+        if isinstance(expression, expre.Assign):
+            self.line = expression.name.line
+            binding = self.analyzer.references[expression]
+            self.emit_store(binding, expression.name.lexeme, self.expression(expression.value))
+        elif isinstance(expression, expre.Set):
+            self.set_statement(expression)
+        else:
+            self.emit(self.expression(expression))
+
+    def visit_print_stmt(self, statement: stmt.Print):
+        value = self.expression(statement.expression)
+        self.emit(f"print(rt_stringify({value}))")
+
+    def visit_var_stmt(self, statement: stmt.Var):
+        self.line = statement.name.line
+        value = "None" if statement.initializer is None else self.expression(statement.initializer)
+        binding = self.analyzer.declarations[statement]
+        self.emit_store(binding, statement.name.lexeme, value, True)
+
+    def visit_block_stmt(self, statement: stmt.Block):
+        for inner in statement.statements:
+            inner.accept(self)
+
+    def visit_if_stmt(self, statement: stmt.If):
+        self.emit(f"if {self.truthy(statement.condition)}:")
+        self.indent += 1
+        statement.then_branch.accept(self)
+        self.emit("pass")
+        self.indent -= 1
+
+        if statement.else_branch is not None:
+            self.emit("else:")
+            self.indent += 1
+            statement.else_branch.accept(self)
+            self.emit("pass")
+            self.indent -= 1
+
+    def visit_while_stmt(self, statement: stmt.While):
+        self.emit(f"while {self.truthy(statement.condition)}:")
+        self.indent += 1
+        statement.body.accept(self)
+        self.emit("pass")
+        self.indent -= 1
+
+    def visit_function_stmt(self, statement: stmt.Function):
+        binding = self.analyzer.declarations[statement]
+        name = statement.name.lexeme
+
+        def build():
+            python_name = binding.python_name if binding is not None and not binding.boxed \
+                and not self.boxed_free(statement) else f"f{next(self.names)}_{name}"
+            self.function_definition(statement, python_name, False)
+            return python_name
+
+        self.line = statement.name.line
+        self.emit_factory(statement, binding, name, build)
+
+    def visit_return_stmt(self, statement: stmt.Return):
+        self.line = statement.keyword.line
+        if statement.value is None or self.initializer:
+            self.emit("return")
+        else:
+            self.emit(f"return {self.expression(statement.value)}")
+
+    def visit_class_stmt(self, statement: stmt.Class):
+        binding = self.analyzer.declarations[statement]
+        name = statement.name.lexeme
+        self.line = statement.name.line
+
+        def build():
+            factory = self.analyzer.contexts[statement]
+            enclosing = self.function
+            self.function = factory
+            python_name = f"C{next(self.names)}_{name}"
+
+            base = "rt_LoxObject"
+            if statement.superclass is not None:
+                superclass = self.expression(statement.superclass)
+                base = self.analyzer.super_bindings[statement].python_name
+                self.emit(f"{base} = rt_superclass({superclass}, {statement.superclass.name.line})")
+
+            self.emit(f"class {python_name}({base}):")
+            self.indent += 1
+            self.emit(f"lox_name = {name!r}")
+            for method in statement.methods:
+                method_name = f"m{next(self.names)}_{method.name.lexeme}"
+                is_initializer = method.name.lexeme == "init"
+                self.function_definition(method, method_name, True, is_initializer)
+                if is_initializer:
+                    self.emit(f"initializer_arity = {len(method.params)}")
+                    self.emit(f"__init__ = {method_name}")
+                    self.emit(f"p_init = rt_initializer({method_name})")
+                else:
+                    self.emit(f"p_{method.name.lexeme} = {method_name}")
+            self.indent -= 1
+
+            self.function = enclosing
+            return python_name
+
+        self.emit_factory(statement, binding, name, build)
+
+    # Expressions
+
+    def visit_literal_expr(self, expr: expre.Literal):
+        return repr(expr.value)
+
+    def visit_grouping_expr(self, expr: expre.Grouping):
+        return f"({self.expression(expr.expression)})"
+
+    def visit_variable_expr(self, expr: expre.Variable):
+        self.line = expr.name.line
+        return self.read(self.analyzer.references[expr], expr.name.lexeme)
+
+    def visit_this_expr(self, expr: expre.This):
+        return self.read(self.analyzer.references[expr], "this")
+
+    def visit_assign_expr(self, expr: expre.Assign):
+        value = self.expression(expr.value)
+        binding = self.analyzer.references[expr]
+        if binding is None and f"v_{expr.name.lexeme}" not in self.known_globals:
+            return f"rt_undefined({value}, {self.line}, {expr.name.lexeme!r})"
+        if binding is not None and binding.boxed:
+            return f"rt_store({binding.python_name}, {value})"
+        return f"({self.read(binding, expr.name.lexeme)} := {value})"
+
+    def visit_logical_expr(self, expr: expre.Logical):
+        left = self.expression(expr.left)
+        right = self.expression(expr.right)
+        value = self.temporary()
+        truthy = f"({value} := {left}) is not None and {value} is not False"
+
+        if expr.operator.token_type == TokenType.OR:
+            return f"({value} if {truthy} else {right})"
+        return f"({right} if {truthy} else {value})"
+
+    def visit_unary_expr(self, expr: expre.Unary):
+        right = self.expression(expr.right)
+        self.line = expr.operator.line
+
+        if expr.operator.token_type == TokenType.BANG:
+            if self.kind(expr.right) == BOOLEAN:
+                return f"(not {right})"
+            value = self.temporary()
+            return f"(({value} := {right}) is None or {value} is False)"
+
+        value = self.temporary()
+        return f"(-{value} if type({value} := {right}) is float " \
+               f"else rt_error({self.line}, 'Operand must be a number.'))"
+
+    def visit_binary_expr(self, expr: expre.Binary):
+        left = self.expression(expr.left)
+        right = self.expression(expr.right)
+        line = self.line = expr.operator.line
+
+        # A literal is never a bound method, so it can be compared with ==.
+        literal = isinstance(expr.left, expre.Literal) or isinstance(expr.right, expre.Literal)
+        match expr.operator.token_type:
+            case TokenType.EQUAL_EQUAL:
+                return f"({left} == {right})" if literal else f"rt_equal({left}, {right})"
+            case TokenType.BANG_EQUAL:
+                return f"({left} != {right})" if literal else f"(not rt_equal({left}, {right}))"
+            case TokenType.PLUS:
+                return self.addition(expr, left, right, line)
+
+        operator = expr.operator.lexeme
+        message = "Operands must be numbers."
+        left_literal = isinstance(expr.left, expre.Literal) and isinstance(expr.left.value, float)
+        right_literal = isinstance(expr.right, expre.Literal) and isinstance(expr.right.value, float)
+        if left_literal and right_literal:
+            return f"({left} {operator} {right})"
+
+        a, b = self.temporary(), self.temporary()
+        if right_literal:
+            return f"({a} {operator} {right} if type({a} := {left}) is float else rt_error({line}, {message!r}))"
+        if left_literal:
+            return f"({left} {operator} {b} if type({b} := {right}) is float else rt_error({line}, {message!r}))"
+        return f"({a} {operator} {b} if (type({a} := {left}) is float) & (type({b} := {right}) is float) " \
+               f"else rt_error({line}, {message!r}))"
+
+    def addition(self, expr: expre.Binary, left: str, right: str, line: int) -> str:
+        message = "Operands must be two numbers or two strings."
+        left_kind = self.kind(expr.left) if isinstance(expr.left, expre.Literal) else None
+        right_kind = self.kind(expr.right) if isinstance(expr.right, expre.Literal) else None
+        if left_kind is not None and left_kind == right_kind:
+            return f"({left} + {right})"
+
+        a, b = self.temporary(), self.temporary()
+        if right_kind is not None:
+            python_type = "float" if right_kind == NUMBER else "str"
+            return f"({a} + {right} if type({a} := {left}) is {python_type} else rt_error({line}, {message!r}))"
+        if left_kind is not None:
+            python_type = "float" if left_kind == NUMBER else "str"
+            return f"({left} + {b} if type({b} := {right}) is {python_type} else rt_error({line}, {message!r}))"
+        return f"({a} + {b} if (type({a} := {left}) is float) & (type({b} := {right}) is float) " \
+               f"or (type({a}) is str) & (type({b}) is str) else rt_error({line}, {message!r}))"
+
+    def visit_call_expr(self, expr: expre.Call):
+        arguments = [self.expression(argument) for argument in expr.arguments]
+
+        if isinstance(expr.callee, expre.Super):
+            superclass, this = self.analyzer.references[expr.callee]
+            callee = f"{superclass.python_name}.p_{expr.callee.method.lexeme}"
+            arguments.insert(0, self.read(this, "this"))
+        else:
+            callee = self.expression(expr.callee)
+        line = self.line = expr.paren.line
+        # A callee with the lox_arity of the call is called directly, anything else is replaced by a function
+        # raising the Lox error once the arguments are evaluated.
+        function, count = self.temporary(), len(expr.arguments)
+        return f"({function} if getattr({function} := {callee}, 'lox_arity', -1) == {count} " \
+               f"else rt_call_error({function}, {count}, {line}))({', '.join(arguments)})"
+
+    def visit_get_expr(self, expr: expre.Get):
+        obj = self.expression(expr.object)
+        self.line = expr.name.line
+        if isinstance(expr.object, expre.This):
+            return f"{obj}.p_{expr.name.lexeme}"
+
+        instance = self.temporary()
+        return f"({instance}.p_{expr.name.lexeme} if isinstance({instance} := {obj}, rt_LoxObject) " \
+               f"else rt_error({self.line}, 'Only instances have properties.'))"
+
+    def visit_set_expr(self, expr: expre.Set):
+        obj = self.expression(expr.object)
+        value = self.expression(expr.value)
+        self.line = expr.name.line
+        return f"rt_set_property({obj}, 'p_{expr.name.lexeme}', {value}, {self.line})"
+
+    def set_statement(self, expr: expre.Set):
+        obj = self.expression(expr.object)
+        self.line = expr.name.line
+        if isinstance(expr.object, expre.This):
+            self.emit(f"{obj}.p_{expr.name.lexeme} = {self.expression(expr.value)}")
+            return None
+
+        instance = self.temporary()
+        self.emit(f"{instance} = {obj}")
+        self.emit(f"if not isinstance({instance}, rt_LoxObject): rt_error({self.line}, 'Only instances have fields.')")
+        self.emit(f"{instance}.p_{expr.name.lexeme} = {self.expression(expr.value)}")
+
+    def visit_super_expr(self, expr: expre.Super):
+        superclass, this = self.analyzer.references[expr]
+        self.line = expr.method.line
+        return f"rt_bind({superclass.python_name}.p_{expr.method.lexeme}, {self.read(this, 'this')})"
@@ -0,0 +1,368 @@
+import stmt
+
+from compiler import Compiler
+from interpreter import Interpreter
+from lox_callable import LoxCallable
+from natives import NATIVES, load_native
+from op_code import (CONSTANT, NIL, TRUE, FALSE, POP, GET_LOCAL, SET_LOCAL, GET_GLOBAL, DEFINE_GLOBAL, SET_GLOBAL,
+                     GET_UPVALUE, SET_UPVALUE, GET_PROPERTY, SET_PROPERTY, GET_SUPER, EQUAL, NOT_EQUAL, GREATER,
+                     GREATER_EQUAL, LESS, LESS_EQUAL, ADD, SUBTRACT, MULTIPLY, DIVIDE, NOT, NEGATE, PRINT, JUMP,
+                     JUMP_IF_FALSE, LOOP, CALL, GET_METHOD, GET_SUPER_METHOD, INVOKE, CLOSURE, CLOSE_UPVALUE, RETURN,
+                     CLASS, INHERIT, METHOD, CHECK_FIELDS)
+from runtime_exception import RuntimeException
+from token_class import Token
+from token_type import TokenType
+from vm_objects import VmBoundMethod, VmClass, VmClosure, VmInstance, VmUpvalue
+
+
+# Default number of Lox calls that can be running at once.
+MAX_FRAMES = 10000
+
+
+class CallFrame:
+    def __init__(self, closure: VmClosure, base: int):
+        self.closure = closure
+        self.base = base
+        self.ip = 0
+
+
+class VM:
+    """Stack-based virtual machine running the bytecode produced by Compiler.
+
+    Lox calls push a CallFrame instead of recursing in Python, so the call depth is bounded by max_frames.
+    """
+
+    def __init__(self, program, max_frames: int = None):
+        self.program = program
+        self.max_frames = MAX_FRAMES if max_frames is None else max_frames
+        self.stack = []
+        self.frames = []
+        self.open_upvalues = {}
+        # Natives are added the first time they are looked up, see natives.py.
+        self.globals = {}
+
+    def interprete(self, statements: list[stmt.Stmt]):
+        function = Compiler().compile(statements)
+        self.stack.append(VmClosure(function, []))
+        self.frames.append(CallFrame(self.stack[-1], 0))
+
+        try:
+            self.run()
+        except RuntimeException as e:
+            self.program.call_runtime_error(e)
+            self.stack.clear()
+            self.frames.clear()
+            self.open_upvalues.clear()
+
+    def error(self, line: int, message: str) -> RuntimeException:
+        return RuntimeException(Token(TokenType.EOF, "", None, line), message)
+
+    def capture_upvalue(self, index: int) -> VmUpvalue:
+        upvalue = self.open_upvalues.get(index)
+        if upvalue is None:
+            upvalue = VmUpvalue(self.stack, index)
+            self.open_upvalues[index] = upvalue
+        return upvalue
+
+    def close_upvalues(self, last: int):
+        for index in [index for index in self.open_upvalues if index >= last]:
+            self.open_upvalues.pop(index).close()
+
+    def call_value(self, callee, argument_count: int, line: int) -> bool:
+        """Calls callee with the arguments on top of the stack. Returns True when a new frame was pushed."""
+        if isinstance(callee, VmClosure):
+            return self.call_closure(callee, argument_count, line)
+
+        if isinstance(callee, VmBoundMethod):
+            self.stack[-1 - argument_count] = callee.receiver
+            return self.call_closure(callee.method, argument_count, line)
+
+        if isinstance(callee, VmClass):
+            self.stack[-1 - argument_count] = VmInstance(callee)
+            initializer = callee.methods.get("init")
+            if initializer is not None:
+                return self.call_closure(initializer, argument_count, line)
+            if argument_count != 0:
+                raise self.error(line, f"Expected 0 arguments but got {argument_count}.")
+            return False
+
+        if isinstance(callee, LoxCallable):
+            if argument_count != callee.arity():
+                raise self.error(line, f"Expected {callee.arity()} arguments but got {argument_count}.")
+            arguments = self.stack[len(self.stack) - argument_count:]
+            del self.stack[len(self.stack) - argument_count - 1:]
+            self.stack.append(callee.call(self, arguments))
+            return False
+
+        raise self.error(line, "Can only call functions and classes.")
+
+    def call_closure(self, closure: VmClosure, argument_count: int, line: int) -> bool:
+        if argument_count != closure.function.arity:
+            raise self.error(line, f"Expected {closure.function.arity} arguments but got {argument_count}.")
+        if len(self.frames) >= self.max_frames:
+            raise self.error(line, "Stack overflow.")
+
+        self.frames.append(CallFrame(closure, len(self.stack) - argument_count - 1))
+        return True
+
+    def invoke(self, argument_count: int, line: int) -> bool:
+        """Calls the method pushed by GET_METHOD or GET_SUPER_METHOD under the arguments, or the field that replaced
+        the receiver when it pushed None."""
+        stack = self.stack
+        method = stack[-1 - argument_count]
+        del stack[-1 - argument_count]
+        if method is None:
+            return self.call_value(stack[-1 - argument_count], argument_count, line)
+        return self.call_closure(method, argument_count, line)
+
+    def run(self):
+        stack = self.stack
+        push = stack.append
+        pop = stack.pop
+        frames = self.frames
+        global_values = self.globals
+        stringify = Interpreter.stringify
+
+        frame = frames[-1]
+        closure = frame.closure
+        chunk = closure.function.chunk
+        code, constants, lines = chunk.code, chunk.constants, chunk.lines
+        base = frame.base
+        ip = frame.ip
+
+        while True:
+            instruction = code[ip]
+            ip += 1
+
+            if instruction == GET_LOCAL:
+                push(stack[base + code[ip]])
+                ip += 1
+            elif instruction == CONSTANT:
+                push(constants[code[ip]])
+                ip += 1
+            elif instruction == SET_LOCAL:
+                stack[base + code[ip]] = stack[-1]
+                ip += 1
+            elif instruction == POP:
+                pop()
+            elif instruction == GET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                try:
+                    push(global_values[name])
+                except KeyError:
+                    native = load_native(name)
+                    if native is None:
+                        raise self.error(lines[ip - 1], f"Undefined variable {name}.")
+                    global_values[name] = native
+                    push(native)
+            elif instruction == JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += code[ip] + 1
+                else:
+                    ip += 1
+            elif instruction == JUMP:
+                ip += code[ip] + 1
+            elif instruction == LOOP:
+                ip -= code[ip] - 1
+            elif instruction == LESS:
+                b = pop()
+                a = stack[-1]
+                if not (isinstance(a, float) and isinstance(b, float)):
+                    raise self.error(lines[ip - 1], "Operands must be numbers.")
+                stack[-1] = a < b
+            elif instruction == ADD:
+                b = pop()
+                a = stack[-1]
+                if isinstance(a, float) and isinstance(b, float):
+                    stack[-1] = a + b
+                elif isinstance(a, str) and isinstance(b, str):
+                    stack[-1] = a + b
+                else:
+                    raise self.error(lines[ip - 1], "Operands must be two numbers or two strings.")
+            elif instruction == SUBTRACT:
+                b = pop()
+                a = stack[-1]
+                if not (isinstance(a, float) and isinstance(b, float)):
+                    raise self.error(lines[ip - 1], "Operands must be numbers.")
+                stack[-1] = a - b
+            elif instruction == GET_UPVALUE:
+                upvalue = closure.upvalues[code[ip]]
+                ip += 1
+                push(upvalue.holder[upvalue.index])
+            elif instruction == SET_UPVALUE:
+                upvalue = closure.upvalues[code[ip]]
+                ip += 1
+                upvalue.holder[upvalue.index] = stack[-1]
+            elif instruction == GET_PROPERTY:
+                instance = stack[-1]
+                if not isinstance(instance, VmInstance):
+                    raise self.error(lines[ip - 1], "Only instances have properties.")
+                name = constants[code[ip]]
+                ip += 1
+                if name in instance.fields:
+                    stack[-1] = instance.fields[name]
+                else:
+                    method = instance.klass.methods.get(name)
+                    if method is None:
+                        raise self.error(lines[ip - 1], f"Undefined property '{name}'.")
+                    stack[-1] = VmBoundMethod(instance, method)
+            elif instruction == GET_METHOD:
+                instance = stack[-1]
+                if not isinstance(instance, VmInstance):
+                    raise self.error(lines[ip - 1], "Only instances have properties.")
+                name = constants[code[ip]]
+                ip += 1
+                if name in instance.fields:
+                    stack[-1] = instance.fields[name]
+                    push(None)
+                else:
+                    method = instance.klass.methods.get(name)
+                    if method is None:
+                        raise self.error(lines[ip - 1], f"Undefined property '{name}'.")
+                    push(method)
+            elif instruction == GET_SUPER_METHOD:
+                name = constants[code[ip]]
+                ip += 1
+                method = stack[-1].methods.get(name)
+                if method is None:
+                    raise self.error(lines[ip - 1], f"Undefined property '{name}'.")
+                stack[-1] = method
+            elif instruction == SET_PROPERTY:
+                value = pop()
+                stack[-1].fields[constants[code[ip]]] = value
+                ip += 1
+                stack[-1] = value
+            elif instruction == CHECK_FIELDS:
+                if not isinstance(stack[-1], VmInstance):
+                    raise self.error(lines[ip - 1], "Only instances have fields.")
+            elif instruction == CALL or instruction == INVOKE:
+                frame.ip = ip
+                argument_count = code[ip]
+                ip += 1
+                if instruction == CALL:
+                    pushed = self.call_value(stack[-1 - argument_count], argument_count, lines[ip - 1])
+                else:
+                    pushed = self.invoke(argument_count, lines[ip - 1])
+
+                if pushed:
+                    frame.ip = ip
+                    frame = frames[-1]
+                    closure = frame.closure
+                    chunk = closure.function.chunk
+                    code, constants, lines = chunk.code, chunk.constants, chunk.lines
+                    base = frame.base
+                    ip = 0
+            elif instruction == RETURN:
+                result = pop()
+                if self.open_upvalues:
+                    self.close_upvalues(base)
+                frames.pop()
+                del stack[base:]
+                if not frames:
+                    return None
+
+                push(result)
+                frame = frames[-1]
+                closure = frame.closure
+                chunk = closure.function.chunk
+                code, constants, lines = chunk.code, chunk.constants, chunk.lines
+                base = frame.base
+                ip = frame.ip
+            elif instruction == NIL:
+                push(None)
+            elif instruction == TRUE:
+                push(True)
+            elif instruction == FALSE:
+                push(False)
+            elif instruction == SET_GLOBAL:
+                name = constants[code[ip]]
+                ip += 1
+                if name not in global_values and name not in NATIVES:
+                    raise self.error(lines[ip - 1], f"Undefined variable {name}.")
+                global_values[name] = stack[-1]
+            elif instruction == DEFINE_GLOBAL:
+                global_values[constants[code[ip]]] = pop()
+                ip += 1
+            elif instruction == EQUAL:
+                b = pop()
+                stack[-1] = stack[-1] == b
+            elif instruction == NOT_EQUAL:
+                b = pop()
+                stack[-1] = not stack[-1] == b
+            elif instruction == GREATER:
+                b = pop()
+                a = stack[-1]
+                if not (isinstance(a, float) and isinstance(b, float)):
+                    raise self.error(lines[ip - 1], "Operands must be numbers.")
+                stack[-1] = a > b
+            elif instruction == GREATER_EQUAL:
+                b = pop()
+                a = stack[-1]
+                if not (isinstance(a, float) and isinstance(b, float)):
+                    raise self.error(lines[ip - 1], "Operands must be numbers.")
+                stack[-1] = a >= b
+            elif instruction == LESS_EQUAL:
+                b = pop()
+                a = stack[-1]
+                if not (isinstance(a, float) and isinstance(b, float)):
+                    raise self.error(lines[ip - 1], "Operands must be numbers.")
+                stack[-1] = a <= b
+            elif instruction == MULTIPLY:
+                b = pop()
+                a = stack[-1]
+                if not (isinstance(a, float) and isinstance(b, float)):
+                    raise self.error(lines[ip - 1], "Operands must be numbers.")
+                stack[-1] = a * b
+            elif instruction == DIVIDE:
+                b = pop()
+                a = stack[-1]
+                if not (isinstance(a, float) and isinstance(b, float)):
+                    raise self.error(lines[ip - 1], "Operands must be numbers.")
+                stack[-1] = a / b
+            elif instruction == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+            elif instruction == NEGATE:
+                value = stack[-1]
+                if not isinstance(value, float):
+                    raise self.error(lines[ip - 1], "Operand must be a number.")
+                stack[-1] = -value
+            elif instruction == PRINT:
+                print(stringify(pop()))
+            elif instruction == CLOSURE:
+                function = constants[code[ip]]
+                ip += 1
+                upvalues = []
+                for _ in range(function.upvalue_count):
+                    if code[ip]:
+                        upvalues.append(self.capture_upvalue(base + code[ip + 1]))
+                    else:
+                        upvalues.append(closure.upvalues[code[ip + 1]])
+                    ip += 2
+                push(VmClosure(function, upvalues))
+            elif instruction == CLOSE_UPVALUE:
+                self.close_upvalues(len(stack) - 1)
+                pop()
+            elif instruction == GET_SUPER:
+                superclass = pop()
+                name = constants[code[ip]]
+                ip += 1
+                method = superclass.methods.get(name)
+                if method is None:
+                    raise self.error(lines[ip - 1], f"Undefined property '{name}'.")
+                stack[-1] = VmBoundMethod(stack[-1], method)
+            elif instruction == CLASS:
+                push(VmClass(constants[code[ip]]))
+                ip += 1
+            elif instruction == INHERIT:
+                superclass = stack[-2]
+                if not isinstance(superclass, VmClass):
+                    raise self.error(lines[ip - 1], "Superclass must be a class.")
+                stack[-1].methods.update(superclass.methods)
+                pop()
+            elif instruction == METHOD:
+                method = pop()
+                stack[-1].methods[constants[code[ip]]] = method
+                ip += 1
@@ -0,0 +1,66 @@
+from typing import Any
+
+from chunk import Chunk
+
+
+# Runtime objects of the VM backend. The tree-walker keeps using LoxFunction, LoxClass and LoxInstance.
+
+class VmFunction:
+    def __init__(self, name: str, arity: int = 0):
+        self.name = name
+        self.arity = arity
+        self.upvalue_count = 0
+        self.chunk = Chunk()
+
+    def __str__(self):
+        if self.name is None:
+            return "<script>"
+        return f"<fn {self.name}>"
+
+
+class VmUpvalue:
+    # While the captured variable is still on the VM stack, holder is that stack and index its slot.
+    # Closing the upvalue moves the value into a one-cell list, so reads and writes stay holder[index].
+    def __init__(self, holder: list, index: int):
+        self.holder = holder
+        self.index = index
+
+    def close(self):
+        self.holder = [self.holder[self.index]]
+        self.index = 0
+
+
+class VmClosure:
+    def __init__(self, function: VmFunction, upvalues: list[VmUpvalue]):
+        self.function = function
+        self.upvalues = upvalues
+
+    def __str__(self):
+        return str(self.function)
+
+
+class VmClass:
+    def __init__(self, name: str):
+        self.name = name
+        self.methods = {}
+
+    def __str__(self):
+        return self.name
+
+
+class VmInstance:
+    def __init__(self, klass: VmClass):
+        self.klass = klass
+        self.fields = {}
+
+    def __str__(self):
+        return f"{self.klass.name} instance"
+
+
+class VmBoundMethod:
+    def __init__(self, receiver: Any, method: VmClosure):
+        self.receiver = receiver
+        self.method = method
+
+    def __str__(self):
+        return str(self.method)
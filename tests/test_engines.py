@@ -0,0 +1,136 @@
+import io
+import os
+import sys
+import unittest
+
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pylox"))
+
+from pylox import ENGINES, Pylox
+
+
+def run(source: str, engine: str = "tree", optimize: bool = True, max_depth: int = None) -> str:
+    program = Pylox(engine, optimize=optimize)
+    program.max_depth = max_depth
+    program.interpreter = program.create_interpreter(engine)
+    output = io.StringIO()
+    with redirect_stdout(output):
+        program.run(source, True)
+    return output.getvalue()
+
+
+CORPUS = """
+var first = nil;
+for (var i = 0; i < 3; i = i + 1) {
+  var j = i * 10;
+  fun show() { print i; print j; }
+  if (first == nil) first = show;
+  show();
+}
+first();
+
+var second = nil;
+{
+  var k = 0;
+  while (k < 3) {
+    var captured = k;
+    fun get() { return captured; }
+    if (k == 1) second = get;
+    k = k + 1;
+  }
+}
+print second();
+
+class Base {
+  init(name) { this.name = name; }
+  greet() { return "base " + this.name; }
+}
+class Derived < Base {
+  init(name) {
+    super.init(name);
+    if (name == "early") return;
+    this.name = name + "!";
+  }
+  greet() {
+    fun outer() {
+      fun inner() { return super.greet() + " via " + this.name; }
+      return inner;
+    }
+    return outer()();
+  }
+}
+print Derived("early").greet();
+print Derived("late").greet();
+var d = Derived("x");
+print d.init("early") == d;
+print d.name;
+print d.greet == d.greet;
+var greet = d.greet;
+print greet == greet;
+
+fun makeAdder(n) { fun add(x) { return x + n; } return add; }
+print makeAdder(2)(40);
+print makeAdder;
+print Derived;
+print d;
+print 1 / 4;
+print -0;
+print "a" + "b" == "ab";
+print nil == false;
+print !nil;
+"""
+
+# Each program stops at its runtime error, after printing what comes before it.
+ERRORS = [
+    'print "before";\nprint 1 + "a";\n',
+    'print -"a";\n',
+    "print nope;\n",
+    "undefined = 1;\n",
+    "var x = 1;\nx();\n",
+    "fun f(a) {}\nf(1,\n2);\n",
+    "class A { init(a) {} }\nA();\n",
+    "print clock(1);\n",
+    'fun side() { print "side"; }\nvar s = "x";\ns.len(\nside());\n',
+    'fun side() { print "side"; }\nclass A {}\nA().\nm(side());\n',
+    "class A {}\nvar a = A();\na.f = 1;\nprint a.g;\n",
+    'fun side() { print "side"; }\nclass A {}\nclass B < A { m() { return super.nope(side()); } }\nB().m();\n',
+    'fun side() { print "side"; }\n1.x = side();\n',
+    "var NotAClass = 1;\nclass B < NotAClass {}\n",
+]
+
+TAIL_CALLS = "fun loop(n, acc) { if (n == 0) return acc; return loop(n - 1, acc + 1); }\nprint loop(100000, 0);\n"
+DEEP = 'fun deep(n) { if (n == 0) return 0; return 1 + deep(n - 1); }\nprint "start";\nprint deep(1000);\n'
+
+
+class EnginesTest(unittest.TestCase):
+    def assert_same_as_tree(self, source: str):
+        expected = run(source)
+        for engine in ENGINES:
+            for optimize in (True, False):
+                with self.subTest(engine=engine, optimize=optimize):
+                    self.assertEqual(run(source, engine, optimize), expected)
+
+    def test_corpus(self):
+        self.assert_same_as_tree(CORPUS)
+
+    def test_runtime_errors(self):
+        for source in ERRORS:
+            with self.subTest(source=source):
+                self.assertNotIn("side", run(source))
+                self.assert_same_as_tree(source)
+
+    def test_tail_calls(self):
+        for engine in ("tree", "closure", "stackless"):
+            with self.subTest(engine=engine):
+                self.assertEqual(run(TAIL_CALLS, engine), "100000\n")
+
+    def test_stack_overflow(self):
+        for engine in ("stackless", "vm"):
+            with self.subTest(engine=engine):
+                self.assertEqual(run(DEEP, engine, max_depth=500), "start\nStack overflow.\n[line 0]\n")
+                self.assertEqual(run(DEEP, engine, max_depth=2000), "start\n1000\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import io
+import os
+import sys
+import unittest
+
+from contextlib import redirect_stderr, redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pylox"))
+
+from expr import Expr
+from pylox import Pylox
+from stmt import Stmt
+from token_class import Token
+
+
+def run(source: str, optimize: bool = True, stream: bool = False, report: bool = False) -> tuple[str, str]:
+    program = Pylox("tree", optimize=optimize)
+    program.optimizer_report = report
+    output, errors = io.StringIO(), io.StringIO()
+    with redirect_stdout(output), redirect_stderr(errors):
+        if stream:
+            program.run_stream(io.StringIO(source))
+        else:
+            program.run(source, True)
+    return output.getvalue(), errors.getvalue()
+
+
+def lexemes(node) -> set[str]:
+    """Lexemes of every token in the statements or node."""
+    if isinstance(node, list):
+        return set().union(*map(lexemes, node))
+    if isinstance(node, Token):
+        return {node.lexeme}
+    if isinstance(node, (Expr, Stmt)):
+        return set().union(*(lexemes(getattr(node, slot, None))
+                             for cls in type(node).__mro__ for slot in getattr(cls, "__slots__", ())))
+    return set()
+
+
+class OptimizerTest(unittest.TestCase):
+    def assert_unchanged_output(self, source: str, expected: str):
+        """Checks that the optimized output is expected, and the one of --no-optimize, whole or streamed."""
+        for stream in (False, True):
+            with self.subTest(stream=stream):
+                output = run(source, stream=stream)[0]
+                self.assertEqual(output, expected)
+                self.assertEqual(output, run(source, optimize=False, stream=stream)[0])
+
+    def test_failing_operations_are_not_folded(self):
+        for source, message in (('print -"a";\n', "Operand must be a number."),
+                                ('print "a" - 1;\n', "Operands must be numbers."),
+                                ('print 1 < "a";\n', "Operands must be numbers."),
+                                ("print nil + 1;\n", "Operands must be two numbers or two strings.")):
+            with self.subTest(source=source):
+                self.assert_unchanged_output('print 1 + 2;\n' + source, f"3\n{message}\n[line 1]\n")
+
+    def test_reassigned_global_is_not_a_constant(self):
+        source = "var a = 1;\nfun show() { print a; }\nshow();\na = 2;\nshow();\nprint a;\n"
+        self.assert_unchanged_output(source, "1\n2\n2\n")
+
+    def test_global_assigned_once_is_folded(self):
+        source = "var a = 1;\nvar b = a + 2;\nprint b;\n"
+        self.assert_unchanged_output(source, "3\n")
+        # print b is folded down to print 3, which holds no token.
+        statements, _ = Pylox("tree").compile(source, True)
+        self.assertEqual(lexemes(statements[-1]), set())
+
+    def test_dead_code_keeps_side_effects(self):
+        source = ('fun f() { print "f"; return 1; }\nvar unused = f();\nf();\nvar x = 1 + 2;\n'
+                  'fun g() { return f(); print "dead"; }\nvar y = g();\nwhile (false) print "never";\n')
+        self.assert_unchanged_output(source, "f\nf\nf\n")
+        statements, _ = Pylox("tree").compile(source, True)
+        names = lexemes(statements)
+        self.assertNotIn("x", names)
+        self.assertIn("unused", names)
+
+    def test_hoisting_a_guarded_condition(self):
+        # x.y is invariant, but only read once flag is true: x is nil when flag is false.
+        source = ("class A { init(y) { this.y = y; } }\n"
+                  "fun loop(flag, x) {\n  while (flag and x.y > 0) { print x.y; flag = false; }\n  print \"done\";\n}\n"
+                  "loop(false, nil);\nloop(true, A(2));\n")
+        self.assertTrue(any(name.endswith("_hoisted") for name in lexemes(Pylox("tree").compile(source, True)[0])))
+        self.assert_unchanged_output(source, "done\n2\ndone\n")
+
+    def test_hoisting_nil_and_false(self):
+        # A hoisted part is cached as 'h or (h = part)', so a falsy value is computed again each time.
+        source = ("class A { init() { this.y = nil; this.z = false; } }\n"
+                  "fun loop(x) {\n  var i = 0;\n"
+                  "  while (i < 2) { print x.y; print x.z; if (x.z) print \"never\"; print x.y or \"y\"; i = i + 1; }\n"
+                  "  while (x.z == false and i < 4) { i = i + 1; print i; }\n}\nloop(A());\n")
+        self.assertTrue(any(name.endswith("_hoisted") for name in lexemes(Pylox("tree").compile(source, True)[0])))
+        self.assert_unchanged_output(source, "nil\nfalse\ny\nnil\nfalse\ny\n3\n4\n")
+
+    def test_optimizer_report(self):
+        source = ('var x = 1 + 2 * 3;\nprint x;\nif (true) print "t"; else print "f";\nwhile (false) print "never";\n'
+                  'fun g() { return 1; print "dead"; }\nprint g();\n')
+        output, errors = run(source, report=True)
+        self.assertEqual(output, "7\nt\n1\n")
+        self.assertEqual(errors, "ConstantFolder removed 4 nodes.\nDeadCodeEliminator removed 8 nodes.\n"
+                                 "LoopInvariantHoister removed 0 nodes.\n")
+        self.assertEqual(run(source, optimize=False, report=True), ("7\nt\n1\n", ""))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+from contextlib import redirect_stdout
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pylox"))
+
+from program_cache import ProgramCache
+from pylox import ENGINES, Pylox
+
+
+SOURCE = """
+class Point {
+  init(x, y) { this.x = x; this.y = y; }
+  sum() { return this.x + this.y; }
+}
+class Point3 < Point {
+  init(x, y, z) { super.init(x, y); this.z = z; }
+  sum() { return super.sum() + this.z; }
+}
+fun counter() {
+  var count = 0;
+  fun increment() { count = count + 1; return count; }
+  return increment;
+}
+var next = counter();
+var total = 0;
+for (var i = 0; i < 3; i = i + 1) {
+  total = total + Point3(i, 1 + 1, 3).sum() + next();
+}
+print total;
+print Point3(1, 2, 3).z;
+"""
+
+
+def run(source: str, engine: str = "tree", cache: ProgramCache = None) -> str:
+    output = io.StringIO()
+    with redirect_stdout(output):
+        Pylox(engine).run(source, True, cache)
+    return output.getvalue()
+
+
+class ProgramCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.script = os.path.join(directory.name, "script.pylox")
+
+    def cache(self, source: str = SOURCE, optimize: bool = True) -> ProgramCache:
+        return ProgramCache(self.script, source, optimize)
+
+    def test_key(self):
+        self.assertEqual(self.cache().key, self.cache().key)
+        self.assertNotEqual(self.cache().key, self.cache(SOURCE + "print 1;\n").key)
+        self.assertNotEqual(self.cache().key, self.cache(optimize=False).key)
+
+    def test_hit(self):
+        self.assertIsNone(self.cache().load())
+        expected = run(SOURCE, cache=self.cache())
+        self.assertIsNotNone(self.cache().load())
+        self.assertEqual(run(SOURCE, cache=self.cache()), expected)
+
+    def test_other_source_misses(self):
+        run(SOURCE, cache=self.cache())
+        self.assertIsNone(self.cache(SOURCE + "print 1;\n").load())
+        self.assertIsNone(self.cache(optimize=False).load())
+
+    @unittest.skipUnless(hasattr(os, "getuid"), "files have no owner")
+    def test_untrusted_file_is_rejected(self):
+        run(SOURCE, cache=self.cache())
+        path = self.cache().path
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o644)
+
+        for mode in (0o664, 0o646):
+            with self.subTest(mode=oct(mode)):
+                os.chmod(path, mode)
+                self.assertIsNone(self.cache().load())
+        os.chmod(path, 0o644)
+        self.assertIsNotNone(self.cache().load())
+
+        with mock.patch("os.getuid", return_value=os.stat(path).st_uid + 1):
+            self.assertIsNone(self.cache().load())
+
+    def test_truncated_file_is_a_miss(self):
+        run(SOURCE, cache=self.cache())
+        path = self.cache().path
+        size = os.path.getsize(path)
+        for length in (len(self.cache().key) // 2, len(self.cache().key) + 10, size - 1):
+            with self.subTest(length=length):
+                with open(path, "r+b") as f:
+                    f.truncate(length)
+                self.assertIsNone(self.cache().load())
+                # The next run writes the file again.
+                self.assertEqual(run(SOURCE, cache=self.cache()), run(SOURCE))
+                self.assertIsNotNone(self.cache().load())
+
+    def test_cache_is_shared_by_the_engines(self):
+        expected = run(SOURCE)
+        path = self.cache().path
+        for writer in ENGINES:
+            if os.path.exists(path):
+                os.remove(path)
+            self.assertEqual(run(SOURCE, writer, self.cache()), expected)
+            for reader in ENGINES:
+                with self.subTest(writer=writer, reader=reader):
+                    self.assertIsNotNone(self.cache().load())
+                    self.assertEqual(run(SOURCE, reader, self.cache()), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import io
+import os
+import sys
+import unittest
+
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pylox"))
+
+from pylox import Pylox
+
+
+def run(source: str, engine: str = "vm") -> str:
+    output = io.StringIO()
+    with redirect_stdout(output):
+        Pylox(engine).run(source, True)
+    return output.getvalue()
+
+
+class VMTest(unittest.TestCase):
+    def test_negative_zero_keeps_its_sign(self):
+        # The optimizer folds -0 and -a into -0.0 literals, which must not share the constant slot of 0.
+        source = "print -0;\nvar a = 0;\nprint -a;\nprint 0;\n"
+        self.assertEqual(run(source), "-0\n-0\n0\n")
+        self.assertEqual(run(source), run(source, "tree"))
+
+    def test_method_is_looked_up_before_the_arguments(self):
+        # The error is reported on the property name before the arguments print anything.
+        for receiver in ('"str"', "A()"):
+            with self.subTest(receiver=receiver):
+                source = f'class A {{}}\nfun side() {{ print "side"; }}\n{receiver}.\nmissing(\nside());\n'
+                self.assertEqual(run(source), run(source, "tree"))
+                self.assertNotIn("side", run(source))
+
+    def test_super_method_is_looked_up_before_the_arguments(self):
+        source = ('class A {}\nclass B < A { m() { super.missing(side()); } }\n'
+                  'fun side() { print "side"; }\nB().m();\n')
+        self.assertEqual(run(source), run(source, "tree"))
+        self.assertNotIn("side", run(source))
+
+    def test_field_is_called_with_its_value_before_the_arguments(self):
+        source = ('fun one(x) { return 1; }\nfun two(x) { return 2; }\nclass A {}\nvar a = A();\na.f = one;\n'
+                  'fun swap(x) { a.f = two; return x; }\nprint a.f(swap(0));\nprint a.f(0);\n')
+        self.assertEqual(run(source), "1\n2\n")
+        self.assertEqual(run(source), run(source, "tree"))
+
+
+if __name__ == "__main__":
+    unittest.main()